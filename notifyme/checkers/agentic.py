@@ -1,35 +1,116 @@
 """Agentic checker using Claude to evaluate complex conditions."""
 
+import asyncio
 import hashlib
 import json
 import logging
 import os
+from datetime import datetime, timedelta
 from typing import Any
 
-from anthropic import Anthropic
-
-from ..fetcher import fetch_url
+from ..content import (
+    CHARS_PER_TOKEN,
+    clean_for_llm,
+    compress_content,
+    estimate_tokens,
+    truncate_to_tokens,
+)
+from ..fetcher import FetchResult, fetch_url
 from ..models import CheckResult, Monitor
-from .base import BaseChecker
+from .base import BaseChecker, get_anthropic_client, parse_json_response
 
 logger = logging.getLogger(__name__)
 
+# Static evaluation instructions, sent as the system prompt. Not marked for
+# prompt caching: they are far below the minimum cacheable length, and the
+# page content after them changes on every call.
+EVALUATION_INSTRUCTIONS = """Analyze the webpage content provided by the user and determine if the condition is TRUE or FALSE.
+
+IMPORTANT: Set "condition_met" to true ONLY if the condition is satisfied. If the condition is NOT met, set it to false.
+
+Respond with JSON only:
+{"condition_met": true or false, "explanation": "why condition is met or not met", "relevant_details": "key info like scores, dates, prices", "event_id": "YYYY-MM-DD_opponent (e.g., 2025-02-15_Oregon) - must be consistent format for deduplication"}"""
+
+# Default page content budget (~50k chars of English text)
+DEFAULT_MAX_CONTENT_TOKENS = 12500
+
+# Explanation digests remembered per monitor for notify_on_each dedup
+RECENT_EXPLANATION_DIGESTS = 20
+
+# Per-call user turn; only these slots vary between evaluations
+EVALUATION_PROMPT_TEMPLATE = """CONDITION: {condition}
+URL: {url}
+
+WEBPAGE CONTENT:
+{content}"""
+
+
+def explanation_digest(explanation: str) -> str:
+    """Short fingerprint of an explanation, used only for change detection."""
+    return hashlib.blake2b(explanation.encode(), digest_size=8).hexdigest()
+
 
 class AgenticChecker(BaseChecker):
     """Checker that uses Claude to evaluate natural language conditions.
 
     Config options:
         - use_playwright: Use Playwright for JS-rendered pages
+        - ready_selector: With use_playwright, read the page once this CSS
+                          selector appears instead of waiting for network idle
         - use_browser_agent: Use Browser-Use AI agent for anti-bot evasion
         - browser_task: Optional task for Browser-Use (e.g., "scroll to find price")
         - browser_headed: Run browser in headed mode (default True)
-        - max_content_chars: Max chars to send to Claude (default 50000)
+        - clean_content: Strip boilerplate lines (cookie banners, legal footers)
+                         before sending to Claude, keeping any that mention a price
+                         or a condition term (default True)
+        - max_content_tokens: Estimated max tokens of page content to send to Claude
+                              (default 12500; legacy max_content_chars is still honored)
+        - compression: When content exceeds max_content_tokens, keep the lines most
+                       relevant to the condition instead of truncating (default False)
         - notify_on_each: If True, notify on each new match (tracks event_id)
                          Use for recurring events like sports wins
+        - recheck_after_hours: Re-ask Claude about an unchanged page after this
+                               many hours (default 24); otherwise the last
+                               evaluation is reused
     """
 
     def __init__(self, api_key: str | None = None):
-        self.client = Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+        self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        self._client = None
+        self._aclient = None
+        self._aclient_loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def client(self):
+        """Lazy-load the shared Anthropic client (keeps the SDK out of startup)."""
+        if self._client is None:
+            self._client = get_anthropic_client(self.api_key)
+        return self._client
+
+    @property
+    def aclient(self):
+        """
+        Lazy-load the async Anthropic client.
+
+        Not shared like the sync client: its connection pool is bound to the
+        event loop it first runs on, so a checker reused under a later
+        asyncio.run() gets a fresh client.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None and self._aclient_loop not in (None, loop):
+            self._aclient = None
+            self._aclient_loop = None
+        if self._aclient is None:
+            from anthropic import AsyncAnthropic
+
+            self._aclient = AsyncAnthropic(api_key=self.api_key)
+        if self._aclient_loop is None:
+            self._aclient_loop = loop
+        return self._aclient
 
     def check(self, monitor: Monitor) -> CheckResult:
         """
@@ -41,6 +122,36 @@ class AgenticChecker(BaseChecker):
         Returns:
             CheckResult with Claude's evaluation
         """
+        result = self._fetch(monitor)
+
+        cached = self._cached_result(monitor, result)
+        if cached:
+            return cached
+
+        content = self._prepare_content(result.text, monitor)
+        evaluation = self._evaluate_with_claude(content, monitor.condition, monitor.url)
+        return self._build_result(evaluation, result)
+
+    async def check_async(self, monitor: Monitor) -> CheckResult:
+        """
+        Async variant of check() using the async Anthropic client.
+
+        The page fetch and content cleanup run in a worker thread so they
+        don't stall other checks on the event loop; the Claude call is
+        awaited natively so many monitors can be evaluated concurrently.
+        """
+        result = await asyncio.to_thread(self._fetch, monitor)
+
+        cached = self._cached_result(monitor, result)
+        if cached:
+            return cached
+
+        content = await asyncio.to_thread(self._prepare_content, result.text, monitor)
+        evaluation = await self._evaluate_with_claude_async(content, monitor.condition, monitor.url)
+        return self._build_result(evaluation, result)
+
+    def _fetch(self, monitor: Monitor) -> FetchResult:
+        """Fetch the monitor's page using its configured method."""
         if not monitor.condition:
             raise ValueError(f"Agentic monitor {monitor.name} has no condition set")
 
@@ -50,23 +161,69 @@ class AgenticChecker(BaseChecker):
         browser_task = monitor.config.get("browser_task")
         browser_headed = monitor.config.get("browser_headed", True)
 
-        result = fetch_url(
+        return fetch_url(
             monitor.url,
             use_playwright=use_playwright,
             use_browser_agent=use_browser_agent,
             browser_task=browser_task,
             browser_headed=browser_headed,
+            ready_selector=monitor.config.get("ready_selector"),
         )
 
-        # Truncate content if too long (Claude has context limits)
-        content = result.text
-        max_chars = monitor.config.get("max_content_chars", 50000)
-        if len(content) > max_chars:
-            content = content[:max_chars] + "\n\n[Content truncated...]"
+    def _prepare_content(self, content: str, monitor: Monitor) -> str:
+        """Clean page text and fit it into the content budget for Claude."""
+        if monitor.config.get("clean_content", True):
+            content = clean_for_llm(content, monitor.condition)
 
-        # Ask Claude to evaluate
-        evaluation = self._evaluate_with_claude(content, monitor.condition, monitor.url)
+        # Reduce content if too long (Claude has context limits)
+        max_tokens = monitor.config.get("max_content_tokens")
+        if max_tokens is None and "max_content_chars" in monitor.config:
+            # Legacy char budget from before token estimation
+            max_tokens = monitor.config["max_content_chars"] // CHARS_PER_TOKEN
+        if max_tokens is None:
+            max_tokens = DEFAULT_MAX_CONTENT_TOKENS
 
+        if estimate_tokens(content) > max_tokens:
+            if monitor.config.get("compression", False):
+                content = compress_content(content, monitor.condition, max_tokens)
+            else:
+                content = truncate_to_tokens(content, max_tokens) + "\n\n[Content truncated...]"
+
+        return content
+
+    def _cached_result(self, monitor: Monitor, result: FetchResult) -> CheckResult | None:
+        """
+        Reuse the last evaluation if the page and condition are unchanged.
+
+        Returns None (forcing a fresh evaluation) when the content hash or
+        condition differ, or when the last evaluation is older than
+        recheck_after_hours.
+        """
+        state = monitor.last_state
+        evaluated_at = state.get("evaluated_at")
+        if (
+            not evaluated_at
+            or not result.content_hash
+            or result.content_hash != monitor.last_state_hash
+            or state.get("evaluated_condition") != monitor.condition
+        ):
+            return None
+
+        recheck_after_hours = monitor.config.get("recheck_after_hours", 24)
+        if datetime.now() - datetime.fromisoformat(evaluated_at) >= timedelta(hours=recheck_after_hours):
+            return None
+
+        logger.info(f"Page unchanged for {monitor.name}, reusing last evaluation")
+        return CheckResult(
+            condition_met=state.get("condition_met", False),
+            explanation=state.get("explanation", "No explanation provided"),
+            details=dict(state.get("details", {})),
+            state_hash=result.content_hash,
+            cached=True,
+        )
+
+    def _build_result(self, evaluation: dict, result: FetchResult) -> CheckResult:
+        """Turn Claude's evaluation into a CheckResult."""
         # Normalize details to dict
         relevant_details = evaluation.get("relevant_details", {})
         if isinstance(relevant_details, str):
@@ -94,25 +251,29 @@ class AgenticChecker(BaseChecker):
         if not result.condition_met:
             return False
 
-        notify_on_each = monitor.config.get("notify_on_each", False)
+        last_state = monitor.last_state
 
-        if notify_on_each:
+        if monitor.config.get("notify_on_each", False):
             # Notify if this is a different event than last notified
             current_event_id = result.details.get("event_id", "")
-            last_event_id = monitor.last_state.get("last_notified_event_id", "")
+            last_event_id = last_state.get("last_notified_event_id", "")
 
             if current_event_id and current_event_id != last_event_id:
                 return True
             elif not current_event_id:
                 # No event_id, fall back to checking if explanation changed
-                current_hash = hashlib.sha256(result.explanation.encode()).hexdigest()[:16]
-                last_hash = monitor.last_state.get("last_explanation_hash", "")
-                return current_hash != last_hash
+                recent_digests = last_state.get("recent_explanation_digests")
+                if recent_digests is not None:
+                    return explanation_digest(result.explanation) not in set(recent_digests)
+
+                # State written before the digest switch stored a SHA-256 prefix
+                legacy_hash = hashlib.sha256(result.explanation.encode()).hexdigest()[:16]
+                return legacy_hash != last_state.get("last_explanation_hash", "")
 
             return False
         else:
             # Default: notify on transition from false to true
-            previous_met = monitor.last_state.get("condition_met", False)
+            previous_met = last_state.get("condition_met", False)
             return not previous_met
 
     def get_state_for_storage(self, result: CheckResult, monitor: Monitor) -> dict[str, Any]:
@@ -121,6 +282,12 @@ class AgenticChecker(BaseChecker):
             "condition_met": result.condition_met,
             "explanation": result.explanation,
             "details": result.details,
+            "evaluated_condition": monitor.condition,
+            "evaluated_at": (
+                monitor.last_state.get("evaluated_at")
+                if result.cached
+                else datetime.now().isoformat()
+            ),
         }
 
         # Track event_id for notify_on_each mode
@@ -128,9 +295,12 @@ class AgenticChecker(BaseChecker):
             event_id = result.details.get("event_id", "")
             if event_id:
                 state["last_notified_event_id"] = event_id
-            state["last_explanation_hash"] = hashlib.sha256(
-                result.explanation.encode()
-            ).hexdigest()[:16]
+            # Most recent first, bounded so state doesn't grow without limit
+            digest = explanation_digest(result.explanation)
+            previous = monitor.last_state.get("recent_explanation_digests", [])
+            state["recent_explanation_digests"] = (
+                [digest] + [d for d in previous if d != digest]
+            )[:RECENT_EXPLANATION_DIGESTS]
 
         return state
 
@@ -148,47 +318,53 @@ class AgenticChecker(BaseChecker):
         Returns:
             Dictionary with condition_met, explanation, relevant_details
         """
-        prompt = f"""Analyze this webpage and determine if the condition is TRUE or FALSE.
-
-CONDITION: {condition}
-
-WEBPAGE CONTENT:
-{content}
-
-IMPORTANT: Set "condition_met" to true ONLY if the condition is satisfied. If the condition is NOT met, set it to false.
-
-Respond with JSON only:
-{{"condition_met": true or false, "explanation": "why condition is met or not met", "relevant_details": "key info like scores, dates, prices", "event_id": "YYYY-MM-DD_opponent (e.g., 2025-02-15_Oregon) - must be consistent format for deduplication"}}"""
-
         try:
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=300,
-                messages=[{"role": "user", "content": prompt}],
-            )
-
-            response_text = response.content[0].text.strip()
-
-            # Try to parse JSON from response
-            try:
-                # Handle case where Claude wraps in markdown code block
-                if response_text.startswith("```"):
-                    response_text = response_text.split("```")[1]
-                    if response_text.startswith("json"):
-                        response_text = response_text[4:]
-                    response_text = response_text.strip()
-
-                return json.loads(response_text)
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse Claude response as JSON: {response_text[:200]}")
-                # Try to extract boolean from response
-                condition_met = "true" in response_text.lower() and "condition_met" in response_text.lower()
-                return {
-                    "condition_met": condition_met,
-                    "explanation": response_text[:500],
-                    "relevant_details": "",
-                }
+            response = self.client.messages.create(**self._request_params(content, condition, url))
+        except Exception as e:
+            logger.error(f"Claude API error: {e}")
+            raise
+        return self._parse_response(response)
 
+    async def _evaluate_with_claude_async(
+        self, content: str, condition: str, url: str
+    ) -> dict:
+        """Async variant of _evaluate_with_claude()."""
+        try:
+            response = await self.aclient.messages.create(**self._request_params(content, condition, url))
         except Exception as e:
             logger.error(f"Claude API error: {e}")
             raise
+        return self._parse_response(response)
+
+    def _request_params(self, content: str, condition: str, url: str) -> dict[str, Any]:
+        """Build the messages.create() arguments for an evaluation."""
+        return {
+            "model": "claude-sonnet-4-20250514",
+            "max_tokens": 300,
+            "system": EVALUATION_INSTRUCTIONS,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": EVALUATION_PROMPT_TEMPLATE.format(
+                        condition=condition, url=url, content=content
+                    ),
+                }
+            ],
+        }
+
+    def _parse_response(self, response: Any) -> dict:
+        """Parse Claude's JSON evaluation, falling back to a best-effort read."""
+        response_text = response.content[0].text.strip()
+
+        # Try to parse JSON from response
+        try:
+            return parse_json_response(response_text)
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse Claude response as JSON: {response_text[:200]}")
+            # Try to extract boolean from response
+            condition_met = "true" in response_text.lower() and "condition_met" in response_text.lower()
+            return {
+                "condition_met": condition_met,
+                "explanation": response_text[:500],
+                "relevant_details": "",
+            }
@@ -1,10 +1,43 @@
 """Base checker class and utilities."""
 
+import asyncio
+import functools
+import json
+import re
 from abc import ABC, abstractmethod
 from typing import Any
 
 from ..models import CheckResult, Monitor
 
+# Outermost {...} in a Claude reply, whether fenced in ```json or surrounded by prose
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def parse_json_response(text: str) -> Any:
+    """
+    Parse the JSON object from a Claude reply.
+
+    Handles replies wrapped in markdown code blocks or surrounded by prose.
+
+    Raises:
+        json.JSONDecodeError: If the reply doesn't contain valid JSON
+    """
+    match = _JSON_OBJECT_RE.search(text)
+    return json.loads(match.group(0) if match else text)
+
+
+@functools.lru_cache(maxsize=None)
+def get_anthropic_client(api_key: str | None) -> Any:
+    """
+    Shared Anthropic client for an API key.
+
+    Every checker reuses the same client and so the same HTTP connection
+    pool, letting repeated calls skip TCP/TLS setup.
+    """
+    from anthropic import Anthropic
+
+    return Anthropic(api_key=api_key)
+
 
 class BaseChecker(ABC):
     """Abstract base class for all monitor checkers."""
@@ -22,6 +55,15 @@ class BaseChecker(ABC):
         """
         pass
 
+    async def check_async(self, monitor: Monitor) -> CheckResult:
+        """
+        Check the monitor without blocking the event loop.
+
+        Default implementation runs check() in a worker thread.
+        Subclasses with native async I/O can override.
+        """
+        return await asyncio.to_thread(self.check, monitor)
+
     def should_notify(self, monitor: Monitor, result: CheckResult) -> bool:
         """
         Determine if a notification should be sent.
@@ -1,14 +1,18 @@
 """Anthropic Console credit balance checker with magic link authentication."""
 
 import email
+import email.message
 import hashlib
 import imaplib
 import logging
 import os
 import re
+import select
+import ssl
 import time
 from datetime import datetime, timedelta
 from email.utils import parsedate_to_datetime
+from pathlib import Path
 from typing import Any
 
 from ..models import CheckResult, Monitor
@@ -16,6 +20,156 @@ from .base import BaseChecker
 
 logger = logging.getLogger(__name__)
 
+BILLING_URL = "https://console.anthropic.com/settings/billing"
+
+# Selectors for the console login flow
+EMAIL_INPUT_SELECTOR = 'input[type="email"], input[name="email"], input[placeholder*="email" i]'
+EMAIL_LINK_BUTTON_SELECTOR = 'button:has-text("Email me a link"), button:has-text("Send link")'
+
+# Longest wait for a page element before moving on (milliseconds)
+PAGE_WAIT_TIMEOUT_MS = 15000
+
+CREDIT_BALANCE_RE = re.compile(r"credit balance", re.IGNORECASE)
+CHECK_EMAIL_RE = re.compile(r"check your email", re.IGNORECASE)
+
+# Credit balance patterns on the billing page, most specific first
+BALANCE_PATTERNS = [
+    r"Credit Balance[:\s]*\$?([\d,]+\.?\d*)",
+    r"\$([\d,]+\.?\d*)\s*(?:remaining|credit|balance)",
+    r"remaining[:\s]*\$?([\d,]+\.?\d*)",
+    r"balance[:\s]*\$?([\d,]+\.?\d*)",
+    r"credits?[:\s]*\$?([\d,]+\.?\d*)",
+]
+
+# Compiled once; searched one by one so an earlier pattern always wins
+# (a single alternation would take the leftmost match instead)
+_BALANCE_RES = [re.compile(pattern, re.IGNORECASE) for pattern in BALANCE_PATTERNS]
+
+MAGIC_LINK_RE = re.compile(r'href="(https://platform\.claude\.com/magic-link[^"]+)"')
+# Where the magic link can land once the session is set (either console host)
+LOGGED_IN_URL_RE = re.compile(r"https://(console\.anthropic|platform\.claude)\.com/")
+MAGIC_LINK_MARKER = b"platform.claude.com/magic-link"
+
+# Persistent browser profiles (one per console account) for session reuse
+BROWSER_PROFILE_DIR = Path.home() / ".notifyme" / "browser"
+
+# Longest single IMAP IDLE wait before re-checking the inbox anyway
+MAX_IDLE_SECONDS = 30
+
+# Poll interval for IMAP servers without IDLE support
+POLL_INTERVAL_SECONDS = 3
+
+# Max candidate emails whose headers are fetched in one batch
+MAX_HEADER_FETCH = 100
+
+
+def _wait_readable(mail: imaplib.IMAP4, timeout: float) -> bool:
+    """
+    Whether mail has a line to read within timeout seconds.
+
+    Counts bytes imaplib's buffered reader already pulled off the socket and
+    decrypted TLS bytes, neither of which select() sees.
+    """
+    sock = mail.sock
+    previous_timeout = sock.gettimeout()
+    sock.settimeout(0)
+    try:
+        if mail.file.peek(1):
+            return True
+    except (BlockingIOError, ssl.SSLWantReadError):
+        pass
+    finally:
+        sock.settimeout(previous_timeout)
+    pending = getattr(sock, "pending", None)  # SSLSocket only
+    if pending is not None and pending():
+        return True
+    readable, _, _ = select.select([sock], [], [], timeout)
+    return bool(readable)
+
+
+class ImapSession:
+    """Logged-in IMAP connection to INBOX, reused across polls.
+
+    Connects lazily on first use and reconnects after the server drops the
+    connection, so one TLS handshake + LOGIN serves the whole magic link flow.
+    """
+
+    def __init__(self, host: str, user: str, password: str):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.mail: imaplib.IMAP4_SSL | None = None
+
+    def get(self) -> imaplib.IMAP4_SSL:
+        """Return the live connection, connecting if needed."""
+        if self.mail is None:
+            mail = imaplib.IMAP4_SSL(self.host)
+            mail.login(self.user, self.password)
+            mail.select("INBOX")
+            self.mail = mail
+        return self.mail
+
+    def supports_idle(self) -> bool:
+        """Whether the server advertises the IDLE extension."""
+        return "IDLE" in self.get().capabilities
+
+    def idle(self, timeout: float) -> bool:
+        """
+        Wait in IMAP IDLE until the server reports new mail or timeout expires.
+
+        imaplib has no IDLE support before Python 3.14, so this speaks the
+        protocol directly: send IDLE, wait for an untagged EXISTS, send DONE.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if new mail arrived, False on timeout
+        """
+        mail = self.get()
+        mail.untagged_responses.pop("EXISTS", None)  # Already seen by the last poll
+        tag = mail._new_tag()
+        mail.send(tag + b" IDLE\r\n")
+
+        # Wait for the "+ idling" continuation; a tagged reply means IDLE was refused
+        while mail._get_response() is not None:
+            if mail.tagged_commands.get(tag) is not None:
+                raise mail.error(f"IDLE rejected: {mail.tagged_commands.pop(tag)}")
+
+        # An EXISTS can arrive before the continuation; imaplib files it away
+        new_mail = mail.untagged_responses.pop("EXISTS", None) is not None
+
+        # Wait with select() rather than a socket timeout: a read that times out
+        # leaves imaplib's buffered reader unusable for the DONE reply
+        deadline = time.monotonic() + timeout
+        while not new_mail:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not _wait_readable(mail, remaining):
+                break
+            line = mail.readline()
+            if not line:
+                raise mail.abort("connection closed during IDLE")
+            new_mail = line.rstrip().endswith(b"EXISTS")
+
+        mail.send(b"DONE\r\n")
+        mail._command_complete("IDLE", tag)
+        return new_mail
+
+    def close(self) -> None:
+        """Log out and drop the connection (the next get() reconnects)."""
+        if self.mail is not None:
+            try:
+                self.mail.logout()
+            except Exception as e:
+                logger.debug(f"IMAP logout failed: {e}")
+            self.mail = None
+
+    def __enter__(self) -> "ImapSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
 
 class CreditsChecker(BaseChecker):
     """Checker for Anthropic Console credit balance.
@@ -139,6 +293,9 @@ class CreditsChecker(BaseChecker):
         """
         Log into Anthropic console using magic link and retrieve credit balance.
 
+        The browser profile is persisted per account, so if the previous run's
+        session is still valid the magic link flow (and IMAP) is skipped.
+
         Args:
             console_email: Email for Anthropic console account
             imap_host: IMAP server hostname
@@ -160,51 +317,53 @@ class CreditsChecker(BaseChecker):
 
         logger.info(f"Starting Anthropic credits check (headed={headed})")
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=not headed)
-            context = browser.new_context()
-            page = context.new_page()
+        with sync_playwright() as p, ImapSession(imap_host, imap_user, imap_password) as imap:
+            # Persistent profile keeps the console session cookies between runs
+            profile_dir = self._browser_profile_dir(console_email)
+            profile_dir.mkdir(parents=True, exist_ok=True)
+            context = p.chromium.launch_persistent_context(str(profile_dir), headless=not headed)
+            page = context.pages[0] if context.pages else context.new_page()
 
             try:
+                # Step 0: Try the billing page directly with the saved session
+                logger.info("Checking for an existing console session...")
+                if self._open_billing_page(page):
+                    logger.info("Existing session is valid, skipping magic link login")
+                    return self._extract_balance(page)
+
+                # Drop the expired session so it can't interfere with the new login
+                context.clear_cookies()
+
                 # Step 1: Navigate to login page
                 logger.info("Navigating to Anthropic console login...")
-                page.goto("https://console.anthropic.com/login", wait_until="networkidle")
-                time.sleep(2)
+                page.goto("https://console.anthropic.com/login", wait_until="domcontentloaded")
+                page.wait_for_selector(EMAIL_INPUT_SELECTOR, timeout=PAGE_WAIT_TIMEOUT_MS)
 
                 # Step 2: Enter email
                 logger.info(f"Entering email: {console_email}")
-                email_input = page.locator(
-                    'input[type="email"], input[name="email"], input[placeholder*="email" i]'
-                )
-                email_input.fill(console_email)
-                time.sleep(1)
+                page.locator(EMAIL_INPUT_SELECTOR).fill(console_email)
 
                 # Step 3: Click Continue with email
                 logger.info("Clicking 'Continue with email'...")
                 continue_btn = page.locator('button:has-text("Continue with email")')
                 continue_btn.click()
-                time.sleep(2)
 
                 # Step 4: Click "Email me a link" if prompted
                 try:
-                    email_link_btn = page.locator(
-                        'button:has-text("Email me a link"), button:has-text("Send link")'
+                    email_link_btn = page.locator(EMAIL_LINK_BUTTON_SELECTOR)
+                    # Wait for either the link button or the "check your email" screen
+                    email_link_btn.or_(page.get_by_text(CHECK_EMAIL_RE)).first.wait_for(
+                        timeout=PAGE_WAIT_TIMEOUT_MS
                     )
-                    if email_link_btn.is_visible(timeout=3000):
+                    if email_link_btn.first.is_visible():
                         logger.info("Clicking 'Email me a link'...")
-                        email_link_btn.click()
-                        time.sleep(2)
+                        email_link_btn.first.click()
                 except Exception:
                     pass
 
                 # Step 5: Get magic link from email
                 logger.info("Waiting for magic link email...")
-                magic_link, email_id = self._get_magic_link(
-                    imap_host=imap_host,
-                    imap_user=imap_user,
-                    imap_password=imap_password,
-                    max_wait_seconds=90,
-                )
+                magic_link, email_id = self._get_magic_link(imap, max_wait_seconds=90)
 
                 if not magic_link:
                     logger.error("Failed to retrieve magic link from email")
@@ -212,77 +371,93 @@ class CreditsChecker(BaseChecker):
 
                 # Step 6: Navigate to magic link
                 logger.info("Navigating to magic link...")
-                page.goto(magic_link, wait_until="networkidle")
-                time.sleep(5)
+                self._follow_magic_link(page, magic_link)
 
                 # Step 7: Archive the magic link email
                 if archive_emails and email_id:
-                    self._archive_email(
-                        imap_host=imap_host,
-                        imap_user=imap_user,
-                        imap_password=imap_password,
-                        email_id=email_id,
-                    )
+                    self._archive_email(imap, email_id)
 
                 # Step 8: Navigate to billing page
                 logger.info("Navigating to billing page...")
-                page.goto(
-                    "https://console.anthropic.com/settings/billing",
-                    wait_until="networkidle",
-                )
-                time.sleep(3)
-
                 # Check if we're still logged in (not redirected to login page)
-                current_url = page.url
-                if "login" in current_url:
+                if not self._open_billing_page(page):
                     logger.error("Magic link expired or already used - redirected to login")
                     return None
 
                 # Step 9: Extract credit balance
-                logger.info("Extracting credit balance...")
-                page_text = page.inner_text("body")
-
-                # Look for credit/balance patterns
-                balance_patterns = [
-                    r"Credit Balance[:\s]*\$?([\d,]+\.?\d*)",
-                    r"\$([\d,]+\.?\d*)\s*(?:remaining|credit|balance)",
-                    r"remaining[:\s]*\$?([\d,]+\.?\d*)",
-                    r"balance[:\s]*\$?([\d,]+\.?\d*)",
-                    r"credits?[:\s]*\$?([\d,]+\.?\d*)",
-                ]
-
-                for pattern in balance_patterns:
-                    match = re.search(pattern, page_text, re.IGNORECASE)
-                    if match:
-                        balance_str = match.group(1).replace(",", "")
-                        balance = float(balance_str)
-                        logger.info(f"Found credit balance: ${balance:.2f}")
-                        return balance
-
-                logger.warning("Could not find credit balance pattern in page")
-                logger.debug(f"Page text: {page_text[:1000]}")
-                return None
+                return self._extract_balance(page)
 
             except Exception as e:
                 logger.error(f"Error during login: {e}")
                 raise
             finally:
-                browser.close()
+                context.close()
+
+    def _follow_magic_link(self, page: Any, magic_link: str) -> None:
+        """
+        Open the magic link and wait for its redirect back to the console.
+
+        A redirect that doesn't arrive in time isn't treated as a failure;
+        the billing page check that follows tells whether the login worked.
+        """
+        page.goto(magic_link, wait_until="domcontentloaded")
+        try:
+            page.wait_for_url(LOGGED_IN_URL_RE, timeout=PAGE_WAIT_TIMEOUT_MS)
+        except Exception as e:
+            logger.warning(f"No redirect to the console after the magic link: {e}")
+
+    def _open_billing_page(self, page: Any) -> bool:
+        """
+        Open the billing page and wait until it has rendered.
+
+        Returns:
+            False if the console redirected to the login page
+        """
+        page.goto(BILLING_URL, wait_until="domcontentloaded")
+
+        # Settles on either the balance (logged in) or the email input (redirected)
+        try:
+            balance_or_login = page.get_by_text(CREDIT_BALANCE_RE).or_(page.locator(EMAIL_INPUT_SELECTOR))
+            balance_or_login.first.wait_for(timeout=PAGE_WAIT_TIMEOUT_MS)
+        except Exception:
+            logger.warning("Billing page did not render a balance or login form in time")
+
+        return "login" not in page.url
+
+    def _browser_profile_dir(self, console_email: str) -> Path:
+        """Browser profile directory for a console account."""
+        account_key = hashlib.blake2b(console_email.lower().encode(), digest_size=8).hexdigest()
+        return BROWSER_PROFILE_DIR / f"credits-{account_key}"
+
+    def _extract_balance(self, page: Any) -> float | None:
+        """Extract the credit balance from the billing page."""
+        logger.info("Extracting credit balance...")
+        page_text = page.inner_text("body")
+
+        for pattern in _BALANCE_RES:
+            match = pattern.search(page_text)
+            if match:
+                balance = float(match.group(1).replace(",", ""))
+                logger.info(f"Found credit balance: ${balance:.2f}")
+                return balance
+
+        logger.warning("Could not find credit balance pattern in page")
+        logger.debug(f"Page text: {page_text[:1000]}")
+        return None
 
     def _get_magic_link(
         self,
-        imap_host: str,
-        imap_user: str,
-        imap_password: str,
+        imap: ImapSession,
         max_wait_seconds: int = 90,
     ) -> tuple[str | None, bytes | None]:
         """
-        Poll IMAP inbox for Anthropic magic link.
+        Wait for the Anthropic magic link to arrive in the IMAP inbox.
+
+        Uses IMAP IDLE between searches when the server supports it, so the
+        link is picked up as soon as it's delivered.
 
         Args:
-            imap_host: IMAP server hostname
-            imap_user: IMAP username
-            imap_password: IMAP password
+            imap: IMAP session to poll (kept open across polls)
             max_wait_seconds: Maximum time to wait for email
 
         Returns:
@@ -293,105 +468,134 @@ class CreditsChecker(BaseChecker):
 
         while time.time() - start_time < max_wait_seconds:
             try:
-                mail = imaplib.IMAP4_SSL(imap_host)
-                mail.login(imap_user, imap_password)
-                mail.select("INBOX")
+                mail = imap.get()
+                # NOOP lets the server report mail that arrived since the last poll
+                mail.noop()
 
-                # Search for Anthropic emails
+                # Search for unread Anthropic login emails; the server does the filtering
                 date_since = (datetime.now() - timedelta(days=1)).strftime("%d-%b-%Y")
-                _, messages = mail.search(None, f'(FROM "anthropic" SINCE "{date_since}")')
+                _, messages = mail.search(
+                    None,
+                    f'(UNSEEN FROM "anthropic" OR SUBJECT "secure link" SUBJECT "log in" SINCE "{date_since}")',
+                )
 
                 email_ids = messages[0].split()
 
                 if email_ids:
-                    for email_id in reversed(email_ids):
-                        _, msg_data = mail.fetch(email_id, "(RFC822)")
+                    # One round trip for the headers of every candidate (newest capped)
+                    batch = email_ids[-MAX_HEADER_FETCH:]
+                    _, header_data = mail.fetch(
+                        b",".join(batch), "(BODY.PEEK[HEADER.FIELDS (SUBJECT DATE)])"
+                    )
+                    login_ids = [
+                        response_part[0].split()[0]
+                        for response_part in header_data
+                        if isinstance(response_part, tuple)
+                        and self._is_fresh_login_email(email.message_from_bytes(response_part[1]))
+                    ]
+
+                    # Fetch full bodies only for login emails, newest first
+                    for email_id in sorted(login_ids, key=int, reverse=True):
+                        _, msg_data = mail.fetch(email_id, "(BODY.PEEK[])")
 
                         for response_part in msg_data:
                             if isinstance(response_part, tuple):
                                 msg = email.message_from_bytes(response_part[1])
-                                subject = msg.get("Subject", "")
-                                date_str = msg.get("Date", "")
-
-                                # Check if this is a login email
-                                if "secure link" not in subject.lower() and "log in" not in subject.lower():
-                                    continue
-
-                                # Parse email date to check freshness
-                                try:
-                                    email_date = parsedate_to_datetime(date_str)
-                                    email_age = (
-                                        datetime.now(email_date.tzinfo) - email_date
-                                    ).total_seconds()
-
-                                    # Skip emails older than 2 minutes
-                                    if email_age > 120:
-                                        continue
-
-                                    logger.info(f"Found recent login email ({int(email_age)}s old)")
-                                except Exception as e:
-                                    logger.debug(f"Could not parse date: {e}")
-                                    continue
-
-                                # Get the email body
-                                body = ""
-                                if msg.is_multipart():
-                                    for part in msg.walk():
-                                        if part.get_content_type() in ["text/html", "text/plain"]:
-                                            payload = part.get_payload(decode=True)
-                                            if payload:
-                                                body += payload.decode("utf-8", errors="replace")
-                                else:
-                                    payload = msg.get_payload(decode=True)
-                                    if payload:
-                                        body = payload.decode("utf-8", errors="replace")
-
-                                # Find magic link
-                                magic_link_match = re.search(
-                                    r'href="(https://platform\.claude\.com/magic-link[^"]+)"',
-                                    body,
-                                )
-                                if magic_link_match:
-                                    magic_link = magic_link_match.group(1)
+                                magic_link = self._find_magic_link(msg)
+                                if magic_link:
                                     logger.info("Found magic link!")
-                                    mail.logout()
                                     return magic_link, email_id
 
-                mail.logout()
-
+            except (imaplib.IMAP4.abort, OSError) as e:
+                logger.warning(f"IMAP connection lost, reconnecting: {e}")
+                imap.close()
             except Exception as e:
                 logger.warning(f"IMAP error: {e}")
 
-            elapsed = int(time.time() - start_time)
-            logger.info(f"No magic link yet, waiting... ({elapsed}s)")
-            time.sleep(3)
+            elapsed = time.time() - start_time
+            remaining = max_wait_seconds - elapsed
+            if remaining <= 0:
+                break
+            logger.info(f"No magic link yet, waiting... ({int(elapsed)}s)")
+
+            # Let the server push new mail to us; fall back to polling without IDLE
+            try:
+                if imap.supports_idle():
+                    imap.idle(timeout=min(remaining, MAX_IDLE_SECONDS))
+                    continue
+            except Exception as e:
+                logger.warning(f"IMAP IDLE failed, reconnecting: {e}")
+                imap.close()
+            time.sleep(min(remaining, POLL_INTERVAL_SECONDS))
 
         logger.warning("Timeout waiting for magic link email")
         return None, None
 
-    def _archive_email(
-        self,
-        imap_host: str,
-        imap_user: str,
-        imap_password: str,
-        email_id: bytes,
-    ) -> bool:
+    def _is_fresh_login_email(self, headers: email.message.Message) -> bool:
+        """Check headers for a login email received within the last 2 minutes."""
+        subject = headers.get("Subject", "")
+        date_str = headers.get("Date", "")
+
+        # Check if this is a login email
+        if "secure link" not in subject.lower() and "log in" not in subject.lower():
+            return False
+
+        # Parse email date to check freshness
+        try:
+            email_date = parsedate_to_datetime(date_str)
+            email_age = (datetime.now(email_date.tzinfo) - email_date).total_seconds()
+        except Exception as e:
+            logger.debug(f"Could not parse date: {e}")
+            return False
+
+        # Skip emails older than 2 minutes
+        if email_age > 120:
+            return False
+
+        logger.info(f"Found recent login email ({int(email_age)}s old)")
+        return True
+
+    def _find_magic_link(self, msg: email.message.Message) -> str | None:
+        """Extract the magic link URL from a login email body.
+
+        Only text parts are decoded, HTML first, stopping at the first part
+        that contains the link.
+        """
+        # walk() yields the message itself when it isn't multipart
+        for content_type in ("text/html", "text/plain"):
+            for part in msg.walk():
+                if part.get_content_type() != content_type:
+                    continue
+                payload = part.get_payload(decode=True)
+                # Cheap substring test before decoding and running the regex
+                if not payload or MAGIC_LINK_MARKER not in payload:
+                    continue
+
+                charset = part.get_content_charset() or "utf-8"
+                try:
+                    body = payload.decode(charset, errors="replace")
+                except LookupError:
+                    body = payload.decode("utf-8", errors="replace")
+
+                magic_link_match = MAGIC_LINK_RE.search(body)
+                if magic_link_match:
+                    return magic_link_match.group(1)
+
+        return None
+
+    def _archive_email(self, imap: ImapSession, email_id: bytes) -> bool:
         """
         Archive (move to trash or delete) the magic link email.
 
         Args:
-            imap_host: IMAP server hostname
-            imap_user: IMAP username
-            imap_password: IMAP password
+            imap: IMAP session the email_id was found in
             email_id: Email ID to archive
 
         Returns:
             True if successfully archived
         """
         try:
-            mail = imaplib.IMAP4_SSL(imap_host)
-            mail.login(imap_user, imap_password)
-            mail.select("INBOX")
+            mail = imap.get()
 
             # Try to move to trash (Gmail uses "[Gmail]/Trash")
             # For other providers, we just mark as deleted
@@ -405,7 +609,6 @@ class CreditsChecker(BaseChecker):
                 logger.info("Marked magic link email as deleted")
 
             mail.expunge()
-            mail.logout()
             return True
 
         except Exception as e:
@@ -1,22 +1,77 @@
 """News/RSS checker for Google Alerts replacement."""
 
 import hashlib
-import json
 import logging
 import os
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
 from typing import Any
 
-from anthropic import Anthropic
-
+from ..content import clean_for_llm
 from ..fetcher import fetch_rss, fetch_url
 from ..models import CheckResult, Monitor
-from .base import BaseChecker
+from .base import BaseChecker, get_anthropic_client, parse_json_response
 
 logger = logging.getLogger(__name__)
 
+# Static filter instructions, sent as the system prompt so the prefix is identical across calls
+FILTER_INSTRUCTIONS = """Decide whether the article provided by the user matches the given condition.
+
+Answer with JSON only: {"matches": true or false, "reason": "brief explanation"}"""
+
+FILTER_PROMPT_TEMPLATE = """CONDITION: {condition}
+
+ARTICLE TITLE: {title}
+SOURCE: {source}
+
+ARTICLE CONTENT:
+{content}"""
+
+# Article pages are cut off after this much HTML; only the first 10k chars
+# of text are sent to Claude anyway
+MAX_ARTICLE_BYTES = 500_000
+
+# Filter rejections remembered per monitor, so they aren't re-checked each run
+MAX_REJECTED_IDS = 500
+
+# Articles fetched and checked with Claude at the same time
+MAX_FILTER_WORKERS = 10
+
+# Claude filter request budget, shared by every news monitor in the process
+FILTER_REQUESTS_PER_MINUTE = 50
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` acquisitions per `period` seconds."""
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.capacity = float(rate)
+        self.tokens = float(rate)
+        self.refill_per_second = rate / period
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.refill_per_second
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_seconds = (1 - self.tokens) / self.refill_per_second
+            time.sleep(wait_seconds)
+
+
+_filter_rate_limiter = RateLimiter(FILTER_REQUESTS_PER_MINUTE)
+
 
 class NewsChecker(BaseChecker):
     """Checker for news feeds and Google News RSS.
@@ -36,7 +91,7 @@ class NewsChecker(BaseChecker):
     def client(self):
         """Lazy-load Anthropic client only when needed for filtering."""
         if self._client is None:
-            self._client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            self._client = get_anthropic_client(os.getenv("ANTHROPIC_API_KEY"))
         return self._client
 
     def check(self, monitor: Monitor) -> CheckResult:
@@ -49,28 +104,39 @@ class NewsChecker(BaseChecker):
         Returns:
             CheckResult with new articles in new_items
         """
-        feed = fetch_rss(monitor.url)
+        last_state = monitor.last_state
+        feed = fetch_rss(monitor.url, etag=last_state.get("etag"), modified=last_state.get("modified"))
+        validators = {"etag": feed.get("etag"), "modified": feed.get("modified")}
+
+        if feed.get("status") == 304:
+            logger.info(f"Feed not modified for {monitor.name}")
+            return CheckResult(
+                condition_met=False,
+                explanation="No new articles",
+                details=validators,
+                state_hash=monitor.last_state_hash,
+                cached=True,
+            )
 
         # Get previously seen article IDs
-        seen_ids: set = set(monitor.last_state.get("seen_ids", []))
+        seen_ids: set = set(last_state.get("seen_ids", []))
 
         # Process entries
+        entries = feed.get("entries") or []
+        get_article_id = self._get_article_id
+        all_ids = [get_article_id(entry) for entry in entries]
+
+        # Feeds sometimes repeat an entry; a repeated ID keeps its first position
+        entries_by_id = dict(zip(all_ids, entries))
+        new_ids = entries_by_id.keys() - seen_ids
+
         new_articles = []
-        all_ids = []
-
-        for entry in feed.get("entries", []):
-            article_id = self._get_article_id(entry)
-            all_ids.append(article_id)
-
-            if article_id not in seen_ids:
-                new_articles.append({
-                    "id": article_id,
-                    "title": entry.get("title", "No title"),
-                    "link": entry.get("link", ""),
-                    "published": entry.get("published", ""),
-                    "source": self._get_source(entry),
-                    "summary": entry.get("summary", "")[:500],
-                })
+        if new_ids:
+            new_articles = [
+                self._article_from_entry(article_id, entry)
+                for article_id, entry in entries_by_id.items()
+                if article_id in new_ids
+            ]
 
         # Filter by max age if configured (prevents old articles on first run)
         max_age_days = monitor.config.get("max_age_days")
@@ -83,9 +149,21 @@ class NewsChecker(BaseChecker):
 
         # Apply agentic filter if configured
         filter_condition = monitor.config.get("filter_condition")
+        rejected_ids = []
         if filter_condition and new_articles:
+            # Articles Claude already rejected for this same condition aren't re-checked
+            previously_rejected = (
+                set(monitor.last_state.get("rejected_ids", []))
+                if monitor.last_state.get("filter_condition") == filter_condition
+                else set()
+            )
+            candidates = [a for a in new_articles if a["id"] not in previously_rejected]
+            skipped = len(new_articles) - len(candidates)
+            if skipped:
+                logger.info(f"Agentic filter: skipping {skipped} articles already rejected")
+
             stop_on_first = monitor.config.get("stop_on_first_match", False)
-            new_articles = self._filter_articles(new_articles, filter_condition, stop_on_first)
+            new_articles, rejected_ids = self._filter_articles(candidates, filter_condition, stop_on_first)
 
         # Build result
         has_new = len(new_articles) > 0
@@ -98,89 +176,98 @@ class NewsChecker(BaseChecker):
         return CheckResult(
             condition_met=has_new,
             explanation=explanation,
-            details={"feed_title": feed.get("feed", {}).get("title", "")},
+            details={"feed_title": feed.get("feed", {}).get("title", ""), **validators},
             new_items=new_articles,
-            state_hash=hashlib.sha256(",".join(all_ids).encode()).hexdigest()[:16],
+            state_hash=self._feed_hash(all_ids),
+            rejected_ids=rejected_ids,
         )
 
     def _filter_articles(
         self, articles: list[dict], condition: str, stop_on_first: bool = False
-    ) -> list[dict]:
-        """Filter articles using Claude to check if they match the condition."""
-        filtered = []
-        checked = 0
-
-        # Rate limit: 1.5s between API calls keeps us under 50/minute
-        api_delay = 1.5
-
-        for article in articles:
-            checked += 1
-            try:
-                # Try to fetch full article content
-                content = article.get("summary", "")
-                if article.get("link"):
-                    try:
-                        result = fetch_url(article["link"], timeout=15)
-                        content = result.text[:10000]  # Limit content size
-                    except Exception as e:
-                        logger.debug(f"Could not fetch article: {e}")
-                        # Fall back to title + summary
-                        content = f"Title: {article.get('title', '')}\n\nSummary: {article.get('summary', '')}"
-
-                # Ask Claude if article matches condition
-                if self._article_matches_condition(article, content, condition):
-                    filtered.append(article)
-                    if stop_on_first:
-                        logger.info(f"Agentic filter: found match after checking {checked} articles (stop_on_first=True)")
-                        return filtered
+    ) -> tuple[list[dict], list[str]]:
+        """
+        Filter articles using Claude to check if they match the condition.
 
-                # Rate limit delay between API calls
-                if checked < len(articles):
-                    time.sleep(api_delay)
+        Articles are fetched and checked concurrently (up to MAX_FILTER_WORKERS),
+        with Claude calls held to FILTER_REQUESTS_PER_MINUTE. Matches are
+        returned in feed order. With stop_on_first, the first match to come
+        back is returned and articles not yet started are skipped.
 
-            except Exception as e:
-                logger.warning(f"Error filtering article: {e}")
-                # On error, include the article to avoid missing things
-                filtered.append(article)
-                if stop_on_first:
-                    return filtered
+        Returns:
+            Tuple of (matching articles, IDs of articles checked and rejected)
+        """
+        matched = [False] * len(articles)
+        rejected_ids = []
+
+        with ThreadPoolExecutor(max_workers=MAX_FILTER_WORKERS) as executor:
+            pending = {
+                executor.submit(self._check_article, article, condition): index
+                for index, article in enumerate(articles)
+            }
+            checked = 0
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    checked += 1
+                    matched[index] = future.result()
+                    if not matched[index]:
+                        rejected_ids.append(articles[index]["id"])
+                    elif stop_on_first:
+                        logger.info(f"Agentic filter: found match after checking {checked} articles (stop_on_first=True)")
+                        for other in pending:
+                            other.cancel()
+                        return [articles[index]], rejected_ids
 
+        filtered = [article for article, is_match in zip(articles, matched) if is_match]
         logger.info(f"Agentic filter: {len(filtered)}/{len(articles)} articles matched condition")
-        return filtered
+        return filtered, rejected_ids
+
+    def _check_article(self, article: dict, condition: str) -> bool:
+        """Fetch one article and ask Claude whether it matches the condition."""
+        try:
+            # Try to fetch full article content
+            content = article.get("summary", "")
+            if article.get("link"):
+                try:
+                    result = fetch_url(article["link"], timeout=15, max_bytes=MAX_ARTICLE_BYTES)
+                    content = clean_for_llm(result.text, condition)[:10000]  # Limit content size
+                except Exception as e:
+                    logger.debug(f"Could not fetch article: {e}")
+                    # Fall back to title + summary
+                    content = f"Title: {article.get('title', '')}\n\nSummary: {article.get('summary', '')}"
+
+            # Ask Claude if article matches condition
+            _filter_rate_limiter.acquire()
+            return self._article_matches_condition(article, content, condition)
+
+        except Exception as e:
+            logger.warning(f"Error filtering article: {e}")
+            # On error, include the article to avoid missing things
+            return True
 
     def _article_matches_condition(
         self, article: dict, content: str, condition: str
     ) -> bool:
         """Use Claude to determine if article matches the filter condition."""
-        prompt = f"""Does this article match the following condition?
-
-CONDITION: {condition}
-
-ARTICLE TITLE: {article.get('title', 'Unknown')}
-SOURCE: {article.get('source', 'Unknown')}
-
-ARTICLE CONTENT:
-{content[:8000]}
-
-Answer with JSON only: {{"matches": true or false, "reason": "brief explanation"}}"""
+        prompt = FILTER_PROMPT_TEMPLATE.format(
+            condition=condition,
+            title=article.get("title", "Unknown"),
+            source=article.get("source", "Unknown"),
+            content=content[:8000],
+        )
 
         try:
             response = self.client.messages.create(
                 model="claude-3-haiku-20240307",  # Use Haiku for filtering (cheaper)
                 max_tokens=100,
+                system=FILTER_INSTRUCTIONS,
                 messages=[{"role": "user", "content": prompt}],
             )
 
             response_text = response.content[0].text.strip()
 
-            # Parse response
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
-
-            result = json.loads(response_text)
+            result = parse_json_response(response_text)
             matches = result.get("matches", False)
             reason = result.get("reason", "")
 
@@ -196,22 +283,55 @@ Answer with JSON only: {{"matches": true or false, "reason": "brief explanation"
         return len(result.new_items) > 0
 
     def get_state_for_storage(self, result: CheckResult, monitor: Monitor) -> dict[str, Any]:
-        """Store seen article IDs."""
+        """Store seen article IDs and the filter's rejected article IDs."""
         # Merge new IDs with existing ones
         existing_ids = monitor.last_state.get("seen_ids", [])
         new_ids = [item["id"] for item in result.new_items]
 
-        # Keep last 500 IDs to prevent unbounded growth
-        all_ids = new_ids + existing_ids
-        return {
+        # Keep last 500 IDs (newest first, no repeats) to prevent unbounded growth
+        all_ids = list(dict.fromkeys(new_ids + existing_ids))
+        state = {
             "condition_met": result.condition_met,
             "seen_ids": all_ids[:500],
             "last_count": len(result.new_items),
         }
 
+        # Validators for a conditional GET next time
+        for key in ("etag", "modified"):
+            if result.details.get(key):
+                state[key] = result.details[key]
+
+        # Remember rejections only while the filter condition stays the same
+        filter_condition = monitor.config.get("filter_condition")
+        if filter_condition:
+            previous = (
+                monitor.last_state.get("rejected_ids", [])
+                if monitor.last_state.get("filter_condition") == filter_condition
+                else []
+            )
+            state["filter_condition"] = filter_condition
+            state["rejected_ids"] = (result.rejected_ids + previous)[:MAX_REJECTED_IDS]
+
+        return state
+
+    def _feed_hash(self, article_ids: list[str]) -> str:
+        """
+        Fingerprint of the feed's article IDs, used only for change detection.
+
+        XOR of per-ID 64-bit digests, so it doesn't depend on entry order: a
+        feed that only reshuffles the same articles keeps the same hash.
+        """
+        fingerprint = 0
+        for article_id in set(article_ids):
+            digest = hashlib.blake2b(article_id.encode(), digest_size=8).digest()
+            fingerprint ^= int.from_bytes(digest, "big")
+        return f"{fingerprint:016x}"
+
     def _get_article_id(self, entry: dict) -> str:
         """Generate unique ID for an article."""
-        # Prefer explicit ID, fall back to link hash
+        # Prefer explicit ID, fall back to link hash. These IDs are persisted in
+        # seen_ids, so the hash must stay SHA-256 or every stored article would
+        # look new again.
         if entry.get("id"):
             return entry["id"]
         if entry.get("link"):
@@ -220,6 +340,17 @@ Answer with JSON only: {{"matches": true or false, "reason": "brief explanation"
             return hashlib.sha256(entry["title"].encode()).hexdigest()[:16]
         return hashlib.sha256(str(entry).encode()).hexdigest()[:16]
 
+    def _article_from_entry(self, article_id: str, entry: dict) -> dict:
+        """Build the stored/notified article dict for a feed entry."""
+        return {
+            "id": article_id,
+            "title": entry.get("title", "No title"),
+            "link": entry.get("link", ""),
+            "published": entry.get("published", ""),
+            "source": self._get_source(entry),
+            "summary": entry.get("summary", "")[:500],
+        }
+
     def _get_source(self, entry: dict) -> str:
         """Extract source name from entry."""
         # Google News includes source in title like "Article Title - Source Name"
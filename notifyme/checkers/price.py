@@ -10,6 +10,9 @@ from .base import BaseChecker
 
 logger = logging.getLogger(__name__)
 
+# Numeric price (optionally with cents) once currency symbols are stripped
+_PRICE_RE = re.compile(r"(\d+(?:\.\d{2})?)")
+
 
 class PriceChecker(BaseChecker):
     """Checker that monitors prices and alerts on drops below threshold."""
@@ -22,6 +25,8 @@ class PriceChecker(BaseChecker):
             - selector: CSS selector for price element
             - threshold: Price threshold to alert below
             - currency: Expected currency symbol (default: $)
+            - ready_selector: With use_playwright, read the page once this
+                              element appears (default: selector)
 
         Args:
             monitor: Monitor with URL and price config
@@ -39,20 +44,23 @@ class PriceChecker(BaseChecker):
         if threshold is None:
             raise ValueError(f"Price monitor {monitor.name} requires 'threshold' in config")
 
-        result = fetch_url(monitor.url, use_playwright=use_playwright)
-        soup = result.soup
+        result = fetch_url(
+            monitor.url,
+            use_playwright=use_playwright,
+            # Only Playwright waits; leaving it unset keeps requests fetches shareable
+            ready_selector=monitor.config.get("ready_selector", selector) if use_playwright else None,
+        )
 
         # Find price element
-        element = soup.select_one(selector)
-        if not element:
+        price_text = result.select_text(selector)
+        if price_text is None:
             return CheckResult(
                 condition_met=False,
                 explanation=f"Price element not found with selector: {selector}",
                 details={"error": "selector_not_found"},
             )
 
-        # Extract and parse price
-        price_text = element.get_text(strip=True)
+        # Parse price
         price = self._parse_price(price_text, currency)
 
         if price is None:
@@ -64,7 +72,6 @@ class PriceChecker(BaseChecker):
 
         # Compare to threshold
         below_threshold = price < threshold
-        previous_below = monitor.last_state.get("below_threshold", False)
 
         if below_threshold:
             explanation = f"Price ${price:.2f} is below threshold ${threshold:.2f}"
@@ -111,7 +118,7 @@ class PriceChecker(BaseChecker):
         cleaned = text.replace(currency, "").replace("USD", "").replace(",", "").strip()
 
         # Extract numeric value
-        match = re.search(r"(\d+(?:\.\d{2})?)", cleaned)
+        match = _PRICE_RE.search(cleaned)
         if match:
             try:
                 return float(match.group(1))
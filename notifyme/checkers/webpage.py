@@ -1,17 +1,32 @@
 """Webpage change detection checker."""
 
+import hashlib
 import logging
 from typing import Any
 
-from ..fetcher import fetch_url
+from ..fetcher import content_digest, fetch_url, text_parser
 from ..models import CheckResult, Monitor
 from .base import BaseChecker
 
 logger = logging.getLogger(__name__)
 
+# Fingerprint stored in state["hash"] (older state has no marker and used SHA-256)
+HASH_ALGORITHM = "blake2b"
+
+# Parser assumed for state stored before state["text_parser"] was recorded
+LEGACY_TEXT_PARSER = "html.parser"
+
 
 class WebpageChecker(BaseChecker):
-    """Checker that detects any changes to a webpage."""
+    """Checker that detects any changes to a webpage.
+
+    Config options:
+        - selector: Optional CSS selector; only that element's text is compared
+        - use_playwright: Use Playwright for JS-rendered pages
+        - ready_selector: With use_playwright, read the page once this element
+                          appears instead of waiting for network idle
+                          (default: selector)
+    """
 
     def check(self, monitor: Monitor) -> CheckResult:
         """
@@ -25,29 +40,70 @@ class WebpageChecker(BaseChecker):
         """
         use_playwright = monitor.config.get("use_playwright", False)
         selector = monitor.config.get("selector")  # Optional CSS selector
+        last_state = monitor.last_state
+        previous_hash = last_state.get("hash")
+
+        # Conditional GET: the server answers 304 with no body if the page is unchanged.
+        # Servers that ignore it still skip parsing when the body is byte-identical.
+        headers = {}
+        known_body_hash = None
+        if previous_hash is not None:
+            if last_state.get("etag"):
+                headers["If-None-Match"] = last_state["etag"]
+            if last_state.get("modified"):
+                headers["If-Modified-Since"] = last_state["modified"]
+            known_body_hash = last_state.get("body_hash")
+
+        result = fetch_url(
+            monitor.url,
+            use_playwright=use_playwright,
+            headers=headers or None,
+            known_body_hash=known_body_hash,
+            ready_selector=monitor.config.get("ready_selector", selector) if use_playwright else None,
+        )
+        validators = {"etag": result.etag, "modified": result.modified, "body_hash": result.body_hash}
 
-        result = fetch_url(monitor.url, use_playwright=use_playwright)
+        if result.not_modified:
+            # A 304 has no body; keep the previous body fingerprint
+            validators["body_hash"] = result.body_hash or known_body_hash
+            return CheckResult(
+                condition_met=False,
+                explanation="No changes detected (not modified)",
+                details={"hash": previous_hash, "previous_hash": previous_hash, **validators},
+                state_hash=previous_hash,
+                cached=True,
+            )
 
         # If selector specified, only hash that portion
-        if selector:
-            soup = result.soup
-            element = soup.select_one(selector)
-            if element:
-                import hashlib
-                content = element.get_text(strip=True)
-                content_hash = hashlib.sha256(content.encode()).hexdigest()[:16]
-            else:
-                logger.warning(f"Selector {selector} not found on {monitor.url}")
-                content_hash = result.content_hash
+        content = result.select_text(selector) if selector else None
+        if content is not None:
+            content_hash = content_digest(content)
         else:
+            if selector:
+                logger.warning(f"Selector {selector} not found on {monitor.url}")
+            content = result.text
             content_hash = result.content_hash
 
         # Compare to previous hash
-        previous_hash = monitor.last_state.get("hash")
-        changed = previous_hash is not None and content_hash != previous_hash
+        parser = text_parser()
+        parser_changed = (
+            previous_hash is not None and (last_state.get("text_parser") or LEGACY_TEXT_PARSER) != parser
+        )
+        if parser_changed:
+            # Text from a different HTML parser isn't comparable; start a new baseline
+            logger.info(f"HTML parser changed to {parser} for {monitor.url}, re-recording baseline")
+            changed = False
+        elif previous_hash is not None and last_state.get("hash_algorithm") != HASH_ALGORITHM:
+            # Baseline stored before the switch from SHA-256; accept either fingerprint
+            legacy_hash = hashlib.sha256(content.encode()).hexdigest()[:16]
+            changed = previous_hash not in (content_hash, legacy_hash)
+        else:
+            changed = previous_hash is not None and content_hash != previous_hash
 
         if previous_hash is None:
             explanation = "First check - baseline recorded"
+        elif parser_changed:
+            explanation = "HTML parser changed - baseline re-recorded"
         elif changed:
             explanation = "Page content has changed"
         else:
@@ -56,7 +112,7 @@ class WebpageChecker(BaseChecker):
         return CheckResult(
             condition_met=changed,
             explanation=explanation,
-            details={"hash": content_hash, "previous_hash": previous_hash},
+            details={"hash": content_hash, "previous_hash": previous_hash, **validators},
             state_hash=content_hash,
         )
 
@@ -66,8 +122,17 @@ class WebpageChecker(BaseChecker):
         return previous_hash is not None and result.condition_met
 
     def get_state_for_storage(self, result: CheckResult, monitor: Monitor) -> dict[str, Any]:
-        """Store the content hash."""
-        return {
+        """Store the content hash, the raw body hash and the validators for a conditional GET."""
+        state = {
             "condition_met": result.condition_met,
             "hash": result.state_hash,
+            # A 304 keeps the old hash, which may still be a legacy SHA-256 one
+            "hash_algorithm": (
+                monitor.last_state.get("hash_algorithm") if result.cached else HASH_ALGORITHM
+            ),
+            "text_parser": monitor.last_state.get("text_parser") if result.cached else text_parser(),
         }
+        for key in ("etag", "modified", "body_hash"):
+            if result.details.get(key):
+                state[key] = result.details[key]
+        return state
@@ -6,15 +6,13 @@ import sys
 from datetime import datetime
 
 import click
-from dotenv import load_dotenv
 
 from .database import Database
 from .models import Monitor, MonitorType
-from .notifier import EmailNotifier
-from .scheduler import CheckOrchestrator
 
-# Load environment variables
-load_dotenv()
+# The fetcher, checkers and notifier (requests, bs4, asyncio, smtplib) are
+# imported inside the commands that use them, so `--help`, `list` and
+# `history` start without loading them.
 
 # Configure logging
 logging.basicConfig(
@@ -31,6 +29,11 @@ logger = logging.getLogger(__name__)
 @click.pass_context
 def cli(ctx: click.Context, db_path: str | None, verbose: bool) -> None:
     """NotifyMe - Agentic Monitoring & Notification System"""
+    from dotenv import load_dotenv
+
+    # Load environment variables
+    load_dotenv()
+
     ctx.ensure_object(dict)
     ctx.obj["db"] = Database(db_path) if db_path else Database()
 
@@ -52,6 +55,7 @@ def cli(ctx: click.Context, db_path: str | None, verbose: bool) -> None:
 @click.option("--selector", "-s", help="CSS selector for price/webpage monitors")
 @click.option("--threshold", type=float, help="Price threshold for price monitors")
 @click.option("--playwright", is_flag=True, help="Use Playwright for JS-rendered pages")
+@click.option("--ready-selector", help="With --playwright: read the page once this CSS selector appears (default: --selector)")
 @click.option("--notify-on-each", is_flag=True, help="Notify on each new match (for recurring events like sports wins)")
 @click.option("--filter", "filter_condition", help="Agentic filter for news monitors (e.g., 'article announces product is available')")
 @click.option("--first-match", is_flag=True, help="Stop checking after first matching article (saves API costs for announcements)")
@@ -59,6 +63,7 @@ def cli(ctx: click.Context, db_path: str | None, verbose: bool) -> None:
 @click.option("--browser-agent", is_flag=True, help="Use AI-controlled browser for anti-bot evasion (headed by default)")
 @click.option("--browser-task", help="Task for browser agent (e.g., 'scroll to find the price')")
 @click.option("--headless", is_flag=True, help="Run browser-agent in headless mode (less effective against bot detection)")
+@click.option("--compress", is_flag=True, help="For agentic monitors: send the page lines most relevant to the condition instead of truncating long pages")
 @click.pass_context
 def add(
     ctx: click.Context,
@@ -70,6 +75,7 @@ def add(
     selector: str | None,
     threshold: float | None,
     playwright: bool,
+    ready_selector: str | None,
     notify_on_each: bool,
     filter_condition: str | None,
     first_match: bool,
@@ -77,6 +83,7 @@ def add(
     browser_agent: bool,
     browser_task: str | None,
     headless: bool,
+    compress: bool,
 ) -> None:
     """Add a new monitor."""
     db: Database = ctx.obj["db"]
@@ -102,6 +109,16 @@ def add(
     elif not url:
         raise click.ClickException(f"{monitor_type} monitors require --url")
 
+    if selector:
+        from .fetcher import selector_combinators
+
+        if selector_combinators(selector) > 1:
+            click.echo(
+                f"Warning: selector '{selector}' chains several combinators. A single "
+                "#id or .class is faster to match and less likely to break.",
+                err=True,
+            )
+
     # Build config
     config = {}
     if selector:
@@ -110,6 +127,8 @@ def add(
         config["threshold"] = threshold
     if playwright:
         config["use_playwright"] = True
+    if ready_selector:
+        config["ready_selector"] = ready_selector
     if notify_on_each:
         config["notify_on_each"] = True
     if filter_condition:
@@ -123,6 +142,8 @@ def add(
         config["browser_headed"] = not headless  # Default True (headed)
     if browser_task:
         config["browser_task"] = browser_task
+    if compress:
+        config["compression"] = True
 
     # Credits monitor specific: archive emails by default, run headless
     if mtype == MonitorType.CREDITS:
@@ -156,12 +177,13 @@ def add(
 def list_monitors(ctx: click.Context, show_all: bool, as_json: bool) -> None:
     """List all monitors."""
     db: Database = ctx.obj["db"]
-    monitors = db.list_monitors(active_only=not show_all)
-
     if as_json:
+        monitors = db.list_monitors(active_only=not show_all)
         click.echo(json.dumps([m.to_dict() for m in monitors], indent=2))
         return
 
+    monitors = db.list_monitors_summary(active_only=not show_all)
+
     if not monitors:
         click.echo("No monitors found. Add one with: notifyme add --help")
         return
@@ -185,11 +207,26 @@ def list_monitors(ctx: click.Context, show_all: bool, as_json: bool) -> None:
 @click.argument("monitor_id", required=False)
 @click.option("--all", "check_all", is_flag=True, help="Check all monitors (ignore schedule)")
 @click.option("--dry-run", is_flag=True, help="Don't send actual notifications")
+@click.option(
+    "--concurrency", "-j",
+    type=click.IntRange(min=1),
+    help="Max monitors checked at once (default: 10)",
+)
 @click.pass_context
-def check(ctx: click.Context, monitor_id: str | None, check_all: bool, dry_run: bool) -> None:
+def check(
+    ctx: click.Context,
+    monitor_id: str | None,
+    check_all: bool,
+    dry_run: bool,
+    concurrency: int | None,
+) -> None:
     """Check monitors and send notifications if conditions are met."""
+    from .scheduler import DEFAULT_MAX_CONCURRENCY, CheckOrchestrator
+
     db: Database = ctx.obj["db"]
-    orchestrator = CheckOrchestrator(db=db, dry_run=dry_run)
+    orchestrator = CheckOrchestrator(
+        db=db, dry_run=dry_run, max_concurrency=concurrency or DEFAULT_MAX_CONCURRENCY
+    )
 
     def on_result(monitor: Monitor, result) -> None:
         status = "MET" if result.condition_met else "not met"
@@ -246,10 +283,10 @@ def history(ctx: click.Context, monitor_id: str | None, limit: int, as_json: boo
         else:
             raise click.ClickException(f"Monitor not found: {monitor_id}")
 
-    notifications = db.get_notifications(monitor_id=resolved_id, limit=limit)
+    notifications = db.get_notifications_with_monitor(monitor_id=resolved_id, limit=limit)
 
     if as_json:
-        click.echo(json.dumps([n.to_dict() for n in notifications], indent=2))
+        click.echo(json.dumps([n.to_dict() for n, _ in notifications], indent=2))
         return
 
     if not notifications:
@@ -257,9 +294,8 @@ def history(ctx: click.Context, monitor_id: str | None, limit: int, as_json: boo
         return
 
     click.echo(f"\nNotification History (last {limit}):\n")
-    for n in notifications:
-        monitor = db.get_monitor(n.monitor_id)
-        monitor_name = monitor.name if monitor else n.monitor_id[:8]
+    for n, monitor_name in notifications:
+        monitor_name = monitor_name or n.monitor_id[:8]
         click.echo(f"  [{n.sent_at.strftime('%Y-%m-%d %H:%M')}] {monitor_name}")
         click.echo(f"    {n.message}")
         click.echo()
@@ -318,6 +354,8 @@ def remove(ctx: click.Context, monitor_id: str, force: bool) -> None:
 @click.pass_context
 def test_email(ctx: click.Context) -> None:
     """Test email configuration."""
+    from .notifier import EmailNotifier
+
     notifier = EmailNotifier()
 
     click.echo("Testing email configuration...")
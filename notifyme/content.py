@@ -0,0 +1,183 @@
+"""Content preparation helpers for LLM prompts."""
+
+import math
+import re
+from collections import Counter
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Common words that carry no signal when matching a condition against page lines
+STOPWORDS = frozenset(
+    "a an and are as at be by did do does for from has have if in is it its of on or "
+    "that the their this to was were will with".split()
+)
+
+# BM25 tuning constants (standard defaults)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Minimum shared prefix for a query term to match a longer/shorter word form
+MIN_PREFIX_MATCH = 4
+
+# Short lines matching this are site chrome (cookie banners, legal footers, etc.)
+_BOILERPLATE_RE = re.compile(
+    r"cookie|privacy policy|terms of (?:use|service)|all rights reserved|\u00a9|copyright"
+    r"|newsletter|subscribe|skip to (?:main )?content|accept all|manage preferences",
+    re.IGNORECASE,
+)
+
+# Longer lines are kept even if they match, since they're likely real content
+BOILERPLATE_MAX_LINE_CHARS = 120
+
+# A price on a boilerplate-looking line ("Subscribe & Save: $19.99") marks it as content
+_PRICE_RE = re.compile(r"[$\u00a3\u20ac\u00a5]\s?\d|\d[.,]\d{2}\b")
+
+_SPACE_RE = re.compile(r"\s+")
+
+# Average characters per token for ASCII/English text with Claude's tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def _words(text: str) -> list[str]:
+    """Lowercase alphanumeric words in text."""
+    return _WORD_RE.findall(text.lower())
+
+
+def _term_matches(query_term: str, word: str) -> bool:
+    """Match a query term against a word, allowing prefix expansion (e.g. announce/announced)."""
+    if query_term == word:
+        return True
+    shorter, longer = sorted((query_term, word), key=len)
+    return len(shorter) >= MIN_PREFIX_MATCH and longer.startswith(shorter)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the Claude token count of text without calling a tokenizer.
+
+    ASCII text averages about CHARS_PER_TOKEN chars per token. Non-ASCII
+    characters (CJK, emoji, accented letters) are counted as one token each
+    so token-dense pages aren't underestimated.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return -(-ascii_chars // CHARS_PER_TOKEN) + (len(text) - ascii_chars)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to the longest prefix estimated to fit within max_tokens."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # The estimate only grows as the prefix grows, so binary search the cut point
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+def clean_for_llm(text: str, condition: str = "") -> str:
+    """
+    Strip low-value text before sending a page to Claude.
+
+    Collapses whitespace within lines, drops short boilerplate lines
+    (cookie banners, legal footers, newsletter prompts) and repeated
+    consecutive lines. Line structure is preserved.
+
+    Args:
+        text: Page text, one logical block per line
+        condition: Monitor condition; boilerplate-looking lines that share a
+                   term with it, or that contain a price, are kept
+    """
+    condition_terms = {t for t in _words(condition) if t not in STOPWORDS}
+    cleaned = []
+    for line in text.splitlines():
+        line = _SPACE_RE.sub(" ", line).strip()
+        if not line:
+            continue
+        if (
+            len(line) <= BOILERPLATE_MAX_LINE_CHARS
+            and _BOILERPLATE_RE.search(line)
+            and not _looks_like_content(line, condition_terms)
+        ):
+            continue
+        if cleaned and cleaned[-1] == line:
+            continue
+        cleaned.append(line)
+    return "\n".join(cleaned)
+
+
+def _looks_like_content(line: str, condition_terms: set[str]) -> bool:
+    """Whether a boilerplate-looking line holds a price or a condition term."""
+    if _PRICE_RE.search(line):
+        return True
+    return any(_term_matches(term, word) for word in _words(line) for term in condition_terms)
+
+
+def compress_content(content: str, query: str, max_tokens: int) -> str:
+    """
+    Keep the lines of content most relevant to query within a token budget.
+
+    Lines are scored with BM25 against the query terms and kept greedily from
+    the highest score until max_tokens is used up. Lines that don't match any
+    term fill whatever budget remains. Kept lines stay in their original order.
+
+    Args:
+        content: Page text, one logical block per line
+        query: Text to rank lines against (e.g. the monitor condition)
+        max_tokens: Estimated token budget for the returned content
+
+    Returns:
+        Content unchanged if it fits, otherwise the selected lines (or, if no
+        line fits on its own, content truncated to the budget)
+    """
+    if estimate_tokens(content) <= max_tokens:
+        return content
+
+    lines = [line for line in content.splitlines() if line.strip()]
+    query_terms = {t for t in _words(query) if t not in STOPWORDS}
+    line_counts = [Counter(_words(line)) for line in lines]
+
+    # Per-line term frequency for each query term, with prefix expansion
+    term_freqs = [
+        {
+            term: sum(count for word, count in counts.items() if _term_matches(term, word))
+            for term in query_terms
+        }
+        for counts in line_counts
+    ]
+
+    num_lines = len(lines)
+    avg_len = sum(sum(c.values()) for c in line_counts) / max(num_lines, 1) or 1.0
+    idf = {}
+    for term in query_terms:
+        doc_freq = sum(1 for tf in term_freqs if tf[term])
+        idf[term] = math.log(1 + (num_lines - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    scores = []
+    for counts, tf in zip(line_counts, term_freqs):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * sum(counts.values()) / avg_len)
+        scores.append(sum(
+            idf[term] * tf[term] * (BM25_K1 + 1) / (tf[term] + norm)
+            for term in query_terms
+            if tf[term]
+        ))
+
+    # Greedily fill the budget by score; ties keep document order
+    kept = []
+    used = 0
+    for index in sorted(range(num_lines), key=lambda i: (-scores[i], i)):
+        size = estimate_tokens(lines[index]) + 1
+        if used + size <= max_tokens:
+            kept.append(index)
+            used += size
+
+    if not kept:
+        # No whole line fits (e.g. minified text on one line); keep its start instead
+        return truncate_to_tokens(content, max_tokens) + "\n\n[Content truncated...]"
+
+    kept.sort()
+    return "\n".join(lines[i] for i in kept) + "\n\n[Content compressed to most relevant lines...]"
@@ -1,15 +1,114 @@
 """SQLite database operations for NotifyMe."""
 
 import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from .models import Monitor, NotificationLog
-
+from .models import Monitor, MonitorSummary, NotificationLog
 
 DEFAULT_DB_PATH = Path.home() / ".notifyme" / "notifyme.db"
 
+# WAL lets readers (e.g. `notifyme list`) run alongside a check run's writes;
+# NORMAL skips the fsync on every commit, which is safe under WAL
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Statements are module constants so each is built once and hits the
+# connection's prepared-statement cache by the same string every call
+_SQL_INSERT_MONITOR = """
+INSERT INTO monitors (
+    id, name, type, url, config, check_interval_minutes,
+    condition, last_checked, last_state, last_state_hash,
+    is_active, created_at, updated_at, next_check_at
+) VALUES (
+    :id, :name, :type, :url, :config, :check_interval_minutes,
+    :condition, :last_checked, :last_state, :last_state_hash,
+    :is_active, :created_at, :updated_at, :next_check_at
+)
+"""
+_SQL_GET_MONITOR = "SELECT * FROM monitors WHERE id = ?"
+_SQL_GET_MONITOR_BY_NAME = "SELECT * FROM monitors WHERE LOWER(name) = LOWER(?)"
+_SQL_LIST_ACTIVE_MONITORS = "SELECT * FROM monitors WHERE is_active = 1 ORDER BY created_at"
+_SQL_LIST_MONITORS = "SELECT * FROM monitors ORDER BY created_at"
+# Display columns only: skips parsing config and the timestamps a listing never shows
+_SQL_MONITOR_SUMMARY_COLUMNS = (
+    "id, name, type, url, condition, check_interval_minutes, last_checked, last_state, is_active"
+)
+_SQL_LIST_ACTIVE_MONITOR_SUMMARIES = (
+    f"SELECT {_SQL_MONITOR_SUMMARY_COLUMNS} FROM monitors WHERE is_active = 1 ORDER BY created_at"
+)
+_SQL_LIST_MONITOR_SUMMARIES = f"SELECT {_SQL_MONITOR_SUMMARY_COLUMNS} FROM monitors ORDER BY created_at"
+_SQL_MONITORS_DUE = """
+SELECT * FROM monitors
+WHERE is_active = 1
+AND (next_check_at IS NULL OR next_check_at <= ?)
+ORDER BY next_check_at NULLS FIRST
+"""
+_SQL_UPDATE_MONITOR = """
+UPDATE monitors SET
+    name = :name,
+    type = :type,
+    url = :url,
+    config = :config,
+    check_interval_minutes = :check_interval_minutes,
+    condition = :condition,
+    last_checked = :last_checked,
+    last_state = :last_state,
+    last_state_hash = :last_state_hash,
+    is_active = :is_active,
+    updated_at = :updated_at,
+    next_check_at = :next_check_at
+WHERE id = :id
+"""
+_SQL_TOUCH_MONITOR = """
+UPDATE monitors SET last_checked = :last_checked, next_check_at = :next_check_at
+WHERE id = :id
+"""
+_SQL_DELETE_MONITOR_NOTIFICATIONS = "DELETE FROM notifications_log WHERE monitor_id = ?"
+_SQL_DELETE_MONITOR = "DELETE FROM monitors WHERE id = ?"
+_SQL_SET_MONITOR_ACTIVE = "UPDATE monitors SET is_active = ?, updated_at = ? WHERE id = ?"
+_SQL_INSERT_NOTIFICATION = """
+INSERT INTO notifications_log (id, monitor_id, message, details, sent_at)
+VALUES (:id, :monitor_id, :message, :details, :sent_at)
+"""
+_SQL_MONITOR_NOTIFICATIONS = """
+SELECT * FROM notifications_log
+WHERE monitor_id = ?
+ORDER BY sent_at DESC
+LIMIT ?
+"""
+_SQL_NOTIFICATIONS = """
+SELECT * FROM notifications_log
+ORDER BY sent_at DESC
+LIMIT ?
+"""
+_SQL_MONITOR_NOTIFICATIONS_WITH_NAME = """
+SELECT n.*, m.name AS monitor_name FROM notifications_log n
+LEFT JOIN monitors m ON n.monitor_id = m.id
+WHERE n.monitor_id = ?
+ORDER BY n.sent_at DESC
+LIMIT ?
+"""
+_SQL_NOTIFICATIONS_WITH_NAME = """
+SELECT n.*, m.name AS monitor_name FROM notifications_log n
+LEFT JOIN monitors m ON n.monitor_id = m.id
+ORDER BY n.sent_at DESC
+LIMIT ?
+"""
+_SQL_LAST_NOTIFICATION = """
+SELECT * FROM notifications_log
+WHERE monitor_id = ?
+ORDER BY sent_at DESC
+LIMIT 1
+"""
+
 
 class Database:
     """SQLite database wrapper for NotifyMe."""
@@ -17,13 +116,86 @@ class Database:
     def __init__(self, db_path: Path | str | None = None):
         self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection for the Database's lifetime, shared across threads
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            self._conn.execute(pragma)
+        self._lock = threading.RLock()
+        self._pending: list[tuple[str, list[dict[str, Any]]]] | None = None  # Writes held by batch()
         self._init_db()
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection with row factory."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    @contextmanager
+    def _get_connection(self) -> Iterator[sqlite3.Connection]:
+        """Use the shared connection in a transaction (commit on success, rollback on error)."""
+        with self._lock, self._conn:
+            yield self._conn
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Hold monitor state and notification writes until flush() or the block exits.
+
+        Queued writes are committed together in one short transaction, so
+        related writes (a notification and the state that records it) share a
+        commit without keeping the database locked while checks are in flight.
+        Writes made inside the block are not visible to reads until flushed.
+        """
+        with self._lock:
+            nested = self._pending is not None
+            if not nested:
+                self._pending = []
+        if nested:
+            # The outer block commits
+            yield
+            return
+        try:
+            yield
+        finally:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                self._commit_each(pending)
+
+    def flush(self) -> None:
+        """Commit the writes an open batch() has queued so far; the batch stays open."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            self._commit_each(pending)
+
+    def _commit_each(self, pending: list[tuple[str, list[dict[str, Any]]]]) -> None:
+        """
+        Commit queued writes in one transaction.
+
+        A failing write doesn't discard the others: they are still committed,
+        then the first error is raised so the caller sees the write was lost.
+        """
+        if not pending:
+            return
+        error: sqlite3.Error | None = None
+        with self._get_connection() as conn:
+            for sql, params in pending:
+                try:
+                    conn.executemany(sql, params)
+                except sqlite3.Error as e:
+                    error = error or e
+        if error is not None:
+            raise error
+
+    def _write(self, sql: str, params: list[dict[str, Any]]) -> None:
+        """Run a write now, or queue it while a batch() is open."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((sql, params))
+                return
+            with self._get_connection() as conn:
+                conn.executemany(sql, params)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
 
     def _init_db(self) -> None:
         """Initialize database schema."""
@@ -42,7 +214,8 @@ class Database:
                     last_state_hash TEXT,
                     is_active INTEGER DEFAULT 1,
                     created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
+                    updated_at TEXT NOT NULL,
+                    next_check_at TEXT
                 );
 
                 CREATE TABLE IF NOT EXISTS notifications_log (
@@ -59,168 +232,166 @@ class Database:
                 CREATE INDEX IF NOT EXISTS idx_notifications_monitor ON notifications_log(monitor_id);
                 CREATE INDEX IF NOT EXISTS idx_notifications_sent ON notifications_log(sent_at);
             """)
+            self._migrate_next_check_at(conn)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_monitors_next_check ON monitors(is_active, next_check_at)"
+            )
+
+    def _migrate_next_check_at(self, conn: sqlite3.Connection) -> None:
+        """Add and backfill next_check_at on databases created before it existed."""
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(monitors)")}
+        if "next_check_at" in columns:
+            return
+
+        conn.execute("ALTER TABLE monitors ADD COLUMN next_check_at TEXT")
+        # Computed in Python so the format matches what to_dict() writes
+        rows = conn.execute("SELECT * FROM monitors WHERE last_checked IS NOT NULL").fetchall()
+        conn.executemany(
+            "UPDATE monitors SET next_check_at = :next_check_at WHERE id = :id",
+            [Monitor.from_dict(dict(row)).to_dict() for row in rows],
+        )
 
     # Monitor operations
 
     def add_monitor(self, monitor: Monitor) -> Monitor:
         """Add a new monitor."""
-        with self._get_connection() as conn:
-            data = monitor.to_dict()
-            conn.execute(
-                """
-                INSERT INTO monitors (
-                    id, name, type, url, config, check_interval_minutes,
-                    condition, last_checked, last_state, last_state_hash,
-                    is_active, created_at, updated_at
-                ) VALUES (
-                    :id, :name, :type, :url, :config, :check_interval_minutes,
-                    :condition, :last_checked, :last_state, :last_state_hash,
-                    :is_active, :created_at, :updated_at
-                )
-                """,
-                data,
-            )
+        self.add_monitors([monitor])
         return monitor
 
+    def add_monitors(self, monitors: list[Monitor]) -> list[Monitor]:
+        """Add several monitors in one transaction."""
+        with self._get_connection() as conn:
+            conn.executemany(_SQL_INSERT_MONITOR, [monitor.to_dict() for monitor in monitors])
+        return monitors
+
     def get_monitor(self, monitor_id: str) -> Monitor | None:
         """Get a monitor by ID."""
         with self._get_connection() as conn:
-            row = conn.execute(
-                "SELECT * FROM monitors WHERE id = ?", (monitor_id,)
-            ).fetchone()
+            row = conn.execute(_SQL_GET_MONITOR, (monitor_id,)).fetchone()
             return Monitor.from_dict(dict(row)) if row else None
 
     def get_monitor_by_name(self, name: str) -> Monitor | None:
         """Get a monitor by name (case-insensitive)."""
         with self._get_connection() as conn:
-            row = conn.execute(
-                "SELECT * FROM monitors WHERE LOWER(name) = LOWER(?)", (name,)
-            ).fetchone()
+            row = conn.execute(_SQL_GET_MONITOR_BY_NAME, (name,)).fetchone()
             return Monitor.from_dict(dict(row)) if row else None
 
     def list_monitors(self, active_only: bool = False) -> list[Monitor]:
         """List all monitors."""
         with self._get_connection() as conn:
-            if active_only:
-                rows = conn.execute(
-                    "SELECT * FROM monitors WHERE is_active = 1 ORDER BY created_at"
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    "SELECT * FROM monitors ORDER BY created_at"
-                ).fetchall()
+            sql = _SQL_LIST_ACTIVE_MONITORS if active_only else _SQL_LIST_MONITORS
+            rows = conn.execute(sql).fetchall()
             return [Monitor.from_dict(dict(row)) for row in rows]
 
-    def get_monitors_due_for_check(self) -> list[Monitor]:
-        """Get monitors that are due for checking based on their interval."""
+    def list_monitors_summary(self, active_only: bool = False) -> list[MonitorSummary]:
+        """List monitors with only the columns needed to display them."""
+        with self._get_connection() as conn:
+            sql = _SQL_LIST_ACTIVE_MONITOR_SUMMARIES if active_only else _SQL_LIST_MONITOR_SUMMARIES
+            rows = conn.execute(sql).fetchall()
+            return [MonitorSummary.from_dict(dict(row)) for row in rows]
+
+    def get_monitors_due_for_check(self, now: datetime | None = None) -> list[Monitor]:
+        """
+        Get monitors that are due for checking based on their interval.
+
+        Args:
+            now: Reference time (default: current time)
+        """
         # Use Python datetime for consistent timezone handling
-        now = datetime.now().isoformat()
+        now = now or datetime.now()
         with self._get_connection() as conn:
-            rows = conn.execute(
-                """
-                SELECT * FROM monitors
-                WHERE is_active = 1
-                AND (
-                    last_checked IS NULL
-                    OR datetime(last_checked, '+' || check_interval_minutes || ' minutes') <= datetime(?)
-                )
-                ORDER BY last_checked NULLS FIRST
-                """,
-                (now,),
-            ).fetchall()
+            rows = conn.execute(_SQL_MONITORS_DUE, (now.isoformat(),)).fetchall()
             return [Monitor.from_dict(dict(row)) for row in rows]
 
-    def update_monitor(self, monitor: Monitor) -> None:
-        """Update an existing monitor."""
-        monitor.updated_at = datetime.now()
-        with self._get_connection() as conn:
-            data = monitor.to_dict()
-            conn.execute(
-                """
-                UPDATE monitors SET
-                    name = :name,
-                    type = :type,
-                    url = :url,
-                    config = :config,
-                    check_interval_minutes = :check_interval_minutes,
-                    condition = :condition,
-                    last_checked = :last_checked,
-                    last_state = :last_state,
-                    last_state_hash = :last_state_hash,
-                    is_active = :is_active,
-                    updated_at = :updated_at
-                WHERE id = :id
-                """,
-                data,
-            )
+    def update_monitor(self, monitor: Monitor, now: datetime | None = None) -> None:
+        """
+        Update an existing monitor.
+
+        Args:
+            monitor: Monitor to save
+            now: Timestamp recorded as updated_at (default: current time)
+        """
+        monitor.updated_at = now or datetime.now()
+        self._write(_SQL_UPDATE_MONITOR, [monitor.to_dict()])
+
+    def touch_last_checked(self, monitor: Monitor) -> None:
+        """
+        Record a check that left the monitor's stored state unchanged.
+
+        Writes only last_checked and next_check_at, not the whole row.
+        """
+        self._write(
+            _SQL_TOUCH_MONITOR,
+            [{
+                "id": monitor.id,
+                "last_checked": monitor.last_checked.isoformat() if monitor.last_checked else None,
+                "next_check_at": monitor.next_check_at.isoformat() if monitor.next_check_at else None,
+            }],
+        )
 
     def delete_monitor(self, monitor_id: str) -> bool:
         """Delete a monitor and its notification history."""
         with self._get_connection() as conn:
-            conn.execute("DELETE FROM notifications_log WHERE monitor_id = ?", (monitor_id,))
-            result = conn.execute("DELETE FROM monitors WHERE id = ?", (monitor_id,))
+            conn.execute(_SQL_DELETE_MONITOR_NOTIFICATIONS, (monitor_id,))
+            result = conn.execute(_SQL_DELETE_MONITOR, (monitor_id,))
             return result.rowcount > 0
 
-    def set_monitor_active(self, monitor_id: str, active: bool) -> bool:
+    def set_monitor_active(
+        self, monitor_id: str, active: bool, now: datetime | None = None
+    ) -> bool:
         """Set monitor active status (pause/resume)."""
+        updated_at = (now or datetime.now()).isoformat()
         with self._get_connection() as conn:
-            result = conn.execute(
-                "UPDATE monitors SET is_active = ?, updated_at = ? WHERE id = ?",
-                (active, datetime.now().isoformat(), monitor_id),
-            )
+            result = conn.execute(_SQL_SET_MONITOR_ACTIVE, (active, updated_at, monitor_id))
             return result.rowcount > 0
 
     # Notification operations
 
     def add_notification(self, notification: NotificationLog) -> NotificationLog:
         """Log a sent notification."""
-        with self._get_connection() as conn:
-            data = notification.to_dict()
-            conn.execute(
-                """
-                INSERT INTO notifications_log (id, monitor_id, message, details, sent_at)
-                VALUES (:id, :monitor_id, :message, :details, :sent_at)
-                """,
-                data,
-            )
+        self.add_notifications([notification])
         return notification
 
+    def add_notifications(self, notifications: list[NotificationLog]) -> list[NotificationLog]:
+        """Log several sent notifications in one transaction."""
+        self._write(
+            _SQL_INSERT_NOTIFICATION,
+            [notification.to_dict() for notification in notifications],
+        )
+        return notifications
+
     def get_notifications(
         self, monitor_id: str | None = None, limit: int = 50
     ) -> list[NotificationLog]:
         """Get notification history."""
         with self._get_connection() as conn:
             if monitor_id:
-                rows = conn.execute(
-                    """
-                    SELECT * FROM notifications_log
-                    WHERE monitor_id = ?
-                    ORDER BY sent_at DESC
-                    LIMIT ?
-                    """,
-                    (monitor_id, limit),
-                ).fetchall()
+                rows = conn.execute(_SQL_MONITOR_NOTIFICATIONS, (monitor_id, limit)).fetchall()
             else:
+                rows = conn.execute(_SQL_NOTIFICATIONS, (limit,)).fetchall()
+            return [NotificationLog.from_dict(dict(row)) for row in rows]
+
+    def get_notifications_with_monitor(
+        self, monitor_id: str | None = None, limit: int = 50
+    ) -> list[tuple[NotificationLog, str | None]]:
+        """
+        Get notification history with each notification's monitor name.
+
+        Returns:
+            List of (notification, monitor name) tuples; the name is None if
+            the monitor no longer exists
+        """
+        with self._get_connection() as conn:
+            if monitor_id:
                 rows = conn.execute(
-                    """
-                    SELECT * FROM notifications_log
-                    ORDER BY sent_at DESC
-                    LIMIT ?
-                    """,
-                    (limit,),
+                    _SQL_MONITOR_NOTIFICATIONS_WITH_NAME, (monitor_id, limit)
                 ).fetchall()
-            return [NotificationLog.from_dict(dict(row)) for row in rows]
+            else:
+                rows = conn.execute(_SQL_NOTIFICATIONS_WITH_NAME, (limit,)).fetchall()
+            return [(NotificationLog.from_dict(dict(row)), row["monitor_name"]) for row in rows]
 
     def get_last_notification(self, monitor_id: str) -> NotificationLog | None:
         """Get the most recent notification for a monitor."""
         with self._get_connection() as conn:
-            row = conn.execute(
-                """
-                SELECT * FROM notifications_log
-                WHERE monitor_id = ?
-                ORDER BY sent_at DESC
-                LIMIT 1
-                """,
-                (monitor_id,),
-            ).fetchone()
+            row = conn.execute(_SQL_LAST_NOTIFICATION, (monitor_id,)).fetchone()
             return NotificationLog.from_dict(dict(row)) if row else None
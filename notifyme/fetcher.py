@@ -1,16 +1,33 @@
 """URL fetching utilities with requests, Playwright, and Browser-Use options."""
 
 import asyncio
+import atexit
+import functools
 import hashlib
 import logging
 import os
-from dataclasses import dataclass
+import queue
+import re
+import threading
+from collections.abc import Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urljoin
+from xml.etree import ElementTree
 
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+# Request headers (lowercased) that make a fetch conditional
+CONDITIONAL_HEADERS = ("if-none-match", "if-modified-since")
+
 # Default headers to mimic a browser
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -18,8 +35,81 @@ DEFAULT_HEADERS = {
     "Accept-Language": "en-US,en;q=0.5",
 }
 
+# Connections kept open per host by the shared session (covers concurrent checks)
+SESSION_POOL_SIZE = 20
+
+# Transient failures (connection resets, 502/503/504) are retried on the same
+# pooled connection instead of falling through to a Playwright launch. Retry-After
+# is ignored: a server asking for minutes would stall the check and its worker.
+HTTP_RETRIES = Retry(
+    total=2,
+    backoff_factor=0.3,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=("GET",),
+    respect_retry_after_header=False,
+)
+
+# Chunk size when reading a capped response body
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Playwright resource types not downloaded (text extraction never uses them).
+# Stylesheets still load: some sites only reveal content once styled.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+# Elements dropped before extracting page text
+NON_CONTENT_TAGS = ["script", "style", "nav", "footer", "header"]
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+
+# Selectors that are a single #id or .class are answered with soup.find()
+_ID_SELECTOR_RE = re.compile(r"#([\w-]+)")
+_CLASS_SELECTOR_RE = re.compile(r"\.([\w-]+)")
+
+_COMBINATOR_RE = re.compile(r"\s*[>+~]\s*|\s+")
+_SELECTOR_ARGS_RE = re.compile(r"\[[^\]]*\]|\([^)]*\)")
+
+_session: requests.Session | None = None
+
+# Per-run fetch memo, active inside shared_fetches()
+_shared_fetches: ContextVar[dict[tuple, Future] | None] = ContextVar("shared_fetches", default=None)
+_shared_fetches_lock = threading.Lock()
+
+# Per-thread Playwright browser, see _playwright_context()
+_playwright_local = threading.local()
+
+# Long-lived threads that run every Playwright fetch, so browsers are never
+# launched from short-lived worker pools; see _run_in_browser_thread()
+BROWSER_THREADS = 4
+BROWSER_CLOSE_TIMEOUT_SECONDS = 10
+
+_browser_jobs: queue.Queue | None = None
+_browser_threads: list[threading.Thread] = []
+_browser_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Shared requests session, so repeat fetches reuse TCP/TLS connections.
+
+    Carries DEFAULT_HEADERS; per-request headers are merged over them.
+    """
+    global _session
+    if _session is None:
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=SESSION_POOL_SIZE,
+            pool_maxsize=SESSION_POOL_SIZE,
+            max_retries=HTTP_RETRIES,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _session = session
+    return _session
 
-@dataclass
+
+@dataclass(slots=True)
 class FetchResult:
     """Result of fetching a URL."""
 
@@ -30,11 +120,152 @@ class FetchResult:
     content_hash: str
     used_playwright: bool = False
     used_browser_agent: bool = False
+    not_modified: bool = False  # 304 reply to a conditional request; no body
+    etag: str | None = None
+    modified: str | None = None  # Last-Modified response header
+    body_hash: str | None = None  # content_digest() of the raw body (plain requests fetches only)
+    # Parse trees, built on first access (slots rule out cached_property)
+    _soup: BeautifulSoup | None = field(default=None, init=False, repr=False, compare=False)
+    _lxml_tree: Any = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def soup(self) -> BeautifulSoup:
-        """Parse HTML with BeautifulSoup."""
-        return BeautifulSoup(self.html, "html.parser")
+        """Parse HTML with BeautifulSoup (parsed once per result)."""
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, _soup_parser())
+        return self._soup
+
+    @property
+    def lxml_tree(self):
+        """Parse HTML with lxml (parsed once per result). Requires lxml."""
+        if self._lxml_tree is None:
+            from lxml import html as lxml_html
+
+            self._lxml_tree = lxml_html.fromstring(self.html)
+        return self._lxml_tree
+
+    def select_text(self, selector: str) -> str | None:
+        """
+        Get the text of the first element matching a CSS selector.
+
+        Uses lxml + cssselect when installed (pip install 'notifyme[fast]'),
+        otherwise BeautifulSoup; selectors cssselect can't translate (e.g.
+        :-soup-contains()) also go to BeautifulSoup. Text is stripped and
+        joined like BeautifulSoup's get_text(strip=True).
+
+        Returns:
+            Element text, or None if nothing matches
+        """
+        compiled = _compile_selector(selector) if _has_lxml() and self.html.strip() else None
+        if compiled is None:
+            return self._soup_select_text(selector.strip())
+
+        elements = compiled(self.lxml_tree)
+        if not elements:
+            return None
+        return "".join(text.strip() for text in _lxml_select_text_xpath()(elements[0]))
+
+    def _soup_select_text(self, selector: str) -> str | None:
+        """select_text() with BeautifulSoup."""
+        if id_match := _ID_SELECTOR_RE.fullmatch(selector):
+            element = self.soup.find(id=id_match.group(1))
+        elif class_match := _CLASS_SELECTOR_RE.fullmatch(selector):
+            element = self.soup.find(class_=class_match.group(1))
+        else:
+            element = self.soup.select_one(selector)
+        return element.get_text(strip=True) if element is not None else None
+
+
+def selector_combinators(selector: str) -> int:
+    """
+    Count combinators (descendant, >, +, ~) in a CSS selector.
+
+    For selector lists ("a, b") the largest count of any member is returned.
+    Attribute values and pseudo-class arguments are ignored.
+    """
+    members = _SELECTOR_ARGS_RE.sub("", selector).split(",")
+    return max(len(_COMBINATOR_RE.findall(member.strip())) for member in members)
+
+
+@functools.lru_cache(maxsize=1)
+def _has_lxml() -> bool:
+    """Whether the optional lxml + cssselect selector path is available."""
+    try:
+        import cssselect  # noqa: F401
+        import lxml.html  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=1)
+def _soup_parser() -> str:
+    """BeautifulSoup parser to use: lxml's C parser when installed, else html.parser."""
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return "html.parser"
+    return "lxml"
+
+
+def text_parser() -> str:
+    """
+    Name of the parser behind FetchResult.text and select_text().
+
+    The parsers recover text differently on some markup, so checkers that
+    fingerprint page text store this with the fingerprint.
+    """
+    return _soup_parser()
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_selector(selector: str):
+    """
+    Compile a CSS selector to an lxml XPath evaluator (cached per selector).
+
+    Returns None for selectors only soupsieve understands, such as
+    :not() with a selector list or :-soup-contains().
+    """
+    from cssselect import ExpressionError, HTMLTranslator, SelectorError
+    from lxml import etree
+
+    try:
+        return etree.XPath(HTMLTranslator().css_to_xpath(selector))
+    except (SelectorError, ExpressionError):
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _lxml_select_text_xpath():
+    """Compiled XPath for an element's text nodes, leaving out what get_text() skips."""
+    from lxml import etree
+
+    return etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+
+def content_digest(data: str | bytes) -> str:
+    """64-bit BLAKE2b fingerprint of page text or body bytes, used only for change detection."""
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+@contextmanager
+def shared_fetches() -> Iterator[None]:
+    """
+    Share identical fetch_url() calls made inside this block.
+
+    Monitors pointing at the same page (e.g. a price and a webpage monitor)
+    then fetch and parse it once. Concurrent callers wait for the fetch
+    already in flight. Shared fetches are made without conditional headers
+    or known_body_hash; each caller's 304/unchanged-body check is applied to
+    the shared result afterwards. The memo is dropped when the block exits.
+    """
+    token = _shared_fetches.set({})
+    try:
+        yield
+    finally:
+        _shared_fetches.reset(token)
 
 
 def fetch_url(
@@ -45,6 +276,9 @@ def fetch_url(
     browser_headed: bool = True,
     timeout: int = 30,
     headers: dict | None = None,
+    max_bytes: int | None = None,
+    known_body_hash: str | None = None,
+    ready_selector: str | None = None,
 ) -> FetchResult:
     """
     Fetch a URL and return its content.
@@ -57,23 +291,103 @@ def fetch_url(
         browser_headed: Run browser in headed mode (default True for better bot evasion)
         timeout: Request timeout in seconds
         headers: Optional custom headers
+        max_bytes: Stop downloading after this many (decompressed) bytes of the
+                   body. Only applies to plain requests fetches.
+        known_body_hash: body_hash from the previous fetch. If the body is
+                         byte-for-byte the same, parsing is skipped and a
+                         not_modified result (no html/text) is returned.
+        ready_selector: For Playwright fetches, read the page as soon as this
+                        CSS selector appears instead of waiting for the
+                        network to go idle.
 
     Returns:
         FetchResult with HTML, text, and content hash
     """
+    memo = _shared_fetches.get()
+    if memo is None:
+        return _fetch_url(
+            url, use_playwright, use_browser_agent, browser_task, browser_headed, timeout, headers,
+            max_bytes, known_body_hash, ready_selector,
+        )
+
+    # The shared fetch is unconditional; each caller's validators are checked against it after
+    conditional = {k.lower(): v for k, v in (headers or {}).items() if k.lower() in CONDITIONAL_HEADERS}
+    headers = {k: v for k, v in (headers or {}).items() if k.lower() not in CONDITIONAL_HEADERS} or None
+    args = (
+        url, use_playwright, use_browser_agent, browser_task, browser_headed, timeout, headers,
+        max_bytes, None, ready_selector,
+    )
+    key = args[:6] + (tuple(sorted((headers or {}).items())),) + args[7:]
+    with _shared_fetches_lock:
+        future = memo.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = memo[key] = Future()
+
+    if is_owner:
+        try:
+            future.set_result(_fetch_url(*args))
+        except BaseException as e:
+            future.set_exception(e)
+    return _revalidate(future.result(), conditional, known_body_hash)
+
+
+def _revalidate(result: FetchResult, conditional: dict, known_body_hash: str | None) -> FetchResult:
+    """
+    Answer one caller's conditional request from a shared, unconditional fetch.
+
+    Returns a not_modified result (no html/text) when the caller's
+    If-None-Match/If-Modified-Since matches the response validators or its
+    known_body_hash matches the body, as the server or fetch_url would have.
+    """
+    validator_match = (
+        conditional.get("if-none-match") is not None and conditional["if-none-match"] == result.etag
+    ) or (
+        conditional.get("if-modified-since") is not None
+        and conditional["if-modified-since"] == result.modified
+    )
+    body_match = known_body_hash is not None and known_body_hash == result.body_hash
+    if result.not_modified or not (validator_match or body_match):
+        return result
+    return FetchResult(
+        url=result.url,
+        html="",
+        text="",
+        status_code=304 if validator_match else result.status_code,
+        content_hash="",
+        not_modified=True,
+        etag=result.etag,
+        modified=result.modified,
+        body_hash=result.body_hash,
+    )
+
+
+def _fetch_url(
+    url: str,
+    use_playwright: bool,
+    use_browser_agent: bool,
+    browser_task: str | None,
+    browser_headed: bool,
+    timeout: int,
+    headers: dict | None,
+    max_bytes: int | None,
+    known_body_hash: str | None,
+    ready_selector: str | None,
+) -> FetchResult:
+    """Fetch a URL with the requested method (see fetch_url)."""
     # Priority: browser_agent > playwright > requests
     if use_browser_agent:
         return _fetch_with_browser_use(url, browser_task, browser_headed, timeout)
 
     if use_playwright:
-        return _fetch_with_playwright(url, timeout)
+        return _fetch_with_playwright(url, timeout, ready_selector)
 
     try:
-        return _fetch_with_requests(url, timeout, headers)
+        return _fetch_with_requests(url, timeout, headers, max_bytes, known_body_hash)
     except Exception as e:
         logger.warning(f"requests failed for {url}: {e}, trying Playwright")
         try:
-            return _fetch_with_playwright(url, timeout)
+            return _fetch_with_playwright(url, timeout, ready_selector)
         except ImportError:
             raise RuntimeError(
                 f"Failed to fetch {url} with requests and Playwright is not installed. "
@@ -82,23 +396,47 @@ def fetch_url(
 
 
 def _fetch_with_requests(
-    url: str, timeout: int, headers: dict | None
+    url: str,
+    timeout: int,
+    headers: dict | None,
+    max_bytes: int | None = None,
+    known_body_hash: str | None = None,
 ) -> FetchResult:
     """Fetch URL using requests library."""
-    merged_headers = {**DEFAULT_HEADERS, **(headers or {})}
-
-    response = requests.get(url, headers=merged_headers, timeout=timeout)
+    response = get_session().get(
+        url, headers=headers, timeout=timeout, stream=max_bytes is not None
+    )
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "modified": response.headers.get("Last-Modified"),
+    }
+    if response.status_code == 304:
+        response.close()
+        return FetchResult(
+            url=url, html="", text="", status_code=304, content_hash="", not_modified=True, **validators
+        )
     response.raise_for_status()
 
-    html = response.text
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Remove script and style elements for cleaner text
-    for element in soup(["script", "style", "nav", "footer", "header"]):
-        element.decompose()
-
-    text = soup.get_text(separator="\n", strip=True)
-    content_hash = hashlib.sha256(text.encode()).hexdigest()[:16]
+    body_hash = None
+    if max_bytes is None:
+        # Hashed before decoding, so callers can compare bodies byte for byte
+        body_hash = content_digest(response.content)
+        if body_hash == known_body_hash:
+            return FetchResult(
+                url=url,
+                html="",
+                text="",
+                status_code=response.status_code,
+                content_hash="",
+                not_modified=True,
+                body_hash=body_hash,
+                **validators,
+            )
+        html = response.text
+    else:
+        html = _read_capped(response, max_bytes)
+    text = _extract_text(html)
+    content_hash = content_digest(text)
 
     return FetchResult(
         url=url,
@@ -107,11 +445,152 @@ def _fetch_with_requests(
         status_code=response.status_code,
         content_hash=content_hash,
         used_playwright=False,
+        body_hash=body_hash,
+        **validators,
+    )
+
+
+def _extract_text(html: str) -> str:
+    """Visible page text, one line per block, without scripts and page chrome."""
+    if _soup_parser() == "lxml" and html.strip():
+        from lxml import etree
+
+        try:
+            return _extract_text_lxml(html)
+        except (ValueError, etree.ParserError):
+            pass  # e.g. an XML encoding declaration; BeautifulSoup copes
+
+    soup = BeautifulSoup(html, _soup_parser())
+
+    # Remove script and style elements for cleaner text
+    for element in soup(NON_CONTENT_TAGS):
+        element.decompose()
+
+    return soup.get_text(separator="\n", strip=True)
+
+
+def _extract_text_lxml(html: str) -> str:
+    """
+    _extract_text() on a bare lxml tree, skipping BeautifulSoup's object model.
+
+    Matches BeautifulSoup's get_text(separator="\\n", strip=True) on the same
+    parse, so content hashes don't change with the code path.
+    """
+    from lxml import html as lxml_html
+
+    drop_non_content, visible_text = _lxml_text_xpaths()
+    root = lxml_html.document_fromstring(html)
+    for element in drop_non_content(root):
+        element.drop_tree()  # Keeps the tail text, like decompose()
+    return "\n".join(stripped for text in visible_text(root) if (stripped := text.strip()))
+
+
+@functools.lru_cache(maxsize=1)
+def _lxml_text_xpaths():
+    """Compiled XPaths for _extract_text_lxml(): non-content elements, visible text nodes."""
+    from lxml import etree
+
+    return (
+        etree.XPath(" | ".join(f"//{tag}" for tag in NON_CONTENT_TAGS)),
+        # BeautifulSoup leaves <template> contents out of get_text()
+        etree.XPath("//text()[not(ancestor::template)]"),
     )
 
 
-def _fetch_with_playwright(url: str, timeout: int) -> FetchResult:
-    """Fetch URL using Playwright for JS-rendered content."""
+def _read_capped(response: requests.Response, max_bytes: int) -> str:
+    """Read at most max_bytes of a streamed response body and close it."""
+    chunks = []
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                break
+    finally:
+        response.close()
+
+    return b"".join(chunks)[:max_bytes].decode(response.encoding or "utf-8", errors="replace")
+
+
+def _run_in_browser_thread(fn, *args):
+    """
+    Run fn(*args) on one of the browser threads and return its result.
+
+    The threads start on first use and each keeps its own browser across
+    calls; they close their browsers and stop Playwright at process exit.
+    """
+    global _browser_jobs
+    with _browser_lock:
+        if _browser_jobs is None:
+            _browser_jobs = queue.Queue()
+            for index in range(BROWSER_THREADS):
+                thread = threading.Thread(
+                    target=_browser_worker, args=(_browser_jobs,), name=f"notifyme-browser-{index}", daemon=True
+                )
+                thread.start()
+                _browser_threads.append(thread)
+            atexit.register(_stop_browser_threads)
+        jobs = _browser_jobs
+
+    future: Future = Future()
+    jobs.put((future, fn, args))
+    return future.result()
+
+
+def _browser_worker(jobs: queue.Queue) -> None:
+    """Run queued browser jobs until a None job arrives, then close this thread's browser."""
+    while (job := jobs.get()) is not None:
+        future, fn, args = job
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+    _close_playwright()
+
+
+def _stop_browser_threads() -> None:
+    """Stop the browser threads, closing their browsers (registered with atexit)."""
+    global _browser_jobs
+    with _browser_lock:
+        jobs, threads = _browser_jobs, list(_browser_threads)
+        _browser_jobs = None
+        _browser_threads.clear()
+    if jobs is None:
+        return
+    for _ in threads:
+        jobs.put(None)
+    for thread in threads:
+        thread.join(timeout=BROWSER_CLOSE_TIMEOUT_SECONDS)
+
+
+def _close_playwright() -> None:
+    """Close this thread's browser, if any, and stop its Playwright driver."""
+    context = getattr(_playwright_local, "context", None)
+    playwright = getattr(_playwright_local, "playwright", None)
+    _playwright_local.context = _playwright_local.playwright = None
+    try:
+        if context is not None:
+            context.browser.close()
+    except Exception as e:
+        logger.debug(f"Closing browser failed: {e}")
+    finally:
+        if playwright is not None:
+            playwright.stop()
+
+
+def _playwright_context():
+    """
+    Browser context for Playwright fetches, launched on first use and then reused.
+
+    Playwright's sync API is bound to the thread that started it, so each
+    browser thread keeps its own browser.
+    """
+    context = getattr(_playwright_local, "context", None)
+    if context is not None and context.browser.is_connected():
+        return context
+    _close_playwright()  # Browser crashed or was closed; don't leak its driver
+
     try:
         from playwright.sync_api import sync_playwright
     except ImportError:
@@ -120,24 +599,52 @@ def _fetch_with_playwright(url: str, timeout: int) -> FetchResult:
             "pip install 'notifyme[playwright]' && playwright install chromium"
         )
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.set_extra_http_headers(DEFAULT_HEADERS)
+    playwright = sync_playwright().start()
+    browser = playwright.chromium.launch(headless=True)
+    context = browser.new_context(extra_http_headers=DEFAULT_HEADERS)
+    context.route("**/*", _route_without_heavy_resources)
+    _playwright_local.playwright = playwright
+    _playwright_local.context = context
+    return context
 
-        response = page.goto(url, timeout=timeout * 1000, wait_until="networkidle")
-        html = page.content()
 
-        browser.close()
+def _route_without_heavy_resources(route) -> None:
+    """Abort requests for resources that never contribute page text."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
 
-    soup = BeautifulSoup(html, "html.parser")
 
-    # Remove script and style elements for cleaner text
-    for element in soup(["script", "style", "nav", "footer", "header"]):
-        element.decompose()
+def _fetch_with_playwright(url: str, timeout: int, ready_selector: str | None = None) -> FetchResult:
+    """
+    Fetch URL using Playwright for JS-rendered content.
+
+    Without a ready_selector the page is read once the network goes idle,
+    which can add seconds on pages that keep polling.
+    """
+    return _run_in_browser_thread(_render_with_playwright, url, timeout, ready_selector)
+
+
+def _render_with_playwright(url: str, timeout: int, ready_selector: str | None) -> FetchResult:
+    """_fetch_with_playwright() body; runs on a browser thread."""
+    page = _playwright_context().new_page()
+    try:
+        if ready_selector:
+            response = page.goto(url, timeout=timeout * 1000, wait_until="domcontentloaded")
+            try:
+                page.wait_for_selector(ready_selector, timeout=timeout * 1000)
+            except Exception as e:
+                # Read what rendered; the checker reports a missing element
+                logger.warning(f"{ready_selector} did not appear on {url}: {e}")
+        else:
+            response = page.goto(url, timeout=timeout * 1000, wait_until="networkidle")
+        html = page.content()
+    finally:
+        page.close()
 
-    text = soup.get_text(separator="\n", strip=True)
-    content_hash = hashlib.sha256(text.encode()).hexdigest()[:16]
+    text = _extract_text(html)
+    content_hash = content_digest(text)
 
     return FetchResult(
         url=url,
@@ -217,10 +724,7 @@ def _fetch_with_browser_use(
 
     # If we got HTML, parse it for clean text
     if html:
-        soup = BeautifulSoup(html, "html.parser")
-        for element in soup(["script", "style", "nav", "footer", "header"]):
-            element.decompose()
-        text = soup.get_text(separator="\n", strip=True)
+        text = _extract_text(html)
     else:
         # Fall back to agent's extracted text
         text = agent_text
@@ -231,7 +735,7 @@ def _fetch_with_browser_use(
     elif not isinstance(text, str):
         text = str(text) if text else ""
 
-    content_hash = hashlib.sha256(text.encode()).hexdigest()[:16]
+    content_hash = content_digest(text)
 
     logger.info(f"Browser-Use: successfully fetched {url} ({len(text)} chars)")
 
@@ -245,17 +749,148 @@ def _fetch_with_browser_use(
     )
 
 
-def fetch_rss(url: str, timeout: int = 30) -> dict:
+def fetch_rss(
+    url: str, timeout: int = 30, etag: str | None = None, modified: str | None = None
+) -> dict:
     """
     Fetch and parse an RSS/Atom feed.
 
+    Plain RSS 2.0 and Atom feeds are parsed with ElementTree; anything else
+    (RSS 1.0, malformed XML) falls back to feedparser.
+
+    Args:
+        url: Feed URL
+        timeout: Request timeout in seconds
+        etag: ETag from the previous fetch, sent as If-None-Match
+        modified: Last-Modified from the previous fetch, sent as If-Modified-Since
+
     Returns:
-        Parsed feed dictionary with entries
+        Parsed feed dictionary with entries, plus "status", "etag" and
+        "modified" (like feedparser). On 304 Not Modified, entries is empty.
     """
-    import feedparser
-
-    response = requests.get(url, headers=DEFAULT_HEADERS, timeout=timeout)
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+
+    response = get_session().get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return {
+            "status": 304,
+            "etag": response.headers.get("ETag", etag),
+            "modified": response.headers.get("Last-Modified", modified),
+            "feed": {},
+            "entries": [],
+        }
     response.raise_for_status()
 
-    feed = feedparser.parse(response.text)
+    feed = _parse_feed_fast(response.content, url)
+    if feed is None:
+        import feedparser
+
+        feed = feedparser.parse(response.text)
+
+    feed["status"] = response.status_code
+    feed["etag"] = response.headers.get("ETag")
+    feed["modified"] = response.headers.get("Last-Modified")
     return feed
+
+
+def _parse_feed_fast(raw: bytes, base_url: str = "") -> dict | None:
+    """
+    Parse an RSS 2.0 or Atom feed into feedparser's entry shape.
+
+    Only the fields the checkers use are extracted (id, title, link,
+    published, summary, source title). As in feedparser, relative links are
+    resolved against xml:base and then base_url, and an RSS item without a
+    <link> uses its <guid> when that is a permalink.
+
+    Args:
+        raw: Feed body
+        base_url: URL the feed was fetched from
+
+    Returns:
+        Feed dictionary, or None if the feed needs feedparser
+    """
+    try:
+        root = ElementTree.fromstring(raw)
+    except ElementTree.ParseError:
+        return None
+
+    if root.tag == "rss":
+        channel = root.find("channel")
+        if channel is None:
+            return None
+        return {
+            "feed": {"title": _text(channel, "title")},
+            "entries": [_rss_entry(item, base_url) for item in channel.iter("item")],
+        }
+
+    if root.tag == f"{ATOM_NS}feed":
+        feed_base = _xml_base(root, base_url)
+        return {
+            "feed": {"title": _text(root, f"{ATOM_NS}title")},
+            "entries": [_atom_entry(entry, feed_base) for entry in root.iter(f"{ATOM_NS}entry")],
+        }
+
+    return None
+
+
+def _text(element: ElementTree.Element, path: str) -> str:
+    """Stripped text of a child element, or an empty string."""
+    return (element.findtext(path) or "").strip()
+
+
+def _xml_base(element: ElementTree.Element, base_url: str) -> str:
+    """Base URL in effect inside element, applying its xml:base if it has one."""
+    element_base = element.get(XML_BASE)
+    return urljoin(base_url, element_base) if element_base else base_url
+
+
+def _rss_entry(item: ElementTree.Element, base_url: str = "") -> dict:
+    """Convert an RSS <item> to a feedparser-style entry."""
+    link = _text(item, "link")
+    guid = item.find("guid")
+    # isPermaLink defaults to true, so a bare <guid> is the item's URL
+    if not link and guid is not None and guid.get("isPermaLink", "true").lower() == "true":
+        link = _text(item, "guid")
+
+    fields = {
+        "id": _text(item, "guid"),
+        "title": _text(item, "title"),
+        "link": urljoin(base_url, link) if link else "",
+        "published": _text(item, "pubDate"),
+        "summary": _text(item, "description"),
+    }
+    entry = {key: value for key, value in fields.items() if value}
+
+    source = _text(item, "source")
+    if source:
+        entry["source"] = {"title": source}
+    return entry
+
+
+def _atom_entry(item: ElementTree.Element, base_url: str = "") -> dict:
+    """Convert an Atom <entry> to a feedparser-style entry."""
+    entry_base = _xml_base(item, base_url)
+    link = ""
+    for link_element in item.findall(f"{ATOM_NS}link"):
+        if link_element.get("rel", "alternate") == "alternate":
+            href = link_element.get("href", "")
+            link = urljoin(_xml_base(link_element, entry_base), href) if href else ""
+            break
+
+    fields = {
+        "id": _text(item, f"{ATOM_NS}id"),
+        "title": _text(item, f"{ATOM_NS}title"),
+        "link": link,
+        "published": _text(item, f"{ATOM_NS}published") or _text(item, f"{ATOM_NS}updated"),
+        "summary": _text(item, f"{ATOM_NS}summary") or _text(item, f"{ATOM_NS}content"),
+    }
+    entry = {key: value for key, value in fields.items() if value}
+
+    source = _text(item, f"{ATOM_NS}source/{ATOM_NS}title")
+    if source:
+        entry["source"] = {"title": source}
+    return entry
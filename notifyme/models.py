@@ -1,12 +1,16 @@
 """Data models for NotifyMe."""
 
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any
+from typing import Any, NamedTuple
 import json
 import uuid
 
+# Compact encoder for stored JSON columns. Built once: json.dumps() constructs a
+# fresh encoder whenever it's given non-default arguments.
+_encode_json = json.JSONEncoder(separators=(",", ":")).encode
+
 
 class MonitorType(str, Enum):
     WEBPAGE = "webpage"
@@ -18,7 +22,11 @@ class MonitorType(str, Enum):
     CREDITS = "credits"
 
 
-@dataclass
+# Stored type string -> member; a plain dict lookup skips Enum's call machinery
+_MONITOR_TYPES = {monitor_type.value: monitor_type for monitor_type in MonitorType}
+
+
+@dataclass(slots=True)
 class Monitor:
     """Represents a monitoring target."""
 
@@ -43,24 +51,32 @@ class Monitor:
             "name": self.name,
             "type": self.type.value,
             "url": self.url,
-            "config": json.dumps(self.config),
+            "config": _encode_json(self.config),
             "check_interval_minutes": self.check_interval_minutes,
             "condition": self.condition,
             "last_checked": self.last_checked.isoformat() if self.last_checked else None,
-            "last_state": json.dumps(self.last_state),
+            "last_state": _encode_json(self.last_state),
             "last_state_hash": self.last_state_hash,
             "is_active": self.is_active,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
+            "next_check_at": self.next_check_at.isoformat() if self.next_check_at else None,
         }
 
+    @property
+    def next_check_at(self) -> datetime | None:
+        """When the monitor is next due (None if never checked)."""
+        if self.last_checked is None:
+            return None
+        return self.last_checked + timedelta(minutes=self.check_interval_minutes)
+
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "Monitor":
         """Create from dictionary (database row)."""
         return cls(
             id=data["id"],
             name=data["name"],
-            type=MonitorType(data["type"]),
+            type=_MONITOR_TYPES[data["type"]],
             url=data["url"],
             config=json.loads(data["config"]) if data["config"] else {},
             check_interval_minutes=data["check_interval_minutes"],
@@ -74,7 +90,36 @@ class Monitor:
         )
 
 
-@dataclass
+class MonitorSummary(NamedTuple):
+    """Display columns of a monitor, for listings that don't run checks."""
+
+    id: str
+    name: str
+    type: MonitorType
+    url: str
+    condition: str | None
+    check_interval_minutes: int
+    last_checked: datetime | None
+    last_state: dict[str, Any]
+    is_active: bool
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "MonitorSummary":
+        """Create from dictionary (projected database row)."""
+        return cls(
+            id=data["id"],
+            name=data["name"],
+            type=_MONITOR_TYPES[data["type"]],
+            url=data["url"],
+            condition=data["condition"],
+            check_interval_minutes=data["check_interval_minutes"],
+            last_checked=datetime.fromisoformat(data["last_checked"]) if data["last_checked"] else None,
+            last_state=json.loads(data["last_state"]) if data["last_state"] else {},
+            is_active=bool(data["is_active"]),
+        )
+
+
+@dataclass(slots=True)
 class NotificationLog:
     """Record of a sent notification."""
 
@@ -90,7 +135,7 @@ class NotificationLog:
             "id": self.id,
             "monitor_id": self.monitor_id,
             "message": self.message,
-            "details": json.dumps(self.details),
+            "details": _encode_json(self.details),
             "sent_at": self.sent_at.isoformat(),
         }
 
@@ -106,7 +151,7 @@ class NotificationLog:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class CheckResult:
     """Result of checking a monitor."""
 
@@ -115,3 +160,5 @@ class CheckResult:
     details: dict[str, Any] = field(default_factory=dict)
     state_hash: str | None = None
     new_items: list[dict[str, Any]] = field(default_factory=list)  # For news/RSS monitors
+    cached: bool = False  # Reused from last_state without re-evaluating
+    rejected_ids: list[str] = field(default_factory=list)  # News articles the filter rejected
@@ -3,6 +3,13 @@
 import logging
 import os
 import smtplib
+import ssl
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any
+from email.charset import QP, Charset
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
@@ -15,6 +22,44 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Implicit-TLS SMTP port (no STARTTLS round trip)
+SMTPS_PORT = 465
+
+# Messages sent before a batch's connection is replaced; many providers
+# throttle or drop long-lived sessions
+MAX_MESSAGES_PER_CONNECTION = 100
+
+# Result details used for bookkeeping rather than shown in notifications
+HIDDEN_DETAIL_KEYS = ("event_id", "feed_title", "etag", "modified", "body_hash")
+
+# Fixed lines of the plain-text email
+TEXT_SEPARATOR = "-" * 40
+TEXT_FOOTER_LINES = ("", TEXT_SEPARATOR, "Sent by NotifyMe")
+
+
+# UTF-8 bodies go out quoted-printable: mostly-ASCII text stays near its
+# original size instead of growing by a third as base64
+_UTF8_QP = Charset("utf-8")
+_UTF8_QP.body_encoding = QP
+
+
+@lru_cache(maxsize=1)
+def _tls_context() -> ssl.SSLContext:
+    """
+    Verifying TLS context shared by every SMTP connection.
+
+    Built once so reconnects don't reload the CA bundle; smtplib's own
+    default would be rebuilt per connection and skips certificate checks.
+    """
+    return ssl.create_default_context()
+
+
+def _mime_text(body: str, subtype: str) -> MIMEText:
+    """MIME part for an email body: plain us-ascii when possible, else UTF-8 quoted-printable."""
+    if body.isascii():
+        return MIMEText(body, subtype, "us-ascii")
+    return MIMEText(body, subtype, _UTF8_QP)
+
 
 class EmailNotifier:
     """Send email notifications via SMTP."""
@@ -32,6 +77,10 @@ class EmailNotifier:
         self.smtp_user = smtp_user or os.getenv("SMTP_USER")
         self.smtp_password = smtp_password or os.getenv("SMTP_PASSWORD")
         self.notify_email = notify_email or os.getenv("NOTIFY_EMAIL")
+        self._batching = False
+        self._server: smtplib.SMTP | None = None
+        self._sent_on_server = 0
+        self._server_lock = threading.Lock()  # Batched sends may come from several threads
 
         if not self.smtp_user:
             logger.warning("SMTP_USER not configured - emails will not be sent")
@@ -56,8 +105,12 @@ class EmailNotifier:
             NotificationLog record
         """
         subject = f"[NotifyMe] {monitor.name}"
-        html_body = self._format_html_body(monitor, result)
-        text_body = self._format_text_body(monitor, result)
+        # Ensure details is a dict
+        result_details = result.details if isinstance(result.details, dict) else {}
+        # Filtered once for both bodies
+        shown_details = {k: v for k, v in result_details.items() if k not in HIDDEN_DETAIL_KEYS and v}
+        html_body = self._format_html_body(monitor, result, shown_details)
+        text_body = self._format_text_body(monitor, result, shown_details)
 
         if dry_run:
             logger.info(f"[DRY RUN] Would send email:\n  To: {self.notify_email}\n  Subject: {subject}")
@@ -65,9 +118,6 @@ class EmailNotifier:
         else:
             self._send_email(subject, html_body, text_body)
 
-        # Ensure details is a dict
-        result_details = result.details if isinstance(result.details, dict) else {}
-
         return NotificationLog(
             monitor_id=monitor.id,
             message=result.explanation,
@@ -78,12 +128,29 @@ class EmailNotifier:
             },
         )
 
-    def _format_html_body(self, monitor: Monitor, result: CheckResult) -> str:
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Send every email inside this block over one SMTP connection.
+
+        The connection is opened by the first send (so a run with nothing to
+        report never connects) and closed when the block exits.
+        """
+        self._batching = True
+        try:
+            yield
+        finally:
+            self._batching = False
+            self._close_server()
+
+    def _format_html_body(
+        self, monitor: Monitor, result: CheckResult, shown_details: dict[str, Any]
+    ) -> str:
         """Format email body as HTML."""
         status_color = "#28a745" if result.condition_met else "#dc3545"
         status_text = "CONDITION MET" if result.condition_met else "Condition not met"
 
-        html = f"""
+        parts = [f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -117,21 +184,17 @@ class EmailNotifier:
     <div class="explanation">
         {result.explanation}
     </div>
-"""
+"""]
 
         # Add details if present (for agentic monitors)
-        if result.details and isinstance(result.details, dict):
-            details_to_show = {k: v for k, v in result.details.items()
-                            if k not in ('event_id', 'feed_title') and v}
-            if details_to_show:
-                html += '<div class="details"><strong>Details:</strong><ul>'
-                for key, value in details_to_show.items():
-                    html += f"<li><strong>{key}:</strong> {value}</li>"
-                html += "</ul></div>"
+        if shown_details:
+            parts.append('<div class="details"><strong>Details:</strong><ul>')
+            parts.extend(f"<li><strong>{key}:</strong> {value}</li>" for key, value in shown_details.items())
+            parts.append("</ul></div>")
 
         # Add articles for news monitors
         if result.new_items:
-            html += f'<div class="articles"><h3>New Articles ({len(result.new_items)})</h3>'
+            parts.append(f'<div class="articles"><h3>New Articles ({len(result.new_items)})</h3>')
 
             for item in result.new_items[:15]:  # Show up to 15 articles
                 title = item.get('title', 'No title')
@@ -143,7 +206,7 @@ class EmailNotifier:
                 if ' - ' in title and title.endswith(source):
                     title = title.rsplit(' - ', 1)[0]
 
-                html += f"""
+                parts.append(f"""
                 <div class="article">
                     <a href="{link}" class="article-title">{title}</a>
                     <div class="article-meta">
@@ -151,23 +214,26 @@ class EmailNotifier:
                         {f' &bull; {published}' if published else ''}
                     </div>
                 </div>
-"""
+""")
 
             if len(result.new_items) > 15:
-                html += f'<p style="color: #666;">...and {len(result.new_items) - 15} more articles</p>'
+                parts.append(f'<p style="color: #666;">...and {len(result.new_items) - 15} more articles</p>')
 
-            html += "</div>"
+            parts.append("</div>")
 
-        html += """
+        parts.append("""
     <div class="footer">
         Sent by NotifyMe
     </div>
 </body>
 </html>
-"""
-        return html
+""")
+        # Built as a list and joined once; repeated += copies the growing page
+        return "".join(parts)
 
-    def _format_text_body(self, monitor: Monitor, result: CheckResult) -> str:
+    def _format_text_body(
+        self, monitor: Monitor, result: CheckResult, shown_details: dict[str, Any]
+    ) -> str:
         """Format email body as plain text (fallback)."""
         lines = [
             f"Monitor: {monitor.name}",
@@ -178,19 +244,16 @@ class EmailNotifier:
             f"Explanation: {result.explanation}",
         ]
 
-        if result.details and isinstance(result.details, dict):
-            details_to_show = {k: v for k, v in result.details.items()
-                            if k not in ('event_id', 'feed_title') and v}
-            if details_to_show:
-                lines.append("")
-                lines.append("Details:")
-                for key, value in details_to_show.items():
-                    lines.append(f"  {key}: {value}")
+        if shown_details:
+            lines.append("")
+            lines.append("Details:")
+            for key, value in shown_details.items():
+                lines.append(f"  {key}: {value}")
 
         if result.new_items:
             lines.append("")
             lines.append(f"New Articles ({len(result.new_items)}):")
-            lines.append("-" * 40)
+            lines.append(TEXT_SEPARATOR)
             for item in result.new_items[:10]:
                 title = item.get('title', 'No title')
                 source = item.get('source', '')
@@ -208,10 +271,7 @@ class EmailNotifier:
             if len(result.new_items) > 10:
                 lines.append(f"\n... and {len(result.new_items) - 10} more articles")
 
-        lines.append("")
-        lines.append("-" * 40)
-        lines.append("Sent by NotifyMe")
-
+        lines.extend(TEXT_FOOTER_LINES)
         return "\n".join(lines)
 
     def _send_email(self, subject: str, html_body: str, text_body: str) -> None:
@@ -227,28 +287,70 @@ class EmailNotifier:
         msg["Subject"] = subject
 
         # Attach plain text first, then HTML (email clients prefer the last one)
-        msg.attach(MIMEText(text_body, "plain"))
-        msg.attach(MIMEText(html_body, "html"))
+        msg.attach(_mime_text(text_body, "plain"))
+        msg.attach(_mime_text(html_body, "html"))
 
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-                logger.info(f"Email sent: {subject}")
+            if self._batching:
+                with self._server_lock:
+                    self._send_batched(msg)
+            else:
+                with self._connect() as server:
+                    server.send_message(msg)
+            logger.info(f"Email sent: {subject}")
         except Exception as e:
             logger.error(f"Failed to send email: {e}")
             raise
 
+    def _send_batched(self, msg: MIMEMultipart) -> None:
+        """Send on the batch's shared connection, opening or rotating it as needed."""
+        if self._sent_on_server >= MAX_MESSAGES_PER_CONNECTION:
+            self._close_server()
+        if self._server is None:
+            self._server = self._connect()
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped the idle connection; reconnect once
+            self._server = self._connect()
+            self._sent_on_server = 0
+            self._server.send_message(msg)
+        self._sent_on_server += 1
+
+    def _close_server(self) -> None:
+        """Quit the batch's shared connection, if one is open."""
+        server, self._server = self._server, None
+        self._sent_on_server = 0
+        if server is None:
+            return
+        try:
+            server.quit()
+        except smtplib.SMTPException as e:
+            logger.debug(f"SMTP quit failed: {e}")
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open a logged-in SMTP connection (implicit TLS on port 465, else STARTTLS)."""
+        implicit_tls = self.smtp_port == SMTPS_PORT
+        if implicit_tls:
+            server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, context=_tls_context())
+        else:
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+        try:
+            if not implicit_tls:
+                server.starttls(context=_tls_context())
+            server.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
     def test_connection(self) -> bool:
         """Test SMTP connection."""
         if not self.smtp_user or not self.smtp_password:
             return False
 
         try:
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
+            with self._connect():
                 return True
         except Exception as e:
             logger.error(f"SMTP connection test failed: {e}")
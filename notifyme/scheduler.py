@@ -1,12 +1,15 @@
 """Check orchestration and scheduling logic."""
 
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Callable
 
 from .checkers import AgenticChecker, CreditsChecker, NewsChecker, PriceChecker, WebpageChecker
 from .checkers.base import BaseChecker
 from .database import Database
+from .fetcher import shared_fetches
 from .models import CheckResult, Monitor, MonitorType
 from .notifier import EmailNotifier
 
@@ -23,6 +26,12 @@ CHECKER_MAP: dict[MonitorType, type[BaseChecker]] = {
     MonitorType.RSS: NewsChecker,  # RSS uses same checker as news
 }
 
+# Checker instances shared by every orchestrator in the process, built on first use
+_CHECKERS: dict[type[BaseChecker], BaseChecker] = {}
+
+# Max monitors checked at once (keeps us within Anthropic rate limits)
+DEFAULT_MAX_CONCURRENCY = 10
+
 
 class CheckOrchestrator:
     """Orchestrates monitor checking and notifications."""
@@ -32,25 +41,36 @@ class CheckOrchestrator:
         db: Database | None = None,
         notifier: EmailNotifier | None = None,
         dry_run: bool = False,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
     ):
         self.db = db or Database()
         self.notifier = notifier or EmailNotifier()
         self.dry_run = dry_run
-        self._checkers: dict[MonitorType, BaseChecker] = {}
+        self.max_concurrency = max_concurrency
+        self._results_lock: asyncio.Lock | None = None
+        self._results_lock_loop: asyncio.AbstractEventLoop | None = None
 
     def get_checker(self, monitor_type: MonitorType) -> BaseChecker:
-        """Get or create checker instance for monitor type."""
-        if monitor_type not in self._checkers:
-            checker_class = CHECKER_MAP.get(monitor_type)
-            if not checker_class:
-                raise ValueError(f"No checker available for type: {monitor_type}")
-            self._checkers[monitor_type] = checker_class()
-        return self._checkers[monitor_type]
+        """
+        Get or create checker instance for monitor type.
+
+        Instances are shared per checker class across all orchestrators, so
+        types mapped to the same class (news and RSS) share one checker and
+        its clients, and later orchestrators don't rebuild them.
+        """
+        checker_class = CHECKER_MAP.get(monitor_type)
+        if not checker_class:
+            raise ValueError(f"No checker available for type: {monitor_type}")
+        checker = _CHECKERS.get(checker_class)
+        if checker is None:
+            checker = _CHECKERS[checker_class] = checker_class()
+        return checker
 
     def check_monitor(
         self,
         monitor: Monitor,
         on_result: Callable[[Monitor, CheckResult], None] | None = None,
+        now: datetime | None = None,
     ) -> CheckResult:
         """
         Check a single monitor and handle notification if needed.
@@ -58,6 +78,7 @@ class CheckOrchestrator:
         Args:
             monitor: Monitor to check
             on_result: Optional callback for result
+            now: Time recorded as the check time (default: when the check finishes)
 
         Returns:
             CheckResult from the check
@@ -68,30 +89,80 @@ class CheckOrchestrator:
 
         try:
             result = checker.check(monitor)
+            self._handle_result(monitor, checker, result, on_result, now)
+            return result
 
-            # Determine if we should notify
-            should_notify = checker.should_notify(monitor, result)
-
-            if should_notify:
-                logger.info(f"Condition met for {monitor.name}, sending notification")
-                notification = self.notifier.send(monitor, result, dry_run=self.dry_run)
-                self.db.add_notification(notification)
+        except Exception as e:
+            logger.error(f"Error checking {monitor.name}: {e}")
+            raise
 
-            # Update monitor state
-            monitor.last_checked = datetime.now()
-            monitor.last_state = checker.get_state_for_storage(result, monitor)
-            monitor.last_state_hash = result.state_hash
-            self.db.update_monitor(monitor)
+    async def check_monitor_async(
+        self,
+        monitor: Monitor,
+        on_result: Callable[[Monitor, CheckResult], None] | None = None,
+        now: datetime | None = None,
+    ) -> CheckResult:
+        """Async variant of check_monitor()."""
+        logger.info(f"Checking monitor: {monitor.name} ({monitor.type.value})")
 
-            if on_result:
-                on_result(monitor, result)
+        checker = self.get_checker(monitor.type)
 
+        try:
+            result = await checker.check_async(monitor)
+            # Sending email and writing state block; keep them off the event loop.
+            # Checks overlap, but results are handled one at a time, as on_result
+            # callers and the notification/state bookkeeping expect.
+            async with self._results_lock_for_loop():
+                await asyncio.to_thread(self._handle_result, monitor, checker, result, on_result, now)
             return result
 
         except Exception as e:
             logger.error(f"Error checking {monitor.name}: {e}")
             raise
 
+    def _results_lock_for_loop(self) -> asyncio.Lock:
+        """Lock serializing _handle_result() calls, one per event loop."""
+        loop = asyncio.get_running_loop()
+        if self._results_lock is None or self._results_lock_loop is not loop:
+            self._results_lock, self._results_lock_loop = asyncio.Lock(), loop
+        return self._results_lock
+
+    def _handle_result(
+        self,
+        monitor: Monitor,
+        checker: BaseChecker,
+        result: CheckResult,
+        on_result: Callable[[Monitor, CheckResult], None] | None,
+        now: datetime | None = None,
+    ) -> None:
+        """Send a notification if needed and persist the monitor's new state."""
+        # Determine if we should notify
+        should_notify = checker.should_notify(monitor, result)
+
+        if should_notify:
+            logger.info(f"Condition met for {monitor.name}, sending notification")
+            notification = self.notifier.send(monitor, result, dry_run=self.dry_run)
+            self.db.add_notification(notification)
+
+        # Update monitor state
+        now = now or datetime.now()
+        monitor.last_checked = now
+        state = checker.get_state_for_storage(result, monitor)
+        if state == monitor.last_state and result.state_hash == monitor.last_state_hash:
+            # Nothing new to store (the usual outcome); just reschedule
+            self.db.touch_last_checked(monitor)
+        else:
+            monitor.last_state = state
+            monitor.last_state_hash = result.state_hash
+            self.db.update_monitor(monitor, now=now)
+
+        # Commit now rather than at the end of the run: if the process dies
+        # later, the sent notification is still recorded and won't repeat
+        self.db.flush()
+
+        if on_result:
+            on_result(monitor, result)
+
     def check_all_due(
         self,
         on_result: Callable[[Monitor, CheckResult], None] | None = None,
@@ -105,19 +176,13 @@ class CheckOrchestrator:
         Returns:
             List of (monitor, result) tuples
         """
-        due_monitors = self.db.get_monitors_due_for_check()
+        # One timestamp for the whole run, so every monitor checked in it is
+        # rescheduled from the same point regardless of how long its check took
+        now = datetime.now()
+        due_monitors = self.db.get_monitors_due_for_check(now)
         logger.info(f"Found {len(due_monitors)} monitor(s) due for checking")
 
-        results = []
-        for monitor in due_monitors:
-            try:
-                result = self.check_monitor(monitor, on_result)
-                results.append((monitor, result))
-            except Exception as e:
-                logger.error(f"Failed to check {monitor.name}: {e}")
-                # Continue with other monitors
-
-        return results
+        return self._check_many(due_monitors, on_result, now)
 
     def check_all(
         self,
@@ -135,12 +200,47 @@ class CheckOrchestrator:
         monitors = self.db.list_monitors(active_only=True)
         logger.info(f"Checking all {len(monitors)} active monitor(s)")
 
-        results = []
-        for monitor in monitors:
-            try:
-                result = self.check_monitor(monitor, on_result)
-                results.append((monitor, result))
-            except Exception as e:
-                logger.error(f"Failed to check {monitor.name}: {e}")
+        return self._check_many(monitors, on_result, datetime.now())
 
-        return results
+    def _check_many(
+        self,
+        monitors: list[Monitor],
+        on_result: Callable[[Monitor, CheckResult], None] | None = None,
+        now: datetime | None = None,
+    ) -> list[tuple[Monitor, CheckResult]]:
+        """
+        Check monitors concurrently, at most max_concurrency at a time.
+
+        Failures are logged and skipped so one bad monitor doesn't stop the rest.
+        Monitors watching the same page share a single fetch within the run,
+        notification emails share one SMTP connection, and each monitor's
+        database writes are committed together once its result is handled.
+
+        Returns:
+            List of (monitor, result) tuples for successful checks, in input order
+        """
+        if not monitors:
+            return []
+
+        async def run_all() -> list[tuple[Monitor, CheckResult] | None]:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            # Blocking fetches run via asyncio.to_thread; the default pool is
+            # sized by CPU count and would cap concurrency on small machines
+            asyncio.get_running_loop().set_default_executor(
+                ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="notifyme-check")
+            )
+
+            async def run_one(monitor: Monitor) -> tuple[Monitor, CheckResult] | None:
+                async with semaphore:
+                    try:
+                        return monitor, await self.check_monitor_async(monitor, on_result, now)
+                    except Exception as e:
+                        logger.error(f"Failed to check {monitor.name}: {e}")
+                        # Continue with other monitors
+                        return None
+
+            return await asyncio.gather(*(run_one(m) for m in monitors))
+
+        with shared_fetches(), self.notifier.batch(), self.db.batch():
+            outcomes = asyncio.run(run_all())
+        return [outcome for outcome in outcomes if outcome is not None]
@@ -9,12 +9,16 @@ Uses Playwright for browser control + IMAP for magic link retrieval.
 """
 
 import email
+import email.message
 import imaplib
 import os
 import re
+import select
+import ssl
 import sys
 import time
 from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
 
 from dotenv import load_dotenv
 
@@ -27,6 +31,168 @@ IMAP_HOST = os.getenv("IMAP_HOST", "imap.gmail.com")
 IMAP_USER = os.getenv("IMAP_USER")
 IMAP_PASSWORD = os.getenv("IMAP_PASSWORD")
 
+# Credit balance patterns on the billing page, most specific first
+BALANCE_PATTERNS = [
+    r'Credit Balance[:\s]*\$?([\d,]+\.?\d*)',  # Credit Balance: $12.34
+    r'\$([\d,]+\.?\d*)\s*(?:remaining|credit|balance)',  # $12.34 remaining
+    r'remaining[:\s]*\$?([\d,]+\.?\d*)',  # remaining: $12.34
+    r'balance[:\s]*\$?([\d,]+\.?\d*)',  # balance: $12.34
+    r'credits?[:\s]*\$?([\d,]+\.?\d*)',  # credits: $12.34
+]
+
+# Compiled once and tried in order (not one alternation, where the leftmost match would win)
+BALANCE_RES = [re.compile(pattern, re.IGNORECASE) for pattern in BALANCE_PATTERNS]
+
+# Selectors and waits for the console's login flow
+EMAIL_INPUT_SELECTOR = 'input[type="email"], input[name="email"], input[placeholder*="email" i]'
+PAGE_WAIT_TIMEOUT_MS = 15000
+CREDIT_BALANCE_RE = re.compile(r"credit balance", re.IGNORECASE)
+CHECK_EMAIL_RE = re.compile(r"check your email", re.IGNORECASE)
+
+# Runs the balance patterns over the rendered page text in the browser and
+# returns only the amount; JavaScript accepts these patterns unchanged
+FIND_BALANCE_JS = """(patterns) => {
+    const text = document.body.innerText;
+    for (const pattern of patterns) {
+        const match = text.match(new RegExp(pattern, "i"));
+        if (match) return match[1];
+    }
+    return null;
+}"""
+
+# Elements likely to hold just the balance, read before falling back to the whole page
+BALANCE_ELEMENT_SELECTOR = '[data-testid*="balance" i], [aria-label*="balance" i]'
+
+MAGIC_LINK_RE = re.compile(r'href="(https://platform\.claude\.com/magic-link[^"]+)"')
+# The magic link may land on either console host once the session is set
+LOGGED_IN_URL_RE = re.compile(r"https://(console\.anthropic|platform\.claude)\.com/")
+MAGIC_LINK_MARKER = b"platform.claude.com/magic-link"
+FETCH_UID_RE = re.compile(rb"UID (\d+)")
+DOLLAR_RE = re.compile(r'\$([\d,]+\.?\d*)')
+
+# Shared across reconnects so the CA bundle is only loaded once
+_SSL_CONTEXT = ssl.create_default_context()
+
+
+def _connect_imap() -> imaplib.IMAP4_SSL:
+    """Open a logged-in IMAP connection with INBOX selected."""
+    mail = imaplib.IMAP4_SSL(IMAP_HOST, ssl_context=_SSL_CONTEXT)
+    mail.login(IMAP_USER, IMAP_PASSWORD)
+    mail.select("INBOX")
+    return mail
+
+
+def find_balance(text: str) -> float | None:
+    """Find the credit balance in page text, preferring the most specific pattern."""
+    for pattern in BALANCE_RES:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1).replace(',', ''))
+    return None
+
+
+def is_fresh_login_email(headers: email.message.Message) -> bool:
+    """Check headers for a login email received within the last 2 minutes."""
+    subject = headers.get("Subject", "")
+    date_str = headers.get("Date", "")
+
+    # Check if this is a login email
+    if "secure link" not in subject.lower() and "log in" not in subject.lower():
+        return False
+
+    # Parse email date to check freshness
+    try:
+        email_date = parsedate_to_datetime(date_str)
+        email_age = (datetime.now(email_date.tzinfo) - email_date).total_seconds()
+    except Exception as e:
+        print(f"Could not parse date: {e}")
+        return False
+
+    # Skip emails older than 2 minutes
+    if email_age > 120:
+        return False
+
+    print(f"Found recent login email ({int(email_age)}s old)")
+    return True
+
+
+def find_magic_link(msg: email.message.Message) -> str | None:
+    """
+    Find the magic link in a login email.
+
+    Text parts are decoded HTML first, stopping at the first one with the link.
+    """
+    # walk() yields the message itself when it isn't multipart
+    for content_type in ("text/html", "text/plain"):
+        for part in msg.walk():
+            if part.get_content_type() != content_type:
+                continue
+            payload = part.get_payload(decode=True)
+            # Plain substring test first; most parts don't contain the link at all
+            if not payload or MAGIC_LINK_MARKER not in payload:
+                continue
+            magic_link_match = MAGIC_LINK_RE.search(payload.decode('utf-8', errors='replace'))
+            if magic_link_match:
+                return magic_link_match.group(1)
+    return None
+
+
+def wait_readable(mail: imaplib.IMAP4, timeout: float) -> bool:
+    """Whether mail has a line to read within timeout seconds, including bytes already buffered."""
+    sock = mail.sock
+    # imaplib's reader may already hold bytes pulled off the socket; peek without blocking
+    previous_timeout = sock.gettimeout()
+    sock.settimeout(0)
+    try:
+        if mail.file.peek(1):
+            return True
+    except (BlockingIOError, ssl.SSLWantReadError):
+        pass
+    finally:
+        sock.settimeout(previous_timeout)
+    if isinstance(sock, ssl.SSLSocket) and sock.pending():
+        return True
+    readable, _, _ = select.select([sock], [], [], timeout)
+    return bool(readable)
+
+
+def imap_idle(mail: imaplib.IMAP4_SSL, timeout: float) -> bool:
+    """
+    Wait in IMAP IDLE until the server reports new mail or timeout expires.
+
+    imaplib has no IDLE support before Python 3.14, so this speaks the
+    protocol directly: send IDLE, wait for an untagged EXISTS, send DONE.
+
+    Returns:
+        True if new mail arrived, False on timeout
+    """
+    mail.untagged_responses.pop("EXISTS", None)  # Already seen by the last poll
+    tag = mail._new_tag()
+    mail.send(tag + b" IDLE\r\n")
+
+    # Wait for the "+ idling" continuation; a tagged reply means IDLE was refused
+    while mail._get_response() is not None:
+        if mail.tagged_commands.get(tag) is not None:
+            raise mail.error(f"IDLE rejected: {mail.tagged_commands.pop(tag)}")
+
+    # An EXISTS that arrived before the continuation is filed in untagged_responses
+    new_mail = mail.untagged_responses.pop("EXISTS", None) is not None
+
+    # select() rather than a socket timeout, which would break the DONE read
+    deadline = time.monotonic() + timeout
+    while not new_mail:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not wait_readable(mail, remaining):
+            break
+        line = mail.readline()
+        if not line:
+            raise mail.abort("connection closed during IDLE")
+        new_mail = line.rstrip().endswith(b"EXISTS")
+
+    mail.send(b"DONE\r\n")
+    mail._command_complete("IDLE", tag)
+    return new_mail
+
 
 def get_magic_link(max_wait_seconds: int = 90) -> str | None:
     """
@@ -41,92 +207,100 @@ def get_magic_link(max_wait_seconds: int = 90) -> str | None:
     print(f"Checking IMAP for magic link from Anthropic...")
     start_time = time.time()
     request_time = datetime.now()
+    mail = None
+    last_uid = 0  # Highest message UID already looked at; later polls skip up to it
 
-    while time.time() - start_time < max_wait_seconds:
-        try:
-            # Connect to IMAP
-            mail = imaplib.IMAP4_SSL(IMAP_HOST)
-            mail.login(IMAP_USER, IMAP_PASSWORD)
-            mail.select("INBOX")
-
-            # Search for Anthropic emails from today
-            date_since = (datetime.now() - timedelta(days=1)).strftime("%d-%b-%Y")
-            _, messages = mail.search(None, f'(FROM "anthropic" SINCE "{date_since}")')
-
-            email_ids = messages[0].split()
-
-            if email_ids:
-                # Check emails from newest to oldest
-                for email_id in reversed(email_ids):
-                    _, msg_data = mail.fetch(email_id, "(RFC822)")
-
-                    for response_part in msg_data:
-                        if isinstance(response_part, tuple):
-                            msg = email.message_from_bytes(response_part[1])
-                            subject = msg.get("Subject", "")
-                            date_str = msg.get("Date", "")
-
-                            # Check if this is a login email
-                            if "secure link" not in subject.lower() and "log in" not in subject.lower():
-                                continue
-
-                            # Parse email date to check freshness
-                            try:
-                                from email.utils import parsedate_to_datetime
-                                email_date = parsedate_to_datetime(date_str)
-                                email_age = (datetime.now(email_date.tzinfo) - email_date).total_seconds()
-
-                                # Skip emails older than 2 minutes
-                                if email_age > 120:
-                                    continue
-
-                                print(f"Found recent login email ({int(email_age)}s old)")
-                            except Exception as e:
-                                print(f"Could not parse date: {e}")
-                                continue
-
-                            # Get the email body
-                            body = ""
-                            if msg.is_multipart():
-                                for part in msg.walk():
-                                    if part.get_content_type() in ["text/html", "text/plain"]:
-                                        payload = part.get_payload(decode=True)
-                                        if payload:
-                                            body += payload.decode('utf-8', errors='replace')
-                            else:
-                                payload = msg.get_payload(decode=True)
-                                if payload:
-                                    body = payload.decode('utf-8', errors='replace')
-
-                            # Find magic link
-                            magic_link_match = re.search(
-                                r'href="(https://platform\.claude\.com/magic-link[^"]+)"',
-                                body
-                            )
-                            if magic_link_match:
-                                magic_link = magic_link_match.group(1)
-                                print(f"Found magic link!")
-                                mail.logout()
-                                return magic_link
-
-            mail.logout()
-
-        except Exception as e:
-            print(f"IMAP error: {e}")
-
-        print(f"No magic link yet, waiting... ({int(time.time() - start_time)}s)")
-        time.sleep(3)
+    try:
+        while time.time() - start_time < max_wait_seconds:
+            try:
+                # Log in once and keep polling on the open connection
+                if mail is None:
+                    mail = _connect_imap()
+
+                # Search for new Anthropic login emails from today; the server does the filtering
+                date_since = (datetime.now() - timedelta(days=1)).strftime("%d-%b-%Y")
+                criteria = (
+                    f'(UID {last_uid + 1}:* FROM "anthropic" '
+                    f'OR SUBJECT "secure link" SUBJECT "log in" SINCE "{date_since}")'
+                )
+                try:
+                    _, messages = mail.uid("SEARCH", criteria)
+                except (imaplib.IMAP4.abort, OSError) as e:
+                    print(f"IMAP connection lost ({e}), reconnecting...")
+                    mail = _connect_imap()
+                    _, messages = mail.uid("SEARCH", criteria)
+
+                # "n:*" always matches the newest message, even below n
+                uids = [uid for uid in messages[0].split() if int(uid) > last_uid]
+
+                if uids:
+                    # One round trip for the headers of every candidate; bodies
+                    # are then fetched only for fresh login emails
+                    _, header_data = mail.uid(
+                        "FETCH", b",".join(uids), "(BODY.PEEK[HEADER.FIELDS (SUBJECT DATE)])"
+                    )
+                    login_uids = [
+                        FETCH_UID_RE.search(response_part[0]).group(1)
+                        for response_part in header_data
+                        if isinstance(response_part, tuple)
+                        and is_fresh_login_email(email.message_from_bytes(response_part[1]))
+                    ]
+
+                    # Check emails from newest to oldest
+                    for email_id in sorted(login_uids, key=int, reverse=True):
+                        _, msg_data = mail.uid("FETCH", email_id, "(BODY.PEEK[])")
+
+                        for response_part in msg_data:
+                            if isinstance(response_part, tuple):
+                                msg = email.message_from_bytes(response_part[1])
+                                magic_link = find_magic_link(msg)
+                                if magic_link:
+                                    print(f"Found magic link!")
+                                    return magic_link
+
+                    # Only once every new email was checked, so a failed poll retries them
+                    last_uid = max(int(uid) for uid in uids)
+
+            except (imaplib.IMAP4.abort, OSError) as e:
+                # Connection is unusable; start a fresh one on the next poll
+                print(f"IMAP error: {e}")
+                mail = None
+            except Exception as e:
+                print(f"IMAP error: {e}")
+
+            elapsed = time.time() - start_time
+            remaining = max_wait_seconds - elapsed
+            if remaining <= 0:
+                break
+            print(f"No magic link yet, waiting... ({int(elapsed)}s)")
+
+            # Let the server push new mail to us; poll every 3s without IDLE
+            if mail is not None and "IDLE" in mail.capabilities:
+                try:
+                    imap_idle(mail, timeout=min(remaining, 30))
+                    continue
+                except Exception as e:
+                    print(f"IMAP IDLE failed ({e}), reconnecting...")
+                    mail = None
+            time.sleep(min(remaining, 3))
+    finally:
+        if mail is not None:
+            try:
+                mail.logout()
+            except Exception:
+                pass
 
     print("Timeout waiting for magic link email")
     return None
 
 
-def login_and_get_credits(headed: bool = True) -> float | None:
+def login_and_get_credits(headed: bool = True, debug: bool = False) -> float | None:
     """
     Log into Anthropic console and retrieve credit balance.
 
     Args:
         headed: Run browser in headed mode (visible) for debugging
+        debug: Also save a screenshot when the balance is found
 
     Returns:
         Credit balance as float, or None on failure
@@ -147,28 +321,28 @@ def login_and_get_credits(headed: bool = True) -> float | None:
         try:
             # Step 1: Navigate to login page
             print("Navigating to Anthropic console login...")
-            page.goto("https://console.anthropic.com/login", wait_until="networkidle")
-            time.sleep(2)
+            page.goto("https://console.anthropic.com/login", wait_until="domcontentloaded")
+            page.wait_for_selector(EMAIL_INPUT_SELECTOR, timeout=PAGE_WAIT_TIMEOUT_MS)
 
             # Step 2: Enter email
             print(f"Entering email: {ANTHROPIC_EMAIL}")
-            email_input = page.locator('input[type="email"], input[name="email"], input[placeholder*="email" i]')
-            email_input.fill(ANTHROPIC_EMAIL)
-            time.sleep(1)
+            page.locator(EMAIL_INPUT_SELECTOR).fill(ANTHROPIC_EMAIL)
 
             # Step 3: Click Continue with email button
             print("Clicking 'Continue with email'...")
             continue_btn = page.locator('button:has-text("Continue with email")')
             continue_btn.click()
-            time.sleep(2)
 
             # Step 4: Click "Email me a link" or similar (if prompted)
             try:
                 email_link_btn = page.locator('button:has-text("Email me a link"), button:has-text("Send link")')
-                if email_link_btn.is_visible(timeout=3000):
+                # Wait for either the link button or the "check your email" screen
+                email_link_btn.or_(page.get_by_text(CHECK_EMAIL_RE)).first.wait_for(
+                    timeout=PAGE_WAIT_TIMEOUT_MS
+                )
+                if email_link_btn.first.is_visible():
                     print("Clicking 'Email me a link'...")
-                    email_link_btn.click()
-                    time.sleep(2)
+                    email_link_btn.first.click()
             except Exception:
                 pass
 
@@ -182,54 +356,67 @@ def login_and_get_credits(headed: bool = True) -> float | None:
 
             # Step 6: Navigate to magic link
             print(f"Navigating to magic link...")
-            page.goto(magic_link, wait_until="networkidle")
-            time.sleep(5)
+            page.goto(magic_link, wait_until="domcontentloaded")
+            # Wait for the redirect back to the console; if it doesn't come,
+            # the billing page below shows whether the login worked
+            try:
+                page.wait_for_url(LOGGED_IN_URL_RE, timeout=PAGE_WAIT_TIMEOUT_MS)
+            except Exception:
+                print("No redirect to the console after the magic link, checking billing anyway")
 
             # Step 7: Check if we're logged in - try to navigate to billing
             print("Navigating to billing page...")
-            page.goto("https://console.anthropic.com/settings/billing", wait_until="networkidle")
-            time.sleep(3)
+            page.goto("https://console.anthropic.com/settings/billing", wait_until="domcontentloaded")
+            # Settles on either the balance (logged in) or the email input (redirected)
+            try:
+                page.get_by_text(CREDIT_BALANCE_RE).or_(page.locator(EMAIL_INPUT_SELECTOR)).first.wait_for(
+                    timeout=PAGE_WAIT_TIMEOUT_MS
+                )
+            except Exception:
+                print("Billing page did not render a balance or login form in time")
 
             # Step 8: Extract credit balance
             print("Extracting credit balance...")
-            page_text = page.inner_text("body")
-
-            # Debug: print page URL and text
             print(f"Current URL: {page.url}")
 
-            # Look for credit/balance patterns
-            balance_patterns = [
-                r'Credit Balance[:\s]*\$?([\d,]+\.?\d*)',  # Credit Balance: $12.34
-                r'\$([\d,]+\.?\d*)\s*(?:remaining|credit|balance)',  # $12.34 remaining
-                r'remaining[:\s]*\$?([\d,]+\.?\d*)',  # remaining: $12.34
-                r'balance[:\s]*\$?([\d,]+\.?\d*)',  # balance: $12.34
-                r'credits?[:\s]*\$?([\d,]+\.?\d*)',  # credits: $12.34
-            ]
-
-            for pattern in balance_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE)
-                if match:
-                    balance_str = match.group(1).replace(',', '')
-                    balance = float(balance_str)
-                    print(f"Found credit balance: ${balance:.2f}")
-
+            # Read a dedicated balance element if the page has one, else match
+            # the page text in the browser; the full text only crosses over on failure
+            balance = None
+            balance_element = page.locator(BALANCE_ELEMENT_SELECTOR)
+            if balance_element.count():
+                element_text = balance_element.first.inner_text()
+                balance = find_balance(element_text)
+                # The element may hold a bare amount with its label elsewhere
+                amount = DOLLAR_RE.search(element_text)
+                if balance is None and amount:
+                    balance = float(amount.group(1).replace(',', ''))
+            if balance is None:
+                balance_str = page.evaluate(FIND_BALANCE_JS, BALANCE_PATTERNS)
+                if balance_str is not None:
+                    balance = float(balance_str.replace(',', ''))
+
+            if balance is not None:
+                print(f"Found credit balance: ${balance:.2f}")
+
+                if debug:
                     # Take screenshot for verification
                     screenshot_path = "/tmp/anthropic_credits.png"
                     page.screenshot(path=screenshot_path)
                     print(f"Screenshot saved: {screenshot_path}")
 
-                    return balance
+                return balance
 
             # Try to find any dollar amounts
-            dollar_amounts = re.findall(r'\$([\d,]+\.?\d*)', page_text)
+            page_text = page.inner_text("body")
+            dollar_amounts = DOLLAR_RE.findall(page_text)
             if dollar_amounts:
                 print(f"Found dollar amounts: {dollar_amounts}")
 
             # If no balance found, save debug info
             print("Could not find credit balance pattern in page")
             print(f"Page text (first 3000 chars):\n{page_text[:3000]}")
-            screenshot_path = "/tmp/anthropic_credits_debug.png"
-            page.screenshot(path=screenshot_path)
+            screenshot_path = "/tmp/anthropic_credits_debug.jpg"
+            page.screenshot(path=screenshot_path, type="jpeg", quality=60)
             print(f"Debug screenshot saved: {screenshot_path}")
 
             return None
@@ -240,8 +427,8 @@ def login_and_get_credits(headed: bool = True) -> float | None:
             traceback.print_exc()
             # Save error screenshot
             try:
-                page.screenshot(path="/tmp/anthropic_error.png")
-                print("Error screenshot saved: /tmp/anthropic_error.png")
+                page.screenshot(path="/tmp/anthropic_error.jpg", type="jpeg", quality=60)
+                print("Error screenshot saved: /tmp/anthropic_error.jpg")
             except Exception:
                 pass
             raise
@@ -267,8 +454,8 @@ def main():
     print(f"IMAP User: {IMAP_USER}")
     print()
 
-    # Run with headed browser for debugging
-    balance = login_and_get_credits(headed=True)
+    # Run with headed browser for debugging; --debug also screenshots a successful run
+    balance = login_and_get_credits(headed=True, debug="--debug" in sys.argv)
 
     if balance is not None:
         print()
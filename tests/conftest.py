@@ -0,0 +1,60 @@
+"""Shared test fixtures."""
+
+import socket
+
+import pytest
+
+# Fetch functions as imported by each checker module
+CHECKER_FETCHES = (
+    "notifyme.checkers.agentic.fetch_url",
+    "notifyme.checkers.news.fetch_rss",
+    "notifyme.checkers.news.fetch_url",
+    "notifyme.checkers.price.fetch_url",
+    "notifyme.checkers.webpage.fetch_url",
+)
+
+NETWORK_FAMILIES = (socket.AF_INET, socket.AF_INET6)
+LOCAL_HOSTS = (None, "localhost", "127.0.0.1", "::1")
+
+_getaddrinfo = socket.getaddrinfo
+_socket_connect = socket.socket.connect
+_socket_connect_ex = socket.socket.connect_ex
+
+
+def _network_blocked(*args, **kwargs):
+    raise RuntimeError("Network access in tests is blocked; patch the fetch this test needs")
+
+
+def _guarded_getaddrinfo(host, *args, **kwargs):
+    if host not in LOCAL_HOSTS:
+        _network_blocked()
+    return _getaddrinfo(host, *args, **kwargs)
+
+
+def _guarded_connect(sock, address):
+    if sock.family in NETWORK_FAMILIES:
+        _network_blocked()
+    return _socket_connect(sock, address)
+
+
+def _guarded_connect_ex(sock, address):
+    if sock.family in NETWORK_FAMILIES:
+        _network_blocked()
+    return _socket_connect_ex(sock, address)
+
+
+@pytest.fixture(autouse=True)
+def no_network(monkeypatch):
+    """
+    Refuse DNS lookups and TCP/UDP connections, so no test reaches the network.
+
+    Covers requests, smtplib, imaplib and anything else built on socket;
+    local socket pairs still work. Checker fetches are also stubbed so a
+    stray fetch fails at once instead of falling back to a browser, whose
+    subprocess this guard can't reach.
+    """
+    monkeypatch.setattr(socket, "getaddrinfo", _guarded_getaddrinfo)
+    monkeypatch.setattr(socket.socket, "connect", _guarded_connect)
+    monkeypatch.setattr(socket.socket, "connect_ex", _guarded_connect_ex)
+    for target in CHECKER_FETCHES:
+        monkeypatch.setattr(target, _network_blocked)
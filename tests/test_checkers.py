@@ -1,13 +1,72 @@
 """Tests for checker implementations."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+import dataclasses
+import imaplib
+import json
+import socket
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from notifyme.checkers.agentic import AgenticChecker
 from notifyme.checkers.news import NewsChecker
 from notifyme.checkers.webpage import WebpageChecker
-from notifyme.models import Monitor, MonitorType
+from notifyme.fetcher import FetchResult
+from notifyme.models import CheckResult, Monitor, MonitorType
+
+# Claude verdicts shared by the agentic checker tests
+REPLY_MET = json.dumps(
+    {"condition_met": True, "explanation": "Buy button found", "relevant_details": "Price: $999"}
+)
+REPLY_NOT_MET = json.dumps(
+    {"condition_met": False, "explanation": "Coming soon page", "relevant_details": "No purchase option"}
+)
+
+
+def _claude_reply(text: str) -> SimpleNamespace:
+    """Messages API response holding a single text block."""
+    return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+def _fetched(text: str, content_hash: str = "abc123") -> FetchResult:
+    """Fetch result for a page whose extracted text is text."""
+    return FetchResult(url="https://example.com", html="", text=text, status_code=200, content_hash=content_hash)
+
+
+class _SocketIMAP(imaplib.IMAP4):
+    """imaplib client over an already-connected socket."""
+
+    def __init__(self, sock: socket.socket):
+        self._test_sock = sock
+        super().__init__()
+
+    def open(self, host="", port=imaplib.IMAP4_PORT, timeout=None):
+        self.host, self.port = host, port
+        self.sock = self._test_sock
+        self.file = self.sock.makefile("rb")
+
+
+def _fake_imap_server(sock: socket.socket, idle_reply: bytes = b"+ idling\r\n") -> None:
+    """Minimal IMAP server: CAPABILITY, IDLE (until DONE) and NOOP."""
+    with sock, sock.makefile("rb") as lines:
+        sock.sendall(b"* OK ready\r\n")
+        idle_tag = None
+        for line in lines:
+            if line == b"DONE\r\n":
+                sock.sendall(idle_tag + b" OK IDLE terminated\r\n")
+                continue
+            tag, command = line.split()[:2]
+            if command == b"CAPABILITY":
+                sock.sendall(b"* CAPABILITY IMAP4rev1 IDLE\r\n" + tag + b" OK done\r\n")
+            elif command == b"IDLE":
+                idle_tag = tag
+                sock.sendall(idle_reply)
+            else:
+                sock.sendall(tag + b" OK done\r\n")
 
 
 class TestNewsChecker:
@@ -36,59 +95,82 @@ class TestNewsChecker:
             ],
         }
 
-    def test_first_check_finds_all_articles(self, mock_feed):
-        """First check should find all articles as new."""
+    @pytest.mark.parametrize("seen_ids,expected_new_ids", [
+        pytest.param(None, ["article1", "article2"], id="first-check-finds-all"),
+        pytest.param(["article1", "article2"], [], id="nothing-new"),
+        pytest.param(["article1"], ["article2"], id="only-unseen"),
+    ])
+    def test_check_reports_unseen_articles(self, monkeypatch, mock_feed, seen_ids, expected_new_ids):
+        """Articles not in the stored seen IDs are reported as new, in feed order."""
         monitor = Monitor(
             name="News Test",
             type=MonitorType.NEWS,
             url="https://news.google.com/rss",
+            last_state={"seen_ids": seen_ids} if seen_ids is not None else {},
         )
 
         checker = NewsChecker()
-        with patch("notifyme.checkers.news.fetch_rss", return_value=mock_feed):
-            result = checker.check(monitor)
+        monkeypatch.setattr("notifyme.checkers.news.fetch_rss", lambda *a, **k: mock_feed)
+        result = checker.check(monitor)
 
-        assert result.condition_met is True
-        assert len(result.new_items) == 2
-        assert result.new_items[0]["title"] == "First Article - Source A"
+        assert result.condition_met is bool(expected_new_ids)
+        assert [item["id"] for item in result.new_items] == expected_new_ids
+        titles = {entry["id"]: entry["title"] for entry in mock_feed["entries"]}
+        assert [item["title"] for item in result.new_items] == [titles[i] for i in expected_new_ids]
 
-    def test_second_check_no_new_articles(self, mock_feed):
-        """Second check with same articles should find nothing new."""
-        monitor = Monitor(
-            name="News Test",
-            type=MonitorType.NEWS,
-            url="https://news.google.com/rss",
-            last_state={"seen_ids": ["article1", "article2"]},
-        )
+    def test_repeated_entry_reported_once(self, monkeypatch, mock_feed):
+        """An entry repeated within one feed is only a single new article."""
+        mock_feed["entries"].append(dict(mock_feed["entries"][0]))
+        monitor = Monitor(name="News Test", type=MonitorType.NEWS, url="https://news.google.com/rss")
 
         checker = NewsChecker()
-        with patch("notifyme.checkers.news.fetch_rss", return_value=mock_feed):
-            result = checker.check(monitor)
+        monkeypatch.setattr("notifyme.checkers.news.fetch_rss", lambda *a, **k: mock_feed)
+        result = checker.check(monitor)
 
-        assert result.condition_met is False
-        assert len(result.new_items) == 0
+        assert [item["id"] for item in result.new_items] == ["article1", "article2"]
+        state = checker.get_state_for_storage(result, monitor)
+        assert state["seen_ids"] == ["article1", "article2"]
+
+    def test_feed_hash_ignores_entry_order(self, monkeypatch, mock_feed):
+        """Reordering the same entries doesn't change the feed's state hash."""
+        monitor = Monitor(name="News Test", type=MonitorType.NEWS, url="https://news.google.com/rss")
+        checker = NewsChecker()
+        # The feed is edited in place, so every fetch sees the current entries
+        monkeypatch.setattr("notifyme.checkers.news.fetch_rss", lambda *a, **k: mock_feed)
+
+        first = checker.check(monitor).state_hash
+        mock_feed["entries"].reverse()
+        reordered = checker.check(monitor).state_hash
+        mock_feed["entries"].pop()
+        shorter = checker.check(monitor).state_hash
 
-    def test_check_finds_new_articles(self, mock_feed):
-        """Check should find only new articles."""
+        assert first == reordered
+        assert first != shorter
+
+    def test_not_modified_feed_keeps_state(self):
+        """A 304 response reports nothing new and keeps seen IDs and validators."""
         monitor = Monitor(
             name="News Test",
             type=MonitorType.NEWS,
             url="https://news.google.com/rss",
-            last_state={"seen_ids": ["article1"]},  # Only seen first article
+            last_state={"seen_ids": ["article1"], "etag": '"v1"'},
+            last_state_hash="abc",
         )
+        not_modified = {"status": 304, "etag": '"v1"', "modified": None, "feed": {}, "entries": []}
 
         checker = NewsChecker()
-        with patch("notifyme.checkers.news.fetch_rss", return_value=mock_feed):
+        with patch("notifyme.checkers.news.fetch_rss", return_value=not_modified) as mock_fetch:
             result = checker.check(monitor)
 
-        assert result.condition_met is True
-        assert len(result.new_items) == 1
-        assert result.new_items[0]["id"] == "article2"
+        assert mock_fetch.call_args.kwargs["etag"] == '"v1"'
+        assert result.new_items == []
+        assert result.state_hash == "abc"
+        state = checker.get_state_for_storage(result, monitor)
+        assert state["seen_ids"] == ["article1"]
+        assert state["etag"] == '"v1"'
 
     def test_should_notify_on_new_articles(self):
         """Should notify when there are new articles."""
-        from notifyme.models import CheckResult
-
         monitor = Monitor(name="Test", type=MonitorType.NEWS, url="https://a.com")
         checker = NewsChecker()
 
@@ -106,14 +188,77 @@ class TestNewsChecker:
         )
         assert checker.should_notify(monitor, result_without_new) is False
 
+    def test_filter_articles_keeps_feed_order(self):
+        """Articles checked concurrently still come back in feed order."""
+        articles = [{"id": str(i), "title": f"Article {i}"} for i in range(6)]
+        checker = NewsChecker()
+
+        with patch.object(
+            checker, "_article_matches_condition",
+            side_effect=lambda article, content, condition: int(article["id"]) % 2 == 0,
+        ):
+            filtered, rejected_ids = checker._filter_articles(articles, "even articles")
+
+        assert [a["id"] for a in filtered] == ["0", "2", "4"]
+        assert sorted(rejected_ids) == ["1", "3", "5"]
+
+    def test_filter_articles_stop_on_first(self):
+        """stop_on_first returns only the first match found."""
+        articles = [{"id": str(i), "title": f"Article {i}"} for i in range(3)]
+        checker = NewsChecker()
+
+        with patch.object(
+            checker, "_article_matches_condition",
+            side_effect=lambda article, content, condition: article["id"] == "1",
+        ):
+            filtered, _ = checker._filter_articles(articles, "article one", stop_on_first=True)
+
+        assert [a["id"] for a in filtered] == ["1"]
+
+    def test_rejected_articles_not_rechecked(self, mock_feed):
+        """Articles rejected for the same filter condition skip the Claude call."""
+        monitor = Monitor(
+            name="News Test",
+            type=MonitorType.NEWS,
+            url="https://news.google.com/rss",
+            config={"filter_condition": "Product launch"},
+            last_state={"filter_condition": "Product launch", "rejected_ids": ["article1"]},
+        )
+
+        checker = NewsChecker()
+        with patch("notifyme.checkers.news.fetch_rss", return_value=mock_feed), \
+                patch("notifyme.checkers.news.fetch_url", side_effect=RuntimeError("offline")), \
+                patch.object(checker, "_article_matches_condition", return_value=False) as mock_match:
+            result = checker.check(monitor)
+
+        assert mock_match.call_count == 1
+        assert mock_match.call_args.args[0]["id"] == "article2"
+        state = checker.get_state_for_storage(result, monitor)
+        assert state["rejected_ids"] == ["article2", "article1"]
+
+        # Rejections recorded under a different condition are dropped
+        monitor.config["filter_condition"] = "Price drop"
+        state = checker.get_state_for_storage(result, monitor)
+        assert state["rejected_ids"] == ["article2"]
+
+    def test_rate_limiter_blocks_when_bucket_empty(self):
+        """The limiter allows a burst up to its rate, then waits for a refill."""
+        from notifyme.checkers.news import RateLimiter
+
+        limiter = RateLimiter(2, period=60.0)
+        with patch("notifyme.checkers.news.time.sleep", side_effect=RuntimeError("would wait")):
+            limiter.acquire()
+            limiter.acquire()
+            with pytest.raises(RuntimeError):
+                limiter.acquire()
+
 
 class TestWebpageChecker:
     """Test webpage change detection."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def mock_fetch_result(self):
-        """Mock fetch result."""
-        from notifyme.fetcher import FetchResult
+        """Mock fetch result (shared, so tests must not modify it)."""
         return FetchResult(
             url="https://example.com",
             html="<html><body>Test content</body></html>",
@@ -122,61 +267,151 @@ class TestWebpageChecker:
             content_hash="abc123",
         )
 
-    def test_first_check_establishes_baseline(self, mock_fetch_result):
-        """First check should not trigger notification."""
+    @pytest.fixture(autouse=True)
+    def same_text_parser(self, monkeypatch):
+        """Use the parser legacy baselines assume, whether or not lxml is installed."""
+        monkeypatch.setattr("notifyme.checkers.webpage.text_parser", lambda: "html.parser")
+
+    @pytest.mark.parametrize("last_state,condition_met,notify,explanation", [
+        pytest.param({}, False, False, "baseline", id="first-check-sets-baseline"),
+        pytest.param({"hash": "abc123"}, False, False, "no changes", id="unchanged"),
+        pytest.param({"hash": "different_hash"}, True, True, "changed", id="changed"),
+    ])
+    def test_change_detection(self, monkeypatch, mock_fetch_result, last_state, condition_met, notify, explanation):
+        """Only a content hash differing from a stored baseline counts as a change."""
         monitor = Monitor(
             name="Page Test",
             type=MonitorType.WEBPAGE,
             url="https://example.com",
+            last_state=last_state,
         )
 
         checker = WebpageChecker()
-        with patch("notifyme.checkers.webpage.fetch_url", return_value=mock_fetch_result):
-            result = checker.check(monitor)
+        monkeypatch.setattr("notifyme.checkers.webpage.fetch_url", lambda *a, **k: mock_fetch_result)
+        result = checker.check(monitor)
+
+        assert result.condition_met is condition_met
+        assert explanation in result.explanation.lower()
+        assert checker.should_notify(monitor, result) is notify
+
+    def test_parser_change_rebaselines_quietly(self, monkeypatch, mock_fetch_result):
+        """Text from a newly installed parser replaces the baseline without a change alert."""
+        monitor = Monitor(
+            name="Page Test",
+            type=MonitorType.WEBPAGE,
+            url="https://example.com",
+            last_state={"hash": "html_parser_hash", "hash_algorithm": "blake2b"},
+        )
+        monkeypatch.setattr("notifyme.checkers.webpage.text_parser", lambda: "lxml")
+        monkeypatch.setattr("notifyme.checkers.webpage.fetch_url", lambda *a, **k: mock_fetch_result)
+
+        checker = WebpageChecker()
+        result = checker.check(monitor)
 
-        # First check establishes baseline, no notification
         assert result.condition_met is False
-        assert "baseline" in result.explanation.lower()
         assert checker.should_notify(monitor, result) is False
+        state = checker.get_state_for_storage(result, monitor)
+        assert (state["hash"], state["text_parser"]) == ("abc123", "lxml")
+
+        monitor.last_state = state
+        result = checker.check(monitor)
+        assert "no changes" in result.explanation.lower()
+
+    def test_legacy_sha256_baseline_not_reported_as_change(self, monkeypatch, mock_fetch_result):
+        """A baseline stored as SHA-256 before the BLAKE2b switch still matches."""
+        import hashlib
+
+        monitor = Monitor(
+            name="Page Test",
+            type=MonitorType.WEBPAGE,
+            url="https://example.com",
+            last_state={"hash": hashlib.sha256(b"Test content").hexdigest()[:16]},
+        )
+        fetched = dataclasses.replace(mock_fetch_result, content_hash="0123456789abcdef")
+
+        checker = WebpageChecker()
+        monkeypatch.setattr("notifyme.checkers.webpage.fetch_url", lambda *a, **k: fetched)
+        result = checker.check(monitor)
+
+        assert result.condition_met is False
+        assert checker.get_state_for_storage(result, monitor)["hash_algorithm"] == "blake2b"
 
-    def test_no_change_detected(self, mock_fetch_result):
-        """No notification when content hasn't changed."""
+    def test_not_modified_page_skips_hashing(self):
+        """Stored validators are sent; a 304 keeps the previous hash and state."""
         monitor = Monitor(
             name="Page Test",
             type=MonitorType.WEBPAGE,
             url="https://example.com",
-            last_state={"hash": "abc123"},  # Same hash
+            last_state={"hash": "abc123", "etag": '"v1"'},
+        )
+        not_modified = FetchResult(
+            url="https://example.com", html="", text="", status_code=304,
+            content_hash="", not_modified=True, etag='"v1"',
         )
 
         checker = WebpageChecker()
-        with patch("notifyme.checkers.webpage.fetch_url", return_value=mock_fetch_result):
+        with patch("notifyme.checkers.webpage.fetch_url", return_value=not_modified) as mock_fetch:
             result = checker.check(monitor)
 
+        assert mock_fetch.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
         assert result.condition_met is False
         assert checker.should_notify(monitor, result) is False
+        state = checker.get_state_for_storage(result, monitor)
+        assert state["hash"] == "abc123"
+        assert state["etag"] == '"v1"'
+        assert state["hash_algorithm"] is None  # Legacy baseline stays legacy
 
-    def test_change_detected(self, mock_fetch_result):
-        """Notification when content changes."""
+    def test_identical_body_keeps_state(self):
+        """The stored body hash is passed to the fetch and kept when the body is unchanged."""
         monitor = Monitor(
             name="Page Test",
             type=MonitorType.WEBPAGE,
             url="https://example.com",
-            last_state={"hash": "different_hash"},
+            last_state={"hash": "abc123", "hash_algorithm": "blake2b", "body_hash": "feedface"},
+        )
+        unchanged = FetchResult(
+            url="https://example.com", html="", text="", status_code=200,
+            content_hash="", not_modified=True, body_hash="feedface",
         )
 
         checker = WebpageChecker()
-        with patch("notifyme.checkers.webpage.fetch_url", return_value=mock_fetch_result):
+        with patch("notifyme.checkers.webpage.fetch_url", return_value=unchanged) as mock_fetch:
             result = checker.check(monitor)
 
-        assert result.condition_met is True
-        assert checker.should_notify(monitor, result) is True
+        assert mock_fetch.call_args.kwargs["known_body_hash"] == "feedface"
+        assert result.condition_met is False
+        state = checker.get_state_for_storage(result, monitor)
+        assert state["hash"] == "abc123"
+        assert state["body_hash"] == "feedface"
 
 
 class TestAgenticChecker:
     """Test agentic (Claude-powered) checker."""
 
-    def test_evaluate_condition_met(self):
-        """Test when Claude determines condition is met."""
+    @pytest.mark.parametrize("reply,page_text,condition_met", [
+        pytest.param(REPLY_MET, "Page with buy button", True, id="met"),
+        pytest.param(REPLY_NOT_MET, "Coming soon", False, id="not-met"),
+    ])
+    def test_evaluate_condition(self, monkeypatch, reply, page_text, condition_met):
+        """Test the result follows Claude's verdict on the condition."""
+        monitor = Monitor(
+            name="MSI Monitor",
+            type=MonitorType.AGENTIC,
+            url="https://msi.com/monitor",
+            condition="Product is available for purchase",
+        )
+
+        checker = AgenticChecker(api_key="test-key")
+        monkeypatch.setattr("notifyme.checkers.agentic.fetch_url", lambda *a, **k: _fetched(page_text))
+        monkeypatch.setattr(checker.client.messages, "create", lambda *a, **k: _claude_reply(reply))
+        result = checker.check(monitor)
+
+        assert result.condition_met is condition_met
+        assert result.explanation == json.loads(reply)["explanation"]
+
+    @pytest.mark.asyncio
+    async def test_check_async_uses_async_client(self, monkeypatch):
+        """Async check awaits the async client and builds the same result."""
         monitor = Monitor(
             name="MSI Monitor",
             type=MonitorType.AGENTIC,
@@ -184,59 +419,391 @@ class TestAgenticChecker:
             condition="Product is available for purchase",
         )
 
-        mock_response = MagicMock()
-        mock_response.content = [MagicMock(text='{"condition_met": true, "explanation": "Buy button found", "relevant_details": "Price: $999"}')]
+        mock_response = _claude_reply(REPLY_MET)
 
         checker = AgenticChecker(api_key="test-key")
-        with patch("notifyme.checkers.agentic.fetch_url") as mock_fetch:
-            mock_fetch.return_value = MagicMock(text="Page with buy button", content_hash="abc123")
-            with patch.object(checker.client.messages, "create", return_value=mock_response):
-                result = checker.check(monitor)
+        monkeypatch.setattr("notifyme.checkers.agentic.fetch_url", lambda *a, **k: _fetched("Page with buy button"))
+        monkeypatch.setattr(checker.aclient.messages, "create", AsyncMock(return_value=mock_response))
+        result = await checker.check_async(monitor)
 
         assert result.condition_met is True
-        assert "Buy button" in result.explanation
+        assert result.details == {"info": "Price: $999"}
+        assert result.state_hash == "abc123"
+
+    def test_async_client_not_reused_across_event_loops(self):
+        """Each asyncio.run() gets its own async client; calls within one loop share it."""
+        checker = AgenticChecker(api_key="test-key")
+
+        async def clients():
+            return checker.aclient, checker.aclient
+
+        first, same_loop = asyncio.run(clients())
+        second, _ = asyncio.run(clients())
+
+        assert first is same_loop
+        assert second is not first
+
+    def test_unchanged_page_reuses_last_evaluation(self):
+        """Same content hash and condition skips the Claude call."""
+        from datetime import datetime
 
-    def test_evaluate_condition_not_met(self):
-        """Test when Claude determines condition is not met."""
         monitor = Monitor(
             name="MSI Monitor",
             type=MonitorType.AGENTIC,
             url="https://msi.com/monitor",
             condition="Product is available for purchase",
+            last_state={
+                "condition_met": True,
+                "explanation": "Buy button found",
+                "details": {"info": "Price: $999"},
+                "evaluated_condition": "Product is available for purchase",
+                "evaluated_at": datetime.now().isoformat(),
+            },
+            last_state_hash="abc123",
         )
 
-        mock_response = MagicMock()
-        mock_response.content = [MagicMock(text='{"condition_met": false, "explanation": "Coming soon page", "relevant_details": "No purchase option"}')]
+        checker = AgenticChecker(api_key="test-key")
+        with patch("notifyme.checkers.agentic.fetch_url", return_value=_fetched("Page with buy button")), \
+                patch.object(checker.client.messages, "create") as mock_create:
+            result = checker.check(monitor)
+
+        mock_create.assert_not_called()
+        assert result.cached is True
+        assert result.condition_met is True
+        assert result.explanation == "Buy button found"
+        assert checker.should_notify(monitor, result) is False
+        state = checker.get_state_for_storage(result, monitor)
+        assert state["evaluated_at"] == monitor.last_state["evaluated_at"]
+
+    def test_stale_evaluation_is_rechecked(self):
+        """An unchanged page is re-evaluated after recheck_after_hours."""
+        from datetime import datetime, timedelta
+
+        monitor = Monitor(
+            name="MSI Monitor",
+            type=MonitorType.AGENTIC,
+            url="https://msi.com/monitor",
+            condition="Product is available for purchase",
+            config={"recheck_after_hours": 1},
+            last_state={
+                "condition_met": False,
+                "explanation": "Coming soon page",
+                "evaluated_condition": "Product is available for purchase",
+                "evaluated_at": (datetime.now() - timedelta(hours=2)).isoformat(),
+            },
+            last_state_hash="abc123",
+        )
+
+        mock_response = _claude_reply('{"condition_met": false, "explanation": "Still coming soon"}')
 
         checker = AgenticChecker(api_key="test-key")
-        with patch("notifyme.checkers.agentic.fetch_url") as mock_fetch:
-            mock_fetch.return_value = MagicMock(text="Coming soon", content_hash="abc123")
-            with patch.object(checker.client.messages, "create", return_value=mock_response):
-                result = checker.check(monitor)
+        with patch("notifyme.checkers.agentic.fetch_url", return_value=_fetched("Coming soon")), \
+                patch.object(checker.client.messages, "create", return_value=mock_response) as mock_create:
+            result = checker.check(monitor)
 
-        assert result.condition_met is False
+        mock_create.assert_called_once()
+        assert result.cached is False
+        assert result.explanation == "Still coming soon"
 
-    def test_should_notify_on_state_change(self):
-        """Should only notify when condition transitions to true."""
-        from notifyme.models import CheckResult
+    @pytest.mark.parametrize(
+        "reply",
+        [
+            '{"condition_met": true, "explanation": "Buy button found"}',
+            '```json\n{"condition_met": true, "explanation": "Buy button found"}\n```',
+            'Here is my answer:\n{"condition_met": true, "explanation": "Buy button found"}',
+        ],
+    )
+    def test_parses_fenced_and_unfenced_json(self, reply):
+        """JSON is extracted whether or not Claude wraps it in a code block or prose."""
+        from notifyme.checkers.base import parse_json_response
+
+        assert parse_json_response(reply) == {"condition_met": True, "explanation": "Buy button found"}
 
+    def test_static_instructions_sent_as_system_prompt(self):
+        """Instructions go in the system prompt; only dynamic parts in the user turn."""
+        from notifyme.checkers.agentic import EVALUATION_INSTRUCTIONS
+
+        monitor = Monitor(
+            name="MSI Monitor",
+            type=MonitorType.AGENTIC,
+            url="https://msi.com/monitor",
+            condition="Product is available for purchase",
+        )
+
+        mock_response = _claude_reply('{"condition_met": false, "explanation": "Coming soon"}')
+
+        checker = AgenticChecker(api_key="test-key")
+        with patch("notifyme.checkers.agentic.fetch_url", return_value=_fetched("Coming soon")), \
+                patch.object(checker.client.messages, "create", return_value=mock_response) as mock_create:
+            checker.check(monitor)
+
+        kwargs = mock_create.call_args.kwargs
+        assert kwargs["system"] == EVALUATION_INSTRUCTIONS
+        user_content = kwargs["messages"][0]["content"]
+        assert "CONDITION: Product is available for purchase" in user_content
+        assert "Coming soon" in user_content
+        assert EVALUATION_INSTRUCTIONS not in user_content
+
+    @pytest.mark.parametrize("previously_met,condition_met,notify", [
+        pytest.param(False, True, True, id="became-true"),
+        pytest.param(True, True, False, id="still-true"),
+        pytest.param(False, False, False, id="still-false"),
+    ])
+    def test_should_notify_on_state_change(self, previously_met, condition_met, notify):
+        """Should only notify when condition transitions to true."""
         checker = AgenticChecker(api_key="test-key")
+        monitor = Monitor(
+            name="Test",
+            type=MonitorType.AGENTIC,
+            url="https://a.com",
+            last_state={"condition_met": previously_met},
+        )
+        result = CheckResult(condition_met=condition_met, explanation="Availability checked")
+
+        assert checker.should_notify(monitor, result) is notify
 
-        # First time condition met (previous was false/unknown)
+    def test_notify_on_each_dedupes_by_explanation(self):
+        """Without an event_id, notify_on_each only fires when the explanation changes."""
+        import hashlib
+
+        checker = AgenticChecker(api_key="test-key")
         monitor = Monitor(
             name="Test",
             type=MonitorType.AGENTIC,
             url="https://a.com",
-            last_state={"condition_met": False},
+            config={"notify_on_each": True},
         )
-        result = CheckResult(condition_met=True, explanation="Now available")
+        result = CheckResult(condition_met=True, explanation="Oregon won 78-65")
         assert checker.should_notify(monitor, result) is True
 
-        # Already met, should not notify again
-        monitor.last_state = {"condition_met": True}
+        monitor.last_state = checker.get_state_for_storage(result, monitor)
         assert checker.should_notify(monitor, result) is False
 
-        # Condition not met, should not notify
-        result = CheckResult(condition_met=False, explanation="Still not available")
-        monitor.last_state = {"condition_met": False}
+        new_result = CheckResult(condition_met=True, explanation="Oregon won 81-70")
+        assert checker.should_notify(monitor, new_result) is True
+
+        # A recently seen explanation doesn't re-notify even if it wasn't the last one
+        monitor.last_state = checker.get_state_for_storage(new_result, monitor)
+        assert checker.should_notify(monitor, new_result) is False
         assert checker.should_notify(monitor, result) is False
+
+        # Legacy SHA-256 state is still honored
+        monitor.last_state = {
+            "condition_met": True,
+            "last_explanation_hash": hashlib.sha256(b"Oregon won 78-65").hexdigest()[:16],
+        }
+        assert checker.should_notify(monitor, result) is False
+
+
+class TestCreditsChecker:
+    """Test Anthropic credits checker magic link retrieval."""
+
+    @pytest.fixture
+    def magic_link_email(self):
+        """Raw bytes of a fresh magic link email."""
+        from email.message import EmailMessage
+        from email.utils import format_datetime
+        from datetime import datetime, timezone
+
+        msg = EmailMessage()
+        msg["From"] = "Anthropic <no-reply@anthropic.com>"
+        msg["Subject"] = "Secure link to log in to Claude"
+        msg["Date"] = format_datetime(datetime.now(timezone.utc))
+        msg.set_content("Log in: https://platform.claude.com/magic-link#abc")
+        msg.add_alternative('<a href="https://platform.claude.com/magic-link#abc">Log in</a>', subtype="html")
+        return msg.as_bytes()
+
+    def test_get_magic_link_reuses_connection(self, magic_link_email):
+        """Polling reuses one IMAP login instead of reconnecting each time."""
+        from notifyme.checkers.credits import CreditsChecker, ImapSession
+
+        mail = MagicMock()
+        mail.search.side_effect = [("OK", [b""]), ("OK", [b"1"])]
+        headers = magic_link_email.split(b"\n\n", 1)[0]
+        mail.fetch.side_effect = [
+            ("OK", [(b"1 (BODY[HEADER.FIELDS (SUBJECT DATE)] {100}", headers), b")"]),
+            ("OK", [(b"1 (BODY[] {100}", magic_link_email), b")"]),
+        ]
+
+        checker = CreditsChecker()
+        with patch("notifyme.checkers.credits.imaplib.IMAP4_SSL", return_value=mail) as mock_ssl, \
+                patch("notifyme.checkers.credits.time.sleep"):
+            with ImapSession("imap.example.com", "user", "pass") as imap:
+                link, email_id = checker._get_magic_link(imap, max_wait_seconds=10)
+
+        assert link == "https://platform.claude.com/magic-link#abc"
+        assert email_id == b"1"
+        criteria = mail.search.call_args.args[1]
+        assert "UNSEEN" in criteria and 'SUBJECT "log in"' in criteria
+        mock_ssl.assert_called_once()
+        mail.login.assert_called_once()
+        mail.logout.assert_called_once()
+
+    def test_idle_returns_when_server_reports_new_mail(self):
+        """IDLE blocks until an untagged EXISTS arrives, then sends DONE."""
+        from notifyme.checkers.credits import ImapSession
+
+        mail = MagicMock()
+        mail._new_tag.return_value = b"A001"
+        mail._get_response.return_value = None  # "+ idling" continuation
+        mail.untagged_responses = {}
+        mail.readline.side_effect = [b"* OK Still here\r\n", b"* 7 EXISTS\r\n"]
+
+        imap = ImapSession("imap.example.com", "user", "pass")
+        imap.mail = mail
+
+        with patch("notifyme.checkers.credits._wait_readable", return_value=True):
+            assert imap.idle(timeout=5) is True
+        mail.send.assert_any_call(b"A001 IDLE\r\n")
+        mail.send.assert_called_with(b"DONE\r\n")
+        mail._command_complete.assert_called_once_with("IDLE", b"A001")
+        mail.sock.settimeout.assert_not_called()
+
+    def test_idle_timeout_keeps_connection_usable(self):
+        """After an IDLE with no new mail, the same connection still runs commands."""
+        from notifyme.checkers.credits import ImapSession
+
+        client_sock, server_sock = socket.socketpair()
+        server = threading.Thread(target=_fake_imap_server, args=(server_sock,), daemon=True)
+        server.start()
+        mail = _SocketIMAP(client_sock)
+        try:
+            imap = ImapSession("imap.example.com", "user", "pass")
+            imap.mail = mail
+
+            assert imap.idle(timeout=0.1) is False
+            assert mail.noop()[0] == "OK"
+            assert imap.mail is mail
+        finally:
+            mail.shutdown()
+            server.join(timeout=5)
+
+    @pytest.mark.parametrize(
+        "idle_reply",
+        [
+            pytest.param(b"+ idling\r\n* 3 EXISTS\r\n", id="exists-buffered-with-continuation"),
+            pytest.param(b"* 3 EXISTS\r\n+ idling\r\n", id="exists-before-continuation"),
+        ],
+    )
+    def test_idle_sees_exists_read_with_continuation(self, idle_reply):
+        """An EXISTS imaplib already read while waiting for "+ idling" ends IDLE at once."""
+        from notifyme.checkers.credits import ImapSession
+
+        client_sock, server_sock = socket.socketpair()
+        server = threading.Thread(target=_fake_imap_server, args=(server_sock, idle_reply), daemon=True)
+        server.start()
+        mail = _SocketIMAP(client_sock)
+        try:
+            imap = ImapSession("imap.example.com", "user", "pass")
+            imap.mail = mail
+
+            started = time.monotonic()
+            assert imap.idle(timeout=5) is True
+            assert time.monotonic() - started < 1
+            assert mail.noop()[0] == "OK"
+        finally:
+            mail.shutdown()
+            server.join(timeout=5)
+
+    def test_get_magic_link_batches_header_fetch(self, magic_link_email):
+        """Headers for all candidates come from one FETCH; only login emails get a body fetch."""
+        from notifyme.checkers.credits import CreditsChecker, ImapSession
+
+        login_headers = magic_link_email.split(b"\n\n", 1)[0]
+        other_headers = b"Subject: Your receipt from Anthropic\nDate: Mon, 1 Jan 2024 00:00:00 +0000"
+
+        mail = MagicMock()
+        mail.search.return_value = ("OK", [b"1 2 3"])
+        mail.fetch.side_effect = [
+            ("OK", [
+                (b"1 (BODY[HEADER.FIELDS (SUBJECT DATE)] {10}", other_headers), b")",
+                (b"2 (BODY[HEADER.FIELDS (SUBJECT DATE)] {10}", login_headers), b")",
+                (b"3 (BODY[HEADER.FIELDS (SUBJECT DATE)] {10}", other_headers), b")",
+            ]),
+            ("OK", [(b"2 (BODY[] {100}", magic_link_email), b")"]),
+        ]
+
+        imap = ImapSession("imap.example.com", "user", "pass")
+        imap.mail = mail
+        link, email_id = CreditsChecker()._get_magic_link(imap, max_wait_seconds=10)
+
+        assert link == "https://platform.claude.com/magic-link#abc"
+        assert email_id == b"2"
+        assert [c.args[0] for c in mail.fetch.call_args_list] == [b"1,2,3", b"2"]
+
+    @pytest.mark.parametrize("page_text,expected", [
+        ("Credits: 3\nCredit Balance $1,234.50", 1234.50),
+        ("You have $42.10 remaining", 42.10),
+        ("Promo $3 Credit Balance: $12.34", 12.34),  # Overlapping lower-priority match
+        ("No billing info here", None),
+    ])
+    def test_extract_balance(self, page_text, expected):
+        """The most specific balance pattern wins regardless of position."""
+        from notifyme.checkers.credits import CreditsChecker
+
+        page = MagicMock()
+        page.inner_text.return_value = page_text
+
+        assert CreditsChecker()._extract_balance(page) == expected
+
+    def test_find_magic_link_decodes_part_charset(self):
+        """The HTML part is decoded with its declared charset."""
+        from email.message import EmailMessage
+        from notifyme.checkers.credits import CreditsChecker
+
+        msg = EmailMessage()
+        msg.set_content("Connexion sécurisée", charset="latin-1")
+        msg.add_alternative(
+            '<p>Connexion sécurisée</p><a href="https://platform.claude.com/magic-link#xyz">Log in</a>',
+            subtype="html",
+            charset="latin-1",
+        )
+
+        assert CreditsChecker()._find_magic_link(msg) == "https://platform.claude.com/magic-link#xyz"
+
+    @pytest.mark.parametrize("landing_url", [
+        pytest.param("https://console.anthropic.com/dashboard", id="console"),
+        pytest.param("https://platform.claude.com/dashboard", id="platform"),
+        pytest.param("https://example.com/elsewhere", id="no-redirect"),
+    ])
+    def test_follow_magic_link_tolerates_redirect_host(self, landing_url):
+        """Either console host ends the wait; a missing redirect is left to the billing check."""
+        from notifyme.checkers.credits import CreditsChecker
+
+        def wait_for_url(url_pattern, timeout):
+            if not url_pattern.match(landing_url):
+                raise TimeoutError(f"Timeout {timeout}ms exceeded")
+
+        page = MagicMock()
+        page.wait_for_url.side_effect = wait_for_url
+
+        with patch("notifyme.checkers.credits.logger") as mock_logger:
+            CreditsChecker()._follow_magic_link(page, "https://platform.claude.com/magic-link#abc")
+
+        page.goto.assert_called_once_with("https://platform.claude.com/magic-link#abc", wait_until="domcontentloaded")
+        assert mock_logger.warning.called is (landing_url == "https://example.com/elsewhere")
+
+    def test_valid_saved_session_skips_login(self, tmp_path):
+        """A still-valid browser session reads the balance without touching IMAP."""
+        from notifyme.checkers.credits import CreditsChecker
+
+        page = MagicMock()
+        page.url = "https://console.anthropic.com/settings/billing"
+        page.inner_text.return_value = "Credit Balance $25.00"
+        context = MagicMock(pages=[page])
+        playwright = MagicMock()
+        playwright.chromium.launch_persistent_context.return_value = context
+        sync_api = MagicMock()
+        sync_api.sync_playwright.return_value.__enter__.return_value = playwright
+
+        with patch.dict("sys.modules", {"playwright.sync_api": sync_api}), \
+                patch("notifyme.checkers.credits.BROWSER_PROFILE_DIR", tmp_path), \
+                patch("notifyme.checkers.credits.imaplib.IMAP4_SSL") as mock_ssl:
+            balance = CreditsChecker()._login_and_get_balance(
+                "me@example.com", "imap.example.com", "user", "pass"
+            )
+
+        assert balance == 25.0
+        mock_ssl.assert_not_called()
+        context.clear_cookies.assert_not_called()
+        context.close.assert_called_once()
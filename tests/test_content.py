@@ -0,0 +1,99 @@
+"""Tests for LLM content preparation helpers."""
+
+import pytest
+
+from notifyme.content import clean_for_llm, compress_content, estimate_tokens, truncate_to_tokens
+
+
+class TestCompressContent:
+    """Test query-aware content compression."""
+
+    def test_short_content_unchanged(self):
+        """Content within budget is returned as-is."""
+        content = "Line one\nLine two"
+        assert compress_content(content, "anything", max_tokens=1000) == content
+
+    def test_keeps_relevant_lines_in_order(self):
+        """Lines matching the query are kept, in original order, within budget."""
+        filler = [f"Navigation link number {i}" for i in range(50)]
+        content = "\n".join(
+            filler[:20]
+            + ["Oregon won the game 78-65"]
+            + filler[20:40]
+            + ["Final score announced for Oregon"]
+            + filler[40:]
+        )
+
+        compressed = compress_content(content, "Oregon won their most recent game", max_tokens=30)
+
+        assert estimate_tokens(compressed.split("\n\n[")[0]) <= 30
+        assert "Oregon won the game 78-65" in compressed
+        assert "Final score announced for Oregon" in compressed
+        assert compressed.index("78-65") < compressed.index("Final score")
+
+    def test_prefix_expansion_matches_word_forms(self):
+        """Query terms match longer or shorter forms of the same word."""
+        content = "\n".join(["Unrelated filler text here"] * 30 + ["Apple announced a new MacBook"])
+
+        compressed = compress_content(content, "Apple announces MacBook", max_tokens=15)
+
+        assert "Apple announced a new MacBook" in compressed
+
+    def test_single_oversized_line_is_truncated(self):
+        """Text with no line breaks over the budget is cut to fit rather than dropped."""
+        content = "Oregon won the game 78-65 " * 100
+
+        compressed = compress_content(content, "Oregon won", max_tokens=20)
+
+        body = compressed.split("\n\n[")[0]
+        assert body and content.startswith(body)
+        assert estimate_tokens(body) <= 20
+
+
+class TestTokenBudget:
+    """Test token estimation and truncation."""
+
+    def test_estimate_counts_non_ascii_densely(self):
+        """ASCII averages 4 chars/token; non-ASCII chars count as a token each."""
+        assert estimate_tokens("a" * 400) == 100
+        assert estimate_tokens("\u4f60\u597d" * 50) == 100
+
+    def test_truncate_to_tokens(self):
+        """Truncation keeps the longest prefix within budget."""
+        text = "word " * 100
+        assert truncate_to_tokens(text, 1000) == text
+        truncated = truncate_to_tokens(text, 10)
+        assert len(truncated) == 40
+        assert text.startswith(truncated)
+
+
+class TestCleanForLlm:
+    """Test rule-based boilerplate stripping."""
+
+    def test_drops_boilerplate_and_repeats(self):
+        """Cookie banners, legal lines and consecutive duplicates are removed."""
+        text = "\n".join([
+            "We use cookies to improve your experience. Accept all",
+            "Oregon   won   the game",
+            "Oregon   won   the game",
+            "",
+            "Final score: 78-65",
+            "\u00a9 2025 ESPN. All rights reserved.",
+            "Subscribe to our newsletter",
+        ])
+
+        assert clean_for_llm(text) == "Oregon won the game\nFinal score: 78-65"
+
+    @pytest.mark.parametrize("line,condition", [
+        pytest.param("New terms for members", "New member terms are announced", id="condition-term"),
+        pytest.param("Subscribe & Save: $19.99", "Price drops below $20", id="price"),
+    ])
+    def test_keeps_boilerplate_looking_content(self, line, condition):
+        """Short lines with a boilerplate keyword survive if they look like monitored content."""
+        text = f"Accept all cookies\n{line}\nSubscribe to our newsletter"
+        assert clean_for_llm(text, condition) == line
+
+    def test_keeps_long_lines_mentioning_keywords(self):
+        """Long content lines survive even if they mention a boilerplate keyword."""
+        line = "The new subscription tier " + "includes many features " * 10
+        assert clean_for_llm(line) == line.strip()
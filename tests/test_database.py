@@ -1,5 +1,6 @@
 """Tests for database operations."""
 
+import sqlite3
 import tempfile
 from pathlib import Path
 
@@ -8,13 +9,22 @@ import pytest
 from notifyme.database import Database
 from notifyme.models import Monitor, MonitorType, NotificationLog
 
+# Slower than the model-level tests; skip with -m 'not integration'
+pytestmark = pytest.mark.integration
+
 
 @pytest.fixture
 def db():
     """Create a temporary database for testing."""
     with tempfile.TemporaryDirectory() as tmpdir:
         db_path = Path(tmpdir) / "test.db"
-        yield Database(db_path)
+        database = Database(db_path)
+        # Throwaway file: skip fsyncs and keep the lock rather than re-taking it per transaction
+        with database._get_connection() as conn:
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+        yield database
+        database.close()
 
 
 class TestMonitorCRUD:
@@ -65,8 +75,10 @@ class TestMonitorCRUD:
 
     def test_list_monitors(self, db):
         """Test listing all monitors."""
-        db.add_monitor(Monitor(name="Monitor 1", type=MonitorType.NEWS, url="https://a.com"))
-        db.add_monitor(Monitor(name="Monitor 2", type=MonitorType.WEBPAGE, url="https://b.com"))
+        db.add_monitors([
+            Monitor(name="Monitor 1", type=MonitorType.NEWS, url="https://a.com"),
+            Monitor(name="Monitor 2", type=MonitorType.WEBPAGE, url="https://b.com"),
+        ])
 
         result = db.list_monitors()
 
@@ -74,16 +86,38 @@ class TestMonitorCRUD:
 
     def test_list_active_only(self, db):
         """Test listing only active monitors."""
-        m1 = Monitor(name="Active", type=MonitorType.NEWS, url="https://a.com")
-        m2 = Monitor(name="Inactive", type=MonitorType.NEWS, url="https://b.com", is_active=False)
-        db.add_monitor(m1)
-        db.add_monitor(m2)
+        db.add_monitors([
+            Monitor(name="Active", type=MonitorType.NEWS, url="https://a.com"),
+            Monitor(name="Inactive", type=MonitorType.NEWS, url="https://b.com", is_active=False),
+        ])
 
         result = db.list_monitors(active_only=True)
 
         assert len(result) == 1
         assert result[0].name == "Active"
 
+    def test_list_monitors_summary(self, db):
+        """Test listing display columns without full monitor rows."""
+        monitor = Monitor(
+            name="Paused",
+            type=MonitorType.PRICE,
+            url="https://a.com",
+            config={"selector": ".price", "threshold": 10},
+            last_state={"condition_met": True},
+            is_active=False,
+        )
+        db.add_monitor(monitor)
+        db.add_monitor(Monitor(name="Active", type=MonitorType.NEWS, url="https://b.com"))
+
+        result = db.list_monitors_summary()
+
+        assert [m.name for m in result] == ["Paused", "Active"]
+        assert result[0].id == monitor.id
+        assert result[0].type == MonitorType.PRICE
+        assert result[0].last_state == {"condition_met": True}
+        assert result[0].is_active is False
+        assert [m.name for m in db.list_monitors_summary(active_only=True)] == ["Active"]
+
     def test_update_monitor(self, db):
         """Test updating a monitor."""
         monitor = Monitor(name="Original", type=MonitorType.NEWS, url="https://a.com")
@@ -121,6 +155,21 @@ class TestMonitorCRUD:
         assert resumed.is_active is True
 
 
+class TestConnection:
+    """Test connection setup."""
+
+    def test_uses_wal_journal(self, tmp_path):
+        """The database runs in WAL mode with relaxed syncing."""
+        # Not the db fixture: it overrides syncing for speed
+        db = Database(tmp_path / "test.db")
+        try:
+            with db._get_connection() as conn:
+                assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+                assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        finally:
+            db.close()
+
+
 class TestNotifications:
     """Test notification logging."""
 
@@ -145,37 +194,184 @@ class TestNotifications:
         monitor = Monitor(name="Test", type=MonitorType.NEWS, url="https://a.com")
         db.add_monitor(monitor)
 
-        db.add_notification(NotificationLog(monitor_id=monitor.id, message="First"))
-        db.add_notification(NotificationLog(monitor_id=monitor.id, message="Second"))
+        db.add_notifications([
+            NotificationLog(monitor_id=monitor.id, message="First"),
+            NotificationLog(monitor_id=monitor.id, message="Second"),
+        ])
 
         result = db.get_last_notification(monitor.id)
         assert result.message == "Second"
 
+    def test_get_notifications_with_monitor(self, db):
+        """Test notifications come back with their monitor's name."""
+        monitor = Monitor(name="Named", type=MonitorType.NEWS, url="https://a.com")
+        db.add_monitor(monitor)
+        db.add_notification(NotificationLog(monitor_id=monitor.id, message="Kept"))
+        db.add_notification(NotificationLog(monitor_id="deleted-monitor", message="Orphan"))
+
+        result = db.get_notifications_with_monitor()
+
+        assert [(n.message, name) for n, name in result] == [("Orphan", None), ("Kept", "Named")]
+        assert [n.message for n, _ in db.get_notifications_with_monitor(monitor.id)] == ["Kept"]
+
+    def test_batch_commits_writes_on_exit(self, db):
+        """Test that writes inside batch() are held and committed together."""
+        monitor = Monitor(name="Batched", type=MonitorType.NEWS, url="https://a.com")
+        db.add_monitor(monitor)
+
+        with db.batch():
+            monitor.last_state = {"seen_ids": ["abc"]}
+            db.update_monitor(monitor)
+            db.add_notification(NotificationLog(monitor_id=monitor.id, message="Held"))
+            assert db.get_monitor(monitor.id).last_state == {}
+            assert db.get_notifications() == []
+
+        assert db.get_monitor(monitor.id).last_state == {"seen_ids": ["abc"]}
+        assert [n.message for n in db.get_notifications()] == ["Held"]
+
+    def test_batch_commits_writes_after_error(self, db):
+        """Test that writes made before an error in batch() are still saved."""
+        monitor = Monitor(name="Batched", type=MonitorType.NEWS, url="https://a.com")
+        db.add_monitor(monitor)
+
+        with pytest.raises(RuntimeError):
+            with db.batch():
+                db.add_notification(NotificationLog(monitor_id=monitor.id, message="Sent"))
+                raise RuntimeError("check failed")
+
+        assert [n.message for n in db.get_notifications()] == ["Sent"]
+
+    def test_flush_commits_while_batch_open(self, db):
+        """Test that flush() saves queued writes without ending the batch."""
+        monitor = Monitor(name="Batched", type=MonitorType.NEWS, url="https://a.com")
+        db.add_monitor(monitor)
+
+        with db.batch():
+            db.add_notification(NotificationLog(monitor_id=monitor.id, message="First"))
+            db.flush()
+            assert [n.message for n in db.get_notifications()] == ["First"]
+            db.add_notification(NotificationLog(monitor_id=monitor.id, message="Second"))
+            assert len(db.get_notifications()) == 1
+
+        assert len(db.get_notifications()) == 2
+
+    def test_failed_queued_write_keeps_the_rest(self, db):
+        """Test that one queued write failing doesn't discard the others, and is still reported."""
+        monitor = Monitor(name="Batched", type=MonitorType.NEWS, url="https://a.com")
+        db.add_monitor(monitor)
+        duplicate = NotificationLog(monitor_id=monitor.id, message="Duplicate")
+        db.add_notification(duplicate)
+
+        with pytest.raises(sqlite3.IntegrityError), db.batch():
+            db.add_notification(duplicate)  # Primary key conflict
+            monitor.last_state = {"seen_ids": ["abc"]}
+            db.update_monitor(monitor)
+
+        assert db.get_monitor(monitor.id).last_state == {"seen_ids": ["abc"]}
+        assert len(db.get_notifications()) == 1
+
+    def test_add_notifications_batch(self, db):
+        """Test logging several notifications (and monitors) in one call."""
+        monitors = [
+            Monitor(name=f"Test {i}", type=MonitorType.NEWS, url="https://a.com")
+            for i in range(3)
+        ]
+        db.add_monitors(monitors)
+
+        db.add_notifications([
+            NotificationLog(monitor_id=m.id, message=f"Alert {m.name}") for m in monitors
+        ])
+
+        assert len(db.list_monitors()) == 3
+        assert {n.message for n in db.get_notifications()} == {
+            "Alert Test 0", "Alert Test 1", "Alert Test 2"
+        }
+
 
 class TestDueForCheck:
     """Test monitors due for checking."""
 
-    def test_new_monitor_is_due(self, db):
-        """Test that a new monitor (never checked) is due."""
-        monitor = Monitor(name="New", type=MonitorType.NEWS, url="https://a.com")
+    @pytest.mark.parametrize("checked_minutes_ago,is_due", [
+        pytest.param(None, True, id="never-checked"),
+        pytest.param(0, False, id="recently-checked"),
+    ])
+    def test_due_until_interval_passes(self, db, checked_minutes_ago, is_due):
+        """Test that a new monitor is due and a recently checked one is not."""
+        from datetime import datetime, timedelta
+
+        monitor = Monitor(name="Monitor", type=MonitorType.NEWS, url="https://a.com", check_interval_minutes=60)
+        if checked_minutes_ago is not None:
+            monitor.last_checked = datetime.now() - timedelta(minutes=checked_minutes_ago)
         db.add_monitor(monitor)
 
         due = db.get_monitors_due_for_check()
-        assert len(due) == 1
-        assert due[0].id == monitor.id
+        assert [m.id for m in due] == ([monitor.id] if is_due else [])
 
-    def test_recently_checked_not_due(self, db):
-        """Test that a recently checked monitor is not due."""
-        from datetime import datetime
+    def test_overdue_monitor_is_due(self, db):
+        """Test that a monitor past its interval is due again after an update."""
+        from datetime import datetime, timedelta
 
-        monitor = Monitor(
-            name="Recent",
-            type=MonitorType.NEWS,
-            url="https://a.com",
-            check_interval_minutes=60,
-        )
-        monitor.last_checked = datetime.now()
+        monitor = Monitor(name="Old", type=MonitorType.NEWS, url="https://a.com", check_interval_minutes=30)
         db.add_monitor(monitor)
+        monitor.last_checked = datetime.now() - timedelta(minutes=45)
+        db.update_monitor(monitor)
 
-        due = db.get_monitors_due_for_check()
-        assert len(due) == 0
+        assert [m.id for m in db.get_monitors_due_for_check()] == [monitor.id]
+
+    def test_due_relative_to_given_time(self, db):
+        """Test that the due query and updates use a caller-supplied time."""
+        from datetime import datetime, timedelta
+
+        run_started = datetime.now()
+        monitor = Monitor(name="Hourly", type=MonitorType.NEWS, url="https://a.com", check_interval_minutes=60)
+        monitor.last_checked = run_started
+        db.add_monitor(monitor)
+        db.update_monitor(monitor, now=run_started)
+
+        assert db.get_monitor(monitor.id).updated_at == run_started
+        assert db.get_monitors_due_for_check(run_started) == []
+        later = run_started + timedelta(minutes=61)
+        assert [m.id for m in db.get_monitors_due_for_check(later)] == [monitor.id]
+
+    def test_touch_last_checked_reschedules(self, db):
+        """Test that touching a monitor moves its next check without rewriting the row."""
+        from datetime import datetime, timedelta
+
+        monitor = Monitor(name="Quiet", type=MonitorType.NEWS, url="https://a.com", check_interval_minutes=30)
+        monitor.last_state = {"seen_ids": ["abc"]}
+        db.add_monitor(monitor)
+        checked = datetime.now()
+        monitor.last_checked = checked
+        monitor.name = "Not saved"
+        db.touch_last_checked(monitor)
+
+        stored = db.get_monitor(monitor.id)
+        assert stored.last_checked == checked
+        assert stored.name == "Quiet"
+        assert stored.last_state == {"seen_ids": ["abc"]}
+        assert db.get_monitors_due_for_check(checked + timedelta(minutes=29)) == []
+        assert [m.id for m in db.get_monitors_due_for_check(checked + timedelta(minutes=31))] == [monitor.id]
+
+    def test_migrates_database_without_next_check_at(self, tmp_path):
+        """Test that older databases get next_check_at backfilled."""
+        import sqlite3
+        from datetime import datetime, timedelta
+
+        db_path = tmp_path / "old.db"
+        Database(db_path).close()
+        checked = datetime.now() - timedelta(hours=2)
+        monitor = Monitor(name="Legacy", type=MonitorType.NEWS, url="https://a.com", last_checked=checked)
+        row = monitor.to_dict()
+        del row["next_check_at"]
+        conn = sqlite3.connect(db_path)
+        conn.execute("DROP INDEX idx_monitors_next_check")
+        conn.execute("ALTER TABLE monitors DROP COLUMN next_check_at")
+        conn.execute(
+            f"INSERT INTO monitors ({', '.join(row)}) VALUES ({', '.join(':' + k for k in row)})", row
+        )
+        conn.commit()
+        conn.close()
+
+        db = Database(db_path)
+        assert [m.id for m in db.get_monitors_due_for_check()] == [monitor.id]
+        db.close()
@@ -0,0 +1,438 @@
+"""Tests for URL fetching."""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from notifyme.fetcher import fetch_url
+
+
+class TestFetchWithRequests:
+    """Test plain HTTP fetching."""
+
+    def test_max_bytes_stops_reading_early(self):
+        """A capped fetch streams the body and stops after max_bytes."""
+        response = MagicMock(status_code=200, encoding="utf-8")
+        response.iter_content.return_value = iter([b"<p>" + b"a" * 100, b"b" * 100, b"c" * 100])
+        session = MagicMock()
+        session.get.return_value = response
+
+        with patch("notifyme.fetcher.get_session", return_value=session):
+            result = fetch_url("https://example.com/article", max_bytes=150)
+
+        assert len(result.html) == 150
+        assert "c" not in result.html
+        assert session.get.call_args.kwargs["stream"] is True
+        response.close.assert_called_once()
+
+
+    def test_body_hash_covers_raw_bytes(self):
+        """A full fetch fingerprints the undecoded body alongside the text."""
+        from notifyme.fetcher import content_digest
+
+        body = "<p>caf\u00e9</p>".encode("latin-1")
+        response = MagicMock(status_code=200, content=body, text=body.decode("latin-1"), headers={})
+        session = MagicMock()
+        session.get.return_value = response
+
+        with patch("notifyme.fetcher.get_session", return_value=session):
+            result = fetch_url("https://example.com/page")
+
+        assert result.body_hash == content_digest(body)
+        assert result.content_hash == content_digest("caf\u00e9")
+
+    def test_known_body_hash_skips_parsing(self):
+        """An unchanged body comes back as not_modified without being parsed."""
+        from notifyme.fetcher import content_digest
+
+        body = b"<p>unchanged</p>"
+        response = MagicMock(status_code=200, content=body, headers={})
+        session = MagicMock()
+        session.get.return_value = response
+
+        with patch("notifyme.fetcher.get_session", return_value=session), \
+                patch("notifyme.fetcher._extract_text") as mock_extract:
+            result = fetch_url("https://example.com/page", known_body_hash=content_digest(body))
+
+        assert result.not_modified is True
+        assert result.body_hash == content_digest(body)
+        mock_extract.assert_not_called()
+
+    def test_real_connections_blocked(self):
+        """The suite-wide guard stops requests that no test patched."""
+        from notifyme.fetcher import _fetch_with_requests
+
+        with pytest.raises(RuntimeError, match="Network access in tests is blocked"):
+            _fetch_with_requests("https://example.com", 5, None, None, None)
+
+    def test_session_carries_default_headers(self):
+        """The shared session sends browser headers without per-call merging."""
+        from notifyme.fetcher import DEFAULT_HEADERS, get_session
+
+        with patch("notifyme.fetcher._session", None):
+            session = get_session()
+
+        assert session.headers["User-Agent"] == DEFAULT_HEADERS["User-Agent"]
+        retries = session.get_adapter("https://example.com").max_retries
+        assert retries.total == 2
+        assert retries.respect_retry_after_header is False  # A long Retry-After can't stall a check
+
+
+class TestFetchWithPlaywright:
+    """Test Playwright fetching."""
+
+    @pytest.fixture(autouse=True)
+    def stop_browser_threads(self):
+        """Don't leave browser threads (and their mock browsers) running between tests."""
+        from notifyme.fetcher import _stop_browser_threads
+
+        yield
+        _stop_browser_threads()
+
+    def test_browser_reused_across_fetches(self):
+        """The browser launches once per browser thread and is closed when the threads stop."""
+        import threading
+
+        from notifyme.fetcher import _stop_browser_threads
+
+        page = MagicMock()
+        page.content.return_value = "<p>Rendered</p>"
+        page.goto.return_value.status = 200
+        sync_api = MagicMock()
+        playwright = sync_api.sync_playwright.return_value.start.return_value
+        playwright.chromium.launch.return_value.new_context.return_value.new_page.return_value = page
+
+        context = playwright.chromium.launch.return_value.new_context.return_value
+
+        with patch.dict("sys.modules", {"playwright.sync_api": sync_api}), \
+                patch("notifyme.fetcher._playwright_local", threading.local()), \
+                patch("notifyme.fetcher.BROWSER_THREADS", 1):
+            # Each fetch comes from a short-lived thread, like a per-call worker pool
+            for url in ("https://example.com/a", "https://example.com/b"):
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    result = pool.submit(fetch_url, url, use_playwright=True).result()
+            _stop_browser_threads()
+
+        assert result.text == "Rendered"
+        assert result.used_playwright is True
+        playwright.chromium.launch.assert_called_once()
+        assert page.close.call_count == 2
+        context.browser.close.assert_called_once()
+        playwright.stop.assert_called_once()
+
+    def test_heavy_resources_blocked(self):
+        """Images, media and fonts are aborted; documents and scripts load."""
+        from notifyme.fetcher import _route_without_heavy_resources
+
+        for resource_type, aborted in (("image", True), ("font", True), ("document", False), ("script", False)):
+            route = MagicMock()
+            route.request.resource_type = resource_type
+
+            _route_without_heavy_resources(route)
+
+            assert route.abort.called is aborted
+            assert route.continue_.called is not aborted
+
+    def test_ready_selector_skips_network_idle(self):
+        """With a ready selector the page is read once that element appears."""
+        import threading
+
+        sync_api = MagicMock()
+        playwright = sync_api.sync_playwright.return_value.start.return_value
+        page = playwright.chromium.launch.return_value.new_context.return_value.new_page.return_value
+        page.content.return_value = "<span class='price'>$10</span>"
+
+        with patch.dict("sys.modules", {"playwright.sync_api": sync_api}), \
+                patch("notifyme.fetcher._playwright_local", threading.local()):
+            fetch_url("https://example.com/a", use_playwright=True, ready_selector=".price")
+
+        assert page.goto.call_args.kwargs["wait_until"] == "domcontentloaded"
+        page.wait_for_selector.assert_called_once_with(".price", timeout=30000)
+
+class TestFetchRss:
+    """Test RSS/Atom feed parsing."""
+
+    def _fetch(self, body: bytes) -> dict:
+        """Run fetch_rss against a canned response body."""
+        from notifyme.fetcher import fetch_rss
+
+        response = MagicMock(status_code=200, content=body, text=body.decode(), headers={})
+        session = MagicMock()
+        session.get.return_value = response
+        with patch("notifyme.fetcher.get_session", return_value=session):
+            return fetch_rss("https://example.com/feed")
+
+    def test_rss_items(self):
+        """RSS 2.0 items map to feedparser-style entries."""
+        feed = self._fetch(b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+  <title>Test Feed</title>
+  <item>
+    <title>Launch &amp; more - Source A</title>
+    <link>https://example.com/1</link>
+    <guid isPermaLink="false">abc-1</guid>
+    <pubDate>Mon, 15 Jan 2024 10:00:00 GMT</pubDate>
+    <description>&lt;a href="x"&gt;Summary&lt;/a&gt;</description>
+    <source url="https://a.example.com">Source A</source>
+  </item>
+  <item><title>No guid</title><link>https://example.com/2</link></item>
+</channel></rss>""")
+
+        assert feed["feed"]["title"] == "Test Feed"
+        assert feed["entries"][0] == {
+            "id": "abc-1",
+            "title": "Launch & more - Source A",
+            "link": "https://example.com/1",
+            "published": "Mon, 15 Jan 2024 10:00:00 GMT",
+            "summary": '<a href="x">Summary</a>',
+            "source": {"title": "Source A"},
+        }
+        assert feed["entries"][1] == {"title": "No guid", "link": "https://example.com/2"}
+
+    def test_atom_entries(self):
+        """Atom entries use the alternate link href and published date."""
+        feed = self._fetch(b"""<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Atom Feed</title>
+  <entry>
+    <id>tag:example.com,2024:1</id>
+    <title>Entry</title>
+    <link rel="self" href="https://example.com/self"/>
+    <link href="https://example.com/entry"/>
+    <updated>2024-01-15T10:00:00Z</updated>
+  </entry>
+</feed>""")
+
+        assert feed["feed"]["title"] == "Atom Feed"
+        assert feed["entries"] == [{
+            "id": "tag:example.com,2024:1",
+            "title": "Entry",
+            "link": "https://example.com/entry",
+            "published": "2024-01-15T10:00:00Z",
+        }]
+
+    def test_rss_item_without_link_uses_permalink_guid(self):
+        """Like feedparser, a permalink <guid> stands in for a missing <link>."""
+        feed = self._fetch(b"""<rss version="2.0"><channel><title>T</title>
+  <item><title>Permalink</title><guid>https://example.com/p/1</guid></item>
+  <item><title>Opaque</title><guid isPermaLink="false">abc-2</guid></item>
+  <item><title>Relative</title><link>/p/3</link></item>
+</channel></rss>""")
+
+        assert [entry.get("link") for entry in feed["entries"]] == [
+            "https://example.com/p/1",
+            None,
+            "https://example.com/p/3",
+        ]
+
+    def test_atom_relative_links_resolved(self):
+        """Relative Atom hrefs resolve against xml:base, then the feed URL."""
+        feed = self._fetch(b"""<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Atom Feed</title>
+  <entry><id>1</id><link href="/posts/1"/></entry>
+  <entry xml:base="https://blog.example.org/2024/"><id>2</id><link href="post-2"/></entry>
+</feed>""")
+
+        assert [entry["link"] for entry in feed["entries"]] == [
+            "https://example.com/posts/1",
+            "https://blog.example.org/2024/post-2",
+        ]
+
+    def test_malformed_feed_falls_back_to_feedparser(self):
+        """Feeds ElementTree can't parse are handed to feedparser."""
+        fake_feedparser = MagicMock()
+        fake_feedparser.parse.return_value = {"entries": []}
+
+        with patch.dict("sys.modules", {"feedparser": fake_feedparser}):
+            feed = self._fetch(b"<rss><channel><title>Broken & unescaped</title></channel></rss>")
+
+        assert feed["entries"] == []
+        fake_feedparser.parse.assert_called_once()
+
+    def test_conditional_get_not_modified(self):
+        """Validators from the last fetch are sent; 304 returns no entries."""
+        from notifyme.fetcher import fetch_rss
+
+        response = MagicMock(status_code=304, headers={})
+        session = MagicMock()
+        session.get.return_value = response
+        with patch("notifyme.fetcher.get_session", return_value=session):
+            feed = fetch_rss("https://example.com/feed", etag='"v1"', modified="Mon, 15 Jan 2024 10:00:00 GMT")
+
+        headers = session.get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+        assert headers["If-Modified-Since"] == "Mon, 15 Jan 2024 10:00:00 GMT"
+        assert feed["status"] == 304
+        assert feed["entries"] == []
+        assert feed["etag"] == '"v1"'
+
+
+class TestSelectText:
+    """Test CSS selector text extraction."""
+
+    @pytest.mark.parametrize("use_lxml", [False, True])
+    def test_select_text_joins_stripped_strings(self, use_lxml):
+        """Text matches BeautifulSoup's get_text(strip=True); misses return None."""
+        from notifyme.fetcher import FetchResult
+
+        if use_lxml:
+            pytest.importorskip("lxml.html")
+            pytest.importorskip("cssselect")
+
+        result = FetchResult(
+            url="https://example.com",
+            html='<div class="price"> <span>$1,</span>\n<span>234.56</span> </div>',
+            text="",
+            status_code=200,
+            content_hash="abc",
+        )
+
+        with patch("notifyme.fetcher._has_lxml", return_value=use_lxml):
+            assert result.select_text(".price") == "$1,234.56"
+            assert result.select_text(".missing") is None
+
+    @pytest.mark.parametrize("use_lxml", [False, True])
+    def test_select_text_skips_script_style_and_template(self, use_lxml):
+        """Code and template text inside the match isn't part of its text."""
+        from notifyme.fetcher import FetchResult
+
+        if use_lxml:
+            pytest.importorskip("lxml.html")
+            pytest.importorskip("cssselect")
+
+        result = FetchResult(
+            url="https://example.com",
+            html="<span>$12<script>var x</script>.00<style>b{}</style><template>t</template></span>",
+            text="",
+            status_code=200,
+            content_hash="abc",
+        )
+
+        with patch("notifyme.fetcher._has_lxml", return_value=use_lxml):
+            assert result.select_text("span") == "$12.00"
+
+    @pytest.mark.parametrize("selector,expected", [
+        pytest.param("span:not(.x, .y)", "$3", id="not-selector-list"),
+        pytest.param('p:-soup-contains("Total")', "Total$5", id="soup-contains"),
+    ])
+    def test_soupsieve_only_selectors_fall_back(self, selector, expected):
+        """Selectors cssselect can't translate are answered by BeautifulSoup."""
+        pytest.importorskip("lxml.html")
+        pytest.importorskip("cssselect")
+        from notifyme.fetcher import FetchResult
+
+        result = FetchResult(
+            url="https://example.com",
+            html='<span class="x">$1</span><span class="y">$2</span><span>$3</span><p>Total<b>$5</b></p>',
+            text="",
+            status_code=200,
+            content_hash="abc",
+        )
+
+        with patch("notifyme.fetcher._has_lxml", return_value=True):
+            assert result.select_text(selector) == expected
+
+    def test_simple_selectors_use_find(self):
+        """Single #id / .class selectors skip the CSS selector engine."""
+        from notifyme.fetcher import FetchResult
+
+        result = FetchResult(
+            url="https://example.com",
+            html='<p id="total">$5</p><span class="old price">$9</span>',
+            text="",
+            status_code=200,
+            content_hash="abc",
+        )
+
+        with patch("notifyme.fetcher._has_lxml", return_value=False), \
+                patch("bs4.BeautifulSoup.select_one") as mock_select:
+            assert result.select_text("#total") == "$5"
+            assert result.select_text(".price") == "$9"
+        mock_select.assert_not_called()
+
+
+    def test_soup_parser_falls_back_without_lxml(self):
+        """BeautifulSoup uses html.parser when lxml isn't installed."""
+        from notifyme.fetcher import _soup_parser
+
+        _soup_parser.cache_clear()
+        try:
+            with patch.dict("sys.modules", {"lxml": None}):
+                assert _soup_parser() == "html.parser"
+        finally:
+            _soup_parser.cache_clear()
+
+class TestExtractText:
+    """Test page text extraction."""
+
+    @pytest.mark.parametrize("html", [
+        "<html><head><title>T &amp; x</title><script>var a=1</script></head><body><header>H</header>"
+        "<p>Hello <b>world</b> tail</p><!-- comment --><nav>n</nav>after<footer>f</footer></body></html>",
+        "<p>unclosed <div>bad <span>nest</p> text",
+        "<body><noscript>ns</noscript><template><p>tpl</p></template><pre>  pre  </pre></body>",
+        "<?xml version='1.0' encoding='utf-8'?><html><body><p>declared</p></body></html>",
+        "<!-- only a comment -->",
+        "plain text",
+    ])
+    def test_lxml_path_matches_beautifulsoup(self, html):
+        """The lxml fast path yields the same text (and so hash) as BeautifulSoup."""
+        pytest.importorskip("lxml")
+        from notifyme.fetcher import _extract_text
+
+        with patch("notifyme.fetcher._soup_parser", return_value="lxml"):
+            fast = _extract_text(html)
+            with patch("notifyme.fetcher._extract_text_lxml", side_effect=ValueError):
+                slow = _extract_text(html)
+
+        assert fast == slow
+
+class TestSharedFetches:
+    """Test per-run fetch sharing."""
+
+    def test_identical_fetches_share_one_request(self):
+        """Inside shared_fetches(), the same URL is fetched once; outside, every time."""
+        from notifyme.fetcher import FetchResult, shared_fetches
+
+        page = FetchResult(url="https://example.com", html="", text="", status_code=200, content_hash="abc")
+        with patch("notifyme.fetcher._fetch_with_requests", return_value=page) as mock_fetch:
+            with shared_fetches():
+                first = fetch_url("https://example.com")
+                second = fetch_url("https://example.com")
+                fetch_url("https://example.com/other")
+            fetch_url("https://example.com")
+
+        assert first is second
+        assert mock_fetch.call_count == 3
+
+    @pytest.mark.parametrize(
+        "headers,known_body_hash,expect_not_modified",
+        [
+            pytest.param({"If-None-Match": '"v1"'}, None, True, id="etag-matches"),
+            pytest.param({"If-Modified-Since": "Mon, 01 Jan 2024"}, None, True, id="modified-matches"),
+            pytest.param(None, "body1", True, id="body-hash-matches"),
+            pytest.param({"If-None-Match": '"v0"'}, "body0", False, id="changed"),
+        ],
+    )
+    def test_conditional_fetch_shares_request(self, headers, known_body_hash, expect_not_modified):
+        """A conditional fetch shares the plain fetch and gets its own 304/unchanged answer."""
+        from notifyme.fetcher import FetchResult, shared_fetches
+
+        page = FetchResult(
+            url="https://example.com",
+            html="<p>$10</p>",
+            text="$10",
+            status_code=200,
+            content_hash="abc",
+            etag='"v1"',
+            modified="Mon, 01 Jan 2024",
+            body_hash="body1",
+        )
+        with patch("notifyme.fetcher._fetch_with_requests", return_value=page) as mock_fetch:
+            with shared_fetches():
+                price = fetch_url("https://example.com")
+                webpage = fetch_url("https://example.com", headers=headers, known_body_hash=known_body_hash)
+
+        mock_fetch.assert_called_once_with("https://example.com", 30, None, None, None)
+        assert price is page
+        assert webpage.not_modified is expect_not_modified
+        assert webpage.text == ("" if expect_not_modified else "$10")
@@ -0,0 +1,142 @@
+"""Tests for email notifications."""
+
+from unittest.mock import patch
+
+import pytest
+
+from notifyme.models import CheckResult, Monitor, MonitorType
+from notifyme.notifier import EmailNotifier
+
+
+@pytest.fixture
+def notifier():
+    """Create a notifier with SMTP settings filled in."""
+    return EmailNotifier(
+        smtp_host="smtp.example.com",
+        smtp_port=587,
+        smtp_user="me@example.com",
+        smtp_password="secret",
+        notify_email="me@example.com",
+    )
+
+
+@pytest.fixture
+def monitor():
+    """Create a sample monitor."""
+    return Monitor(name="Test", type=MonitorType.WEBPAGE, url="https://example.com")
+
+
+class TestSending:
+    """Test SMTP connection handling."""
+
+    def test_send_opens_one_connection_per_email(self, notifier, monitor):
+        """Outside a batch each email logs in on its own connection."""
+        result = CheckResult(condition_met=True, explanation="Changed")
+
+        with patch("notifyme.notifier.smtplib.SMTP") as mock_smtp:
+            mock_smtp.return_value.__enter__.return_value = mock_smtp.return_value
+            notifier.send(monitor, result)
+            notifier.send(monitor, result)
+
+        assert mock_smtp.call_count == 2
+        assert mock_smtp.return_value.send_message.call_count == 2
+
+    def test_batch_reuses_connection(self, notifier, monitor):
+        """Emails sent inside batch() share one login and are closed at the end."""
+        result = CheckResult(condition_met=True, explanation="Changed")
+
+        with patch("notifyme.notifier.smtplib.SMTP") as mock_smtp:
+            with notifier.batch():
+                notifier.send(monitor, result)
+                notifier.send(monitor, result)
+                notifier.send(monitor, result)
+
+        mock_smtp.assert_called_once_with("smtp.example.com", 587)
+        server = mock_smtp.return_value
+        server.login.assert_called_once()
+        assert server.send_message.call_count == 3
+        server.quit.assert_called_once()
+
+    def test_batch_rotates_long_lived_connection(self, notifier, monitor):
+        """A batch opens a fresh connection after MAX_MESSAGES_PER_CONNECTION sends."""
+        result = CheckResult(condition_met=True, explanation="Changed")
+
+        with patch("notifyme.notifier.MAX_MESSAGES_PER_CONNECTION", 2), \
+                patch("notifyme.notifier.smtplib.SMTP") as mock_smtp:
+            with notifier.batch():
+                for _ in range(5):
+                    notifier.send(monitor, result)
+
+        assert mock_smtp.call_count == 3
+        assert mock_smtp.return_value.quit.call_count == 3
+
+    def test_batch_shared_across_threads(self, notifier, monitor):
+        """Sends from several worker threads queue on the one batch connection."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        result = CheckResult(condition_met=True, explanation="Changed")
+
+        with patch("notifyme.notifier.smtplib.SMTP") as mock_smtp:
+            with notifier.batch(), ThreadPoolExecutor(max_workers=4) as pool:
+                list(pool.map(lambda _: notifier.send(monitor, result), range(8)))
+
+        mock_smtp.assert_called_once()
+        assert mock_smtp.return_value.send_message.call_count == 8
+
+    def test_batch_without_sends_never_connects(self, notifier):
+        """A run with nothing to report doesn't touch the SMTP server."""
+        with patch("notifyme.notifier.smtplib.SMTP") as mock_smtp:
+            with notifier.batch():
+                pass
+
+        mock_smtp.assert_not_called()
+
+    def test_implicit_tls_port_skips_starttls(self, notifier):
+        """Port 465 connects with SMTP_SSL instead of upgrading with STARTTLS."""
+        notifier.smtp_port = 465
+
+        with patch("notifyme.notifier.smtplib.SMTP_SSL") as mock_ssl, \
+                patch("notifyme.notifier.smtplib.SMTP") as mock_smtp:
+            assert notifier.test_connection() is True
+
+        mock_smtp.assert_not_called()
+        mock_ssl.return_value.starttls.assert_not_called()
+        mock_ssl.return_value.login.assert_called_once_with("me@example.com", "secret")
+
+    def test_connections_share_verifying_tls_context(self, notifier):
+        """STARTTLS and implicit TLS both use one certificate-checking context."""
+        import ssl
+
+        with patch("notifyme.notifier.smtplib.SMTP") as mock_smtp:
+            notifier.test_connection()
+            notifier.test_connection()
+        notifier.smtp_port = 465
+        with patch("notifyme.notifier.smtplib.SMTP_SSL") as mock_ssl:
+            notifier.test_connection()
+
+        contexts = [call.kwargs["context"] for call in mock_smtp.return_value.starttls.call_args_list]
+        contexts.append(mock_ssl.call_args.kwargs["context"])
+        assert all(context is contexts[0] for context in contexts)
+        assert contexts[0].verify_mode == ssl.CERT_REQUIRED
+
+
+class TestMimeParts:
+    """Test email body encoding."""
+
+    def test_ascii_body_sent_as_7bit(self):
+        """ASCII bodies are sent unencoded."""
+        from notifyme.notifier import _mime_text
+
+        part = _mime_text("Price dropped to $10", "plain")
+
+        assert part["Content-Transfer-Encoding"] == "7bit"
+        assert part.get_content_charset() == "us-ascii"
+
+    def test_unicode_body_uses_quoted_printable(self):
+        """Non-ASCII bodies use quoted-printable UTF-8 rather than base64."""
+        from notifyme.notifier import _mime_text
+
+        part = _mime_text("Café – price dropped", "html")
+
+        assert part["Content-Transfer-Encoding"] == "quoted-printable"
+        assert part.get_payload(decode=True).decode("utf-8") == "Café – price dropped"
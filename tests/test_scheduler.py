@@ -0,0 +1,73 @@
+"""Tests for check orchestration."""
+
+import sqlite3
+import threading
+import time
+from unittest.mock import MagicMock
+
+from notifyme.models import CheckResult, Monitor, MonitorType
+from notifyme.scheduler import CheckOrchestrator
+
+
+class TestCheckMany:
+    """Test concurrent check runs."""
+
+    def test_results_handled_one_at_a_time(self):
+        """Checks run concurrently, but on_result never runs for two monitors at once."""
+        checker = MagicMock()
+
+        async def check_async(monitor):
+            return CheckResult(condition_met=False, explanation="No change")
+
+        checker.check_async = check_async
+        checker.should_notify.return_value = False
+        checker.get_state_for_storage.return_value = {}
+
+        orchestrator = CheckOrchestrator(db=MagicMock(), notifier=MagicMock(), max_concurrency=4)
+        orchestrator.get_checker = lambda monitor_type: checker
+
+        active = 0
+        overlaps = []
+        lock = threading.Lock()
+
+        def on_result(monitor, result):
+            nonlocal active
+            with lock:
+                active += 1
+                overlaps.append(active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+        monitors = [
+            Monitor(name=f"Monitor {i}", type=MonitorType.WEBPAGE, url=f"https://example.com/{i}")
+            for i in range(6)
+        ]
+        results = orchestrator._check_many(monitors, on_result)
+
+        assert [monitor for monitor, _ in results] == monitors
+        assert max(overlaps) == 1
+
+    def test_failed_state_write_fails_the_monitor(self):
+        """A write that fails when the result is flushed reports that monitor as failed."""
+        checker = MagicMock()
+
+        async def check_async(monitor):
+            return CheckResult(condition_met=False, explanation="No change")
+
+        checker.check_async = check_async
+        checker.should_notify.return_value = False
+        checker.get_state_for_storage.return_value = {"seen": True}
+
+        db = MagicMock()
+        db.flush.side_effect = [sqlite3.OperationalError("disk I/O error"), None]
+        orchestrator = CheckOrchestrator(db=db, notifier=MagicMock(), max_concurrency=1)
+        orchestrator.get_checker = lambda monitor_type: checker
+
+        monitors = [
+            Monitor(name=f"Monitor {i}", type=MonitorType.WEBPAGE, url=f"https://example.com/{i}")
+            for i in range(2)
+        ]
+        results = orchestrator._check_many(monitors)
+
+        assert [monitor for monitor, _ in results] == monitors[1:]